@@ -2,6 +2,33 @@
 Configuration module
 """
 
+import importlib.util
+from pathlib import Path
+
 from .settings import get_settings, Settings
 
 __all__ = ["get_settings", "Settings"]
+
+# Constantes V1 (config.py à la racine, masqué par ce package): chargées au
+# premier accès, pour les modules legacy (`from config import VEHICULES_CIBLES`)
+_LEGACY_PATH = Path(__file__).resolve().parent.parent / "config.py"
+_legacy = None
+
+
+def _legacy_config():
+    """Module config.py legacy (exécuté une seule fois)"""
+    global _legacy
+    if _legacy is None:
+        spec = importlib.util.spec_from_file_location("config_legacy", _LEGACY_PATH)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        _legacy = module
+    return _legacy
+
+
+def __getattr__(name):
+    if name.isupper() and _LEGACY_PATH.is_file():
+        legacy = _legacy_config()
+        if hasattr(legacy, name):
+            return getattr(legacy, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
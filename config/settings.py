@@ -3,11 +3,19 @@ Settings - Configuration centralisée via pydantic-settings
 Charge depuis .env et variables d'environnement
 """
 
+import copy
 from pathlib import Path
-from typing import Optional
+from typing import Any, Optional
+
+import yaml
 from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
+try:
+    from yaml import CSafeLoader as YamlLoader  # Optionnel: parseur libyaml (C)
+except ImportError:
+    from yaml import SafeLoader as YamlLoader
+
 # Chemins de base
 BASE_DIR = Path(__file__).parent.parent
 CONFIG_DIR = BASE_DIR / "config"
@@ -150,6 +158,39 @@ class Settings(BaseSettings):
 _settings: Optional[Settings] = None
 
 
+# Configs YAML parsées: chemin -> (st_mtime_ns, st_size, données)
+_YAML_CACHE: dict[str, tuple[int, int, Any]] = {}
+
+
+def yaml_config_stamp(filename: str) -> Optional[tuple[int, int]]:
+    """Signature (st_mtime_ns, st_size) d'un fichier de config/ (None s'il n'existe pas)"""
+    try:
+        st = (CONFIG_DIR / filename).stat()
+    except FileNotFoundError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def load_yaml_config(filename: str) -> dict[str, Any]:
+    """
+    Charge un fichier YAML de config/ ({} s'il n'existe pas).
+    Parsé une fois puis mis en cache (reparsé si mtime/taille changent);
+    chaque appel reçoit une copie (les services enrichissent leurs dicts).
+    """
+    signature = yaml_config_stamp(filename)
+    if signature is None:
+        return {}
+    
+    path = CONFIG_DIR / filename
+    key = str(path)
+    cached = _YAML_CACHE.get(key)
+    if cached is None or cached[:2] != signature:
+        with open(path, "rb") as f:
+            data = yaml.load(f, Loader=YamlLoader) or {}
+        cached = _YAML_CACHE[key] = (*signature, data)
+    return copy.deepcopy(cached[2])
+
+
 def get_settings() -> Settings:
     """Retourne l'instance des settings (lazy loading)"""
     global _settings
@@ -10,7 +10,7 @@ import sqlite3
 from contextlib import contextmanager
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Generator, Optional
+from typing import Any, Generator, Iterable, Optional
 
 from models.annonce_v2 import Annonce, ScoreBreakdown
 from models.enums import Source, SellerType, AlertLevel, AnnonceStatus, Carburant, Boite
@@ -19,6 +19,9 @@ from config.settings import get_settings, DATA_DIR
 # Chemin du schéma SQL
 SCHEMA_PATH = Path(__file__).parent / "schema.sql"
 
+# Taille max des listes IN (...) (limite de variables SQLite)
+IN_QUERY_CHUNK = 500
+
 
 def utc_now_iso() -> str:
     """Retourne datetime UTC au format ISO"""
@@ -123,36 +126,64 @@ class AnnonceRepository:
     
     # === CRUD Operations ===
     
-    def save(self, annonce: Annonce) -> bool:
-        """
-        Sauvegarde ou met à jour une annonce.
-        Upsert sur fingerprint (clé de déduplication) au lieu de id.
-        """
-        annonce.updated_at = datetime.now(timezone.utc)
-        data = self._annonce_to_row(annonce)
-        
-        columns = list(data.keys())
+    @staticmethod
+    def _upsert_sql(columns: list[str]) -> str:
+        """Upsert sur fingerprint (unique) - résout le bug UNIQUE constraint"""
         placeholders = ["?" for _ in columns]
         # Exclure id et fingerprint de l'update (on garde l'original)
         updates = [f"{col} = excluded.{col}" for col in columns 
                    if col not in ("id", "fingerprint", "created_at")]
         
-        # Upsert sur fingerprint (unique) - résout le bug UNIQUE constraint
-        sql = f"""
+        return f"""
             INSERT INTO annonces ({', '.join(columns)})
             VALUES ({', '.join(placeholders)})
             ON CONFLICT(fingerprint) DO UPDATE SET {', '.join(updates)}
         """
+    
+    def save(self, annonce: Annonce) -> bool:
+        """
+        Sauvegarde ou met à jour une annonce.
+        Upsert sur fingerprint (clé de déduplication) au lieu de id.
+        """
+        annonce.updated_at = datetime.now(timezone.utc)
+        data = self._annonce_to_row(annonce)
+        columns = list(data.keys())
         
         try:
             with self._get_connection() as conn:
-                conn.execute(sql, [data[col] for col in columns])
+                conn.execute(self._upsert_sql(columns), [data[col] for col in columns])
                 conn.commit()
             return True
         except sqlite3.Error as e:
             print(f"Erreur save: {e}")
             return False
     
+    def save_many(self, annonces: list[Annonce]) -> int:
+        """
+        Sauvegarde un lot d'annonces (même upsert que save) en une transaction.
+        
+        Returns:
+            Nombre d'annonces écrites (0 si le lot a échoué)
+        """
+        if not annonces:
+            return 0
+        
+        now = datetime.now(timezone.utc)
+        rows = []
+        for annonce in annonces:
+            annonce.updated_at = now
+            rows.append(self._annonce_to_row(annonce))
+        columns = list(rows[0].keys())
+        
+        try:
+            with self._get_connection() as conn:
+                conn.executemany(self._upsert_sql(columns), ([row[col] for col in columns] for row in rows))
+                conn.commit()
+            return len(rows)
+        except sqlite3.Error as e:
+            print(f"Erreur save_many: {e}")
+            return 0
+    
     def get_by_id(self, annonce_id: str) -> Optional[Annonce]:
         """Récupère une annonce par son ID"""
         with self._get_connection() as conn:
@@ -225,6 +256,63 @@ class AnnonceRepository:
                 return self._row_to_annonce(row)
         return None
     
+    def find_existing_keys(
+        self,
+        listings: Iterable[tuple[str, str]] = (),
+        urls: Iterable[str] = ()
+    ) -> tuple[set[tuple[str, str]], set[str]]:
+        """
+        Vérifie en lot l'existence d'annonces (une requête IN par paquet).
+        
+        Returns:
+            (clés (source, source_listing_id) connues, URLs connues en url ou url_canonique)
+        """
+        listings = set(listings)
+        urls = set(urls)
+        found_listings: set[tuple[str, str]] = set()
+        found_urls: set[str] = set()
+        
+        with self._get_connection() as conn:
+            ids = list({sid for _, sid in listings})
+            for i in range(0, len(ids), IN_QUERY_CHUNK):
+                chunk = ids[i:i + IN_QUERY_CHUNK]
+                marks = ",".join("?" * len(chunk))
+                rows = conn.execute(
+                    f"SELECT source, source_listing_id FROM annonces WHERE source_listing_id IN ({marks})",
+                    chunk
+                ).fetchall()
+                found_listings.update(
+                    key for key in ((r["source"], r["source_listing_id"]) for r in rows)
+                    if key in listings
+                )
+            
+            url_list = list(urls)
+            for i in range(0, len(url_list), IN_QUERY_CHUNK):
+                chunk = url_list[i:i + IN_QUERY_CHUNK]
+                marks = ",".join("?" * len(chunk))
+                rows = conn.execute(
+                    f"SELECT url, url_canonique FROM annonces WHERE url IN ({marks}) OR url_canonique IN ({marks})",
+                    chunk + chunk
+                ).fetchall()
+                for r in rows:
+                    found_urls.update(u for u in (r["url"], r["url_canonique"]) if u in urls)
+        
+        return found_listings, found_urls
+    
+    def get_cache_keys(self, since: datetime) -> list[tuple[str, str, Optional[str]]]:
+        """
+        Clés de déduplication des annonces créées depuis `since` (UTC).
+        
+        Returns:
+            Liste de (url_canonique, source, source_listing_id)
+        """
+        with self._get_connection() as conn:
+            rows = conn.execute(
+                "SELECT url_canonique, source, source_listing_id FROM annonces WHERE created_at >= ?",
+                (since.astimezone(timezone.utc).isoformat(),)
+            ).fetchall()
+        return [tuple(row) for row in rows]
+    
     def find_near_duplicates(self, fingerprint_soft: str) -> list[Annonce]:
         """
         Trouve les annonces avec le même fingerprint_soft.
@@ -412,6 +500,17 @@ class AnnonceRepository:
         error_count: int = 0
     ):
         """Log simplifié d'un scan (insert direct)"""
+        self.log_scans([source], index_count, new_count, notified_count, error_count)
+    
+    def log_scans(
+        self,
+        sources: list[str],
+        index_count: int = 0,
+        new_count: int = 0,
+        notified_count: int = 0,
+        error_count: int = 0
+    ):
+        """Log simplifié d'un scan pour plusieurs sources (un seul insert groupé)"""
         sql = """
             INSERT INTO scan_history (source, started_at, finished_at, status, 
                                       listings_found, listings_new, errors_count)
@@ -420,7 +519,10 @@ class AnnonceRepository:
         now = utc_now_iso()
         try:
             with self._get_connection() as conn:
-                conn.execute(sql, (source, now, now, index_count, new_count, error_count))
+                conn.executemany(sql, [
+                    (source, now, now, index_count, new_count, error_count)
+                    for source in sources
+                ])
                 conn.commit()
         except Exception as e:
             print(f"⚠️ log_scan error: {e}")
@@ -14,6 +14,7 @@ import re
 import uuid
 from dataclasses import dataclass, field, asdict
 from datetime import datetime, timezone
+from functools import lru_cache
 from typing import Any, Optional
 from urllib.parse import urlparse, parse_qs, urlencode, urlunparse
 
@@ -25,10 +26,17 @@ def utc_now() -> datetime:
     return datetime.now(timezone.utc)
 
 
+@lru_cache(maxsize=4096)
+def _format_fr(value: int, unit: str) -> str:
+    """Formate un entier en style français ("12 500 €"), mémoïsé par valeur"""
+    return f"{value:,} {unit}".replace(",", " ")
+
+
+@lru_cache(maxsize=8192)
 def canonicalize_url(url: str) -> str:
     """
     Normalise une URL pour éviter les doublons dus aux paramètres de tracking.
-    Supprime les paramètres UTM, ref, etc.
+    Supprime les paramètres UTM, ref, etc. (mémoïsé: fonction pure de l'URL)
     """
     if not url:
         return ""
@@ -65,9 +73,9 @@ def canonicalize_url(url: str) -> str:
         return url
 
 
-@dataclass
+@dataclass(slots=True)
 class ScoreBreakdown:
-    """Détail du calcul de score pour transparence"""
+    """Détail du calcul de score pour transparence (slots: alloué à chaque score)"""
     
     # Composantes principales (sur 100)
     prix_score: int = 0
@@ -97,6 +105,14 @@ class ScoreBreakdown:
     margin_max: int = 0
     repair_cost_estimate: int = 0
     
+    def reset(self):
+        """Remet toutes les composantes à zéro (réutilisation d'une instance)"""
+        self.prix_score = self.km_score = self.freshness_score = 0
+        self.keywords_score = self.bonus_score = self.risk_penalty = 0
+        self.prix_detail = self.km_detail = self.freshness_detail = ""
+        self.keywords_detail = self.bonus_detail = self.risk_detail = ""
+        self.total = self.margin_min = self.margin_max = self.repair_cost_estimate = 0
+    
     def to_dict(self) -> dict[str, Any]:
         return asdict(self)
     
@@ -392,13 +408,13 @@ class Annonce:
         """Formate le prix en style français (espaces)"""
         if self.prix is None:
             return "N/C"
-        return f"{self.prix:,}".replace(",", " ") + " €"
+        return _format_fr(self.prix, "€")
     
     def format_km(self) -> str:
         """Formate le kilométrage"""
         if self.kilometrage is None:
             return "N/C"
-        return f"{self.kilometrage:,}".replace(",", " ") + " km"
+        return _format_fr(self.kilometrage, "km")
     
     def format_notification(self) -> str:
         """Formate pour notification texte"""
@@ -356,16 +356,19 @@ async def main():
     
     scanner = FullScanner()
     
-    # Scan AutoScout24
-    await scanner.scan_autoscout()
-    
-    # Scan LeBoncoin
-    await scanner.scan_leboncoin()
-    
-    # Résultats
-    await scanner.show_and_notify()
-    
-    print("\n✅ SCAN TERMINÉ - Vérifie Discord!")
+    try:
+        # Scan AutoScout24
+        await scanner.scan_autoscout()
+        
+        # Scan LeBoncoin
+        await scanner.scan_leboncoin()
+        
+        # Résultats
+        await scanner.show_and_notify()
+        
+        print("\n✅ SCAN TERMINÉ - Vérifie Discord!")
+    finally:
+        await scanner.notifier.aclose()
 
 
 if __name__ == "__main__":
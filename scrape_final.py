@@ -133,71 +133,74 @@ async def main():
     scorer = ScoringService()
     notifier = NotificationService()
     
-    all_annonces = []
-    
-    # Scraper chaque recherche
-    for rech in RECHERCHES:
-        await asyncio.sleep(2)
-        listings = await scrape_autoscout(rech["marque"], rech["modele"], rech["prix_max"])
+    try:
+        all_annonces = []
         
-        for data in listings:
-            # Skip si déjà en base
-            if db.exists(data["url"]):
-                continue
+        # Scraper chaque recherche
+        for rech in RECHERCHES:
+            await asyncio.sleep(2)
+            listings = await scrape_autoscout(rech["marque"], rech["modele"], rech["prix_max"])
             
-            # Créer l'annonce
-            annonce = Annonce(
-                url=data["url"],
-                source=data["source"],
-                marque=data["marque"],
-                modele=data["modele"],
-                titre=data["titre"],
-                prix=data["prix"],
-                kilometrage=data["kilometrage"],
-                annee=data["annee"],
-                carburant=data["carburant"],
-                type_vendeur="particulier",
-                date_publication=datetime.now(),
-            )
-            
-            # Scorer
-            score, mots = scorer.calculer_score(annonce)
+            for data in listings:
+                # Skip si déjà en base
+                if db.exists(data["url"]):
+                    continue
+                
+                # Créer l'annonce
+                annonce = Annonce(
+                    url=data["url"],
+                    source=data["source"],
+                    marque=data["marque"],
+                    modele=data["modele"],
+                    titre=data["titre"],
+                    prix=data["prix"],
+                    kilometrage=data["kilometrage"],
+                    annee=data["annee"],
+                    carburant=data["carburant"],
+                    type_vendeur="particulier",
+                    date_publication=datetime.now(),
+                )
+                
+                # Scorer
+                score, mots = scorer.calculer_score(annonce)
+                
+                # Sauvegarder
+                db.save_annonce(annonce)
+                all_annonces.append(annonce)
+        
+        # Trier par score
+        all_annonces.sort(key=lambda a: a.score_rentabilite, reverse=True)
+        
+        # Afficher les résultats
+        print("\n" + "=" * 60)
+        print(f"📊 {len(all_annonces)} NOUVELLES ANNONCES")
+        print("=" * 60)
+        
+        for i, a in enumerate(all_annonces[:20], 1):
+            km_str = f"{a.kilometrage:,}km" if a.kilometrage else "?km"
+            print(f"{i:2}. [{a.score_rentabilite:2}/100] {a.marque} {a.modele} | {a.prix or '?'}€ | {km_str} | {a.annee or '?'}")
+        
+        # Envoyer sur Discord les meilleures
+        print("\n" + "=" * 60)
+        print("📤 ENVOI SUR DISCORD")
+        print("=" * 60)
+        
+        sent = 0
+        for annonce in all_annonces[:15]:
+            if annonce.score_rentabilite < 20:
+                continue
             
-            # Sauvegarder
-            db.save_annonce(annonce)
-            all_annonces.append(annonce)
-    
-    # Trier par score
-    all_annonces.sort(key=lambda a: a.score_rentabilite, reverse=True)
-    
-    # Afficher les résultats
-    print("\n" + "=" * 60)
-    print(f"📊 {len(all_annonces)} NOUVELLES ANNONCES")
-    print("=" * 60)
-    
-    for i, a in enumerate(all_annonces[:20], 1):
-        km_str = f"{a.kilometrage:,}km" if a.kilometrage else "?km"
-        print(f"{i:2}. [{a.score_rentabilite:2}/100] {a.marque} {a.modele} | {a.prix or '?'}€ | {km_str} | {a.annee or '?'}")
-    
-    # Envoyer sur Discord les meilleures
-    print("\n" + "=" * 60)
-    print("📤 ENVOI SUR DISCORD")
-    print("=" * 60)
-    
-    sent = 0
-    for annonce in all_annonces[:15]:
-        if annonce.score_rentabilite < 20:
-            continue
+            print(f"🔔 {annonce.marque} {annonce.modele} - {annonce.prix}€ - Score {annonce.score_rentabilite}")
+            success = await notifier.send_discord(annonce)
+            if success:
+                print("   ✅ Envoyé!")
+                db.mark_notified(annonce.id)
+                sent += 1
+            await asyncio.sleep(1)
         
-        print(f"🔔 {annonce.marque} {annonce.modele} - {annonce.prix}€ - Score {annonce.score_rentabilite}")
-        success = await notifier.send_discord(annonce)
-        if success:
-            print("   ✅ Envoyé!")
-            db.mark_notified(annonce.id)
-            sent += 1
-        await asyncio.sleep(1)
-    
-    print(f"\n✅ {sent} notifications envoyées sur Discord!")
+        print(f"\n✅ {sent} notifications envoyées sur Discord!")
+    finally:
+        await notifier.aclose()
 
 
 if __name__ == "__main__":
@@ -272,24 +272,27 @@ class QuickScraper:
 async def main():
     scraper = QuickScraper()
     
-    # Scraper
-    annonces = await scraper.scrape_all()
-    
-    # Afficher les meilleures
-    print("\n" + "=" * 60)
-    print("🏆 TOP ANNONCES")
-    print("=" * 60)
-    
-    for i, a in enumerate(annonces[:15], 1):
-        print(f"{i:2}. [{a.score_rentabilite:3}/100] {a.marque} {a.modele} - {a.prix}€")
-        if a.kilometrage:
-            print(f"    Km: {a.kilometrage:,} | Année: {a.annee} | {a.ville or 'N/A'}")
-        print(f"    {a.url}")
-    
-    # Notifier
-    await scraper.notify_best(annonces, max_notify=10)
-    
-    print("\n✅ Terminé! Vérifie Discord.")
+    try:
+        # Scraper
+        annonces = await scraper.scrape_all()
+        
+        # Afficher les meilleures
+        print("\n" + "=" * 60)
+        print("🏆 TOP ANNONCES")
+        print("=" * 60)
+        
+        for i, a in enumerate(annonces[:15], 1):
+            print(f"{i:2}. [{a.score_rentabilite:3}/100] {a.marque} {a.modele} - {a.prix}€")
+            if a.kilometrage:
+                print(f"    Km: {a.kilometrage:,} | Année: {a.annee} | {a.ville or 'N/A'}")
+            print(f"    {a.url}")
+        
+        # Notifier
+        await scraper.notify_best(annonces, max_notify=10)
+        
+        print("\n✅ Terminé! Vérifie Discord.")
+    finally:
+        await scraper.notifier.aclose()
 
 
 if __name__ == "__main__":
@@ -9,19 +9,22 @@ Usage:
 
 import asyncio
 import argparse
+import atexit
 import logging
 import os
+import queue
 import signal
 import sys
 from datetime import datetime, timezone
 from pathlib import Path
-from logging.handlers import RotatingFileHandler
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 
 # Setup path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from config.settings import BASE_DIR, DATA_DIR
 from scripts.run_prod_v2 import run_all_searches, run_loop, load_searches_config
+from services.notifier.shared_client import get_http_client, close_http_client
 
 # === Logging Setup ===
 LOG_DIR = BASE_DIR / "logs"
@@ -52,11 +55,16 @@ def setup_logging(verbose: bool = False):
     console_handler.setFormatter(formatter)
     console_handler.setLevel(logging.DEBUG if verbose else logging.INFO)
     
-    # Root logger
+    # Root logger: les écritures disque/console se font dans le thread du
+    # QueueListener, la boucle asyncio ne fait que mettre en file
+    log_queue = queue.SimpleQueue()
+    listener = QueueListener(log_queue, file_handler, console_handler, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+    
     root_logger = logging.getLogger()
     root_logger.setLevel(logging.DEBUG)
-    root_logger.addHandler(file_handler)
-    root_logger.addHandler(console_handler)
+    root_logger.addHandler(QueueHandler(log_queue))
     
     # Réduire le bruit des libs externes
     logging.getLogger("httpx").setLevel(logging.WARNING)
@@ -67,8 +75,6 @@ def setup_logging(verbose: bool = False):
 
 async def send_startup_notification():
     """Envoie une notification au démarrage"""
-    import httpx
-    
     webhook_url = os.getenv("DISCORD_WEBHOOK_URL")
     if not webhook_url:
         return
@@ -86,16 +92,14 @@ async def send_startup_notification():
     }
     
     try:
-        async with httpx.AsyncClient(timeout=10) as client:
-            await client.post(webhook_url, json=message)
+        client = await get_http_client()
+        await client.post(webhook_url, json=message, timeout=10)
     except Exception as e:
         print(f"⚠️ Startup notification failed: {e}")
 
 
 async def send_shutdown_notification(reason: str = "Manual stop"):
     """Envoie une notification à l'arrêt"""
-    import httpx
-    
     webhook_url = os.getenv("DISCORD_WEBHOOK_URL")
     if not webhook_url:
         return
@@ -110,16 +114,14 @@ async def send_shutdown_notification(reason: str = "Manual stop"):
     }
     
     try:
-        async with httpx.AsyncClient(timeout=10) as client:
-            await client.post(webhook_url, json=message)
+        client = await get_http_client()
+        await client.post(webhook_url, json=message, timeout=10)
     except Exception:
         pass
 
 
 async def send_zero_listings_alert(consecutive_count: int, sources: list[str]):
     """Alerte si 0 annonces pendant plusieurs runs"""
-    import httpx
-    
     webhook_url = os.getenv("DISCORD_WEBHOOK_URL")
     if not webhook_url:
         return
@@ -134,8 +136,8 @@ async def send_zero_listings_alert(consecutive_count: int, sources: list[str]):
     }
     
     try:
-        async with httpx.AsyncClient(timeout=10) as client:
-            await client.post(webhook_url, json=message)
+        client = await get_http_client()
+        await client.post(webhook_url, json=message, timeout=10)
     except Exception:
         pass
 
@@ -216,6 +218,7 @@ async def run_daemon(dry_run: bool = False, once: bool = False, verbose: bool =
         logger.info("VOITURES BOT DAEMON - Stopped")
         if not dry_run and not once:
             await send_shutdown_notification("Normal shutdown")
+        await close_http_client()
 
 
 def main():
@@ -23,6 +23,7 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 from config.settings import get_settings, BASE_DIR
 from models.enums import Source
 from services.orchestrator import Orchestrator, PipelineStats
+from services.notifier.shared_client import get_http_client, close_http_client
 
 # Import directly to avoid legacy __init__.py chain
 import importlib.util
@@ -126,17 +127,16 @@ async def send_alert_notification(message: str):
     """Envoie une alerte Discord (blocage, erreur, etc.)"""
     try:
         from services.notifier.discord import _get_webhook_url
-        import httpx
         
         webhook_url = _get_webhook_url()
         if not webhook_url:
             print(f"⚠️ Alert (no webhook): {message}")
             return
         
-        async with httpx.AsyncClient() as client:
-            await client.post(webhook_url, json={
-                "content": f"🚨 **ALERT BOT VOITURES**\n{message}"
-            })
+        client = await get_http_client()
+        await client.post(webhook_url, json={
+            "content": f"🚨 **ALERT BOT VOITURES**\n{message}"
+        })
         print(f"📢 Alert sent: {message}")
     except Exception as e:
         print(f"⚠️ Failed to send alert: {e}")
@@ -320,6 +320,7 @@ async def run_loop(interval_sec: int = 60, dry_run: bool = False):
                     break
                 await asyncio.sleep(1)
     
+    await close_http_client()
     print("👋 Loop stopped")
 
 
@@ -24,6 +24,7 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 from config.settings import get_settings, BASE_DIR
 from models.enums import Source
 from services.orchestrator import Orchestrator, PipelineStats
+from services.notifier.shared_client import get_http_client, close_http_client
 from scrapers.rate_limiter import get_rate_limiter
 
 # Import des scrapers
@@ -218,17 +219,16 @@ async def send_alert_notification(message: str):
     """Envoie une alerte Discord"""
     try:
         import os
-        import httpx
         
         webhook_url = os.getenv("DISCORD_WEBHOOK_URL")
         if not webhook_url:
             print(f"⚠️ Alert (no webhook): {message}")
             return
         
-        async with httpx.AsyncClient() as client:
-            await client.post(webhook_url, json={
-                "content": f"🚨 **ALERT BOT VOITURES**\n{message}"
-            })
+        client = await get_http_client()
+        await client.post(webhook_url, json={
+            "content": f"🚨 **ALERT BOT VOITURES**\n{message}"
+        })
         print(f"📢 Alert sent: {message}")
     except Exception as e:
         print(f"⚠️ Failed to send alert: {e}")
@@ -459,6 +459,7 @@ async def run_loop(interval_sec: int = 60, dry_run: bool = False):
                     break
                 await asyncio.sleep(1)
     
+    await close_http_client()
     print("👋 Loop stopped")
 
 
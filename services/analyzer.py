@@ -2,15 +2,77 @@
 Analyzer Service - Analyse avancée des annonces
 """
 
+import logging
+import os
 import re
-from typing import List, Optional, Dict, Tuple
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, List, Optional, Dict, Tuple
 from datetime import datetime
 
 from models.annonce import Annonce
 from config import VEHICULES_CIBLES, MOTS_CLES_OPPORTUNITE, MOTS_CLES_EXCLUSION
-from utils.logger import get_logger
 
-logger = get_logger(__name__)
+logger = logging.getLogger(__name__)
+
+# Classifieur généré à la première analyse (voir _get_fused_classifier)
+_fused_classifier: Optional[Callable[[str], Tuple[List, List, List]]] = None
+
+
+def _build_fused_classifier(problemes_couts: Dict[str, Tuple[int, int]]) -> Callable:
+    """
+    Génère une fonction spécialisée pour les listes de mots-clés.
+    
+    Les constantes étant figées au démarrage, on émet un `if 'mot' in texte`
+    par mot-clé : un seul passage, sans itération de dict ni accès d'attribut.
+    """
+    lines = [
+        "def _fused(texte):",
+        "    problemes = []",
+        "    exclusions = []",
+        "    opportunites = []",
+    ]
+    for probleme, cout in problemes_couts.items():
+        lines.append(f"    if {probleme!r} in texte: problemes.append(({probleme!r}, {cout!r}))")
+    for mot in MOTS_CLES_EXCLUSION:
+        lines.append(f"    if {mot.lower()!r} in texte: exclusions.append({mot!r})")
+    for mot in MOTS_CLES_OPPORTUNITE:
+        lines.append(f"    if {mot.lower()!r} in texte: opportunites.append({mot!r})")
+    lines.append("    return problemes, exclusions, opportunites")
+    
+    namespace: Dict = {}
+    exec(compile("\n".join(lines), "<analyzer_fused>", "exec"), namespace)
+    return namespace["_fused"]
+
+
+def _get_fused_classifier() -> Callable[[str], Tuple[List, List, List]]:
+    """Retourne le classifieur fusionné (généré au premier appel)"""
+    global _fused_classifier
+    if _fused_classifier is None:
+        _fused_classifier = _build_fused_classifier(AnalyzerService.PROBLEMES_COUTS)
+    return _fused_classifier
+
+
+def _annonce_to_tuple(annonce: Annonce) -> Tuple:
+    """Sérialise les champs utiles à l'analyse (picklable, léger)"""
+    return (
+        annonce.url, annonce.source,
+        annonce.titre, annonce.description, annonce.prix, annonce.kilometrage,
+        annonce.annee, annonce.departement, annonce.carburant,
+        annonce.motorisation, list(annonce.images_urls),
+    )
+
+
+def _analyse_tuple(champs: Tuple) -> Dict:
+    """Analyse une annonce sérialisée (exécuté dans un processus worker)"""
+    (url, source, titre, description, prix, km, annee, dept, carburant,
+     motorisation, images_urls) = champs
+    annonce = Annonce(
+        url=url, source=source,
+        titre=titre, description=description, prix=prix, kilometrage=km,
+        annee=annee, departement=dept, carburant=carburant,
+        motorisation=motorisation, images_urls=images_urls,
+    )
+    return AnalyzerService().analyser(annonce)
 
 
 class AnalyzerService:
@@ -62,8 +124,11 @@ class AnalyzerService:
         
         texte = f"{annonce.titre or ''} {annonce.description or ''}".lower()
         
+        # Classification mots-clés en un seul passage
+        problemes, exclusions, opportunites = _get_fused_classifier()(texte)
+        
         # Détecter les problèmes
-        resultats["problemes_detectes"] = self._detecter_problemes(texte)
+        resultats["problemes_detectes"] = self._detecter_problemes(texte, problemes)
         resultats["cout_reparation_estime"] = self._estimer_couts(resultats["problemes_detectes"])
         
         # Extraire les contacts
@@ -73,21 +138,32 @@ class AnalyzerService:
         resultats["qualite_annonce"] = self._evaluer_qualite(annonce)
         
         # Détecter les alertes et opportunités
-        resultats["alertes"] = self._detecter_alertes(annonce, texte)
-        resultats["opportunites"] = self._detecter_opportunites(annonce, texte)
+        resultats["alertes"] = self._detecter_alertes(annonce, texte, exclusions)
+        resultats["opportunites"] = self._detecter_opportunites(annonce, texte, opportunites)
         
         return resultats
     
-    def _detecter_problemes(self, texte: str) -> List[Dict]:
-        """Détecte les problèmes mentionnés dans le texte"""
-        problemes = []
+    def analyser_batch(self, annonces: List[Annonce], max_workers: Optional[int] = None) -> List[Dict]:
+        """
+        Analyse un lot d'annonces en parallèle sur tous les CPU.
+        
+        L'analyse étant purement CPU (regex + chaînes), on répartit les
+        annonces sérialisées sur un pool de processus. Pour les appels
+        unitaires, utiliser `analyser`.
+        """
+        if not annonces:
+            return []
         
-        for probleme, (cout_min, cout_max) in self.PROBLEMES_COUTS.items():
-            if probleme in texte:
-                problemes.append({
-                    "type": probleme,
-                    "cout_estime": (cout_min, cout_max)
-                })
+        champs = [_annonce_to_tuple(a) for a in annonces]
+        with ProcessPoolExecutor(max_workers=max_workers or os.cpu_count()) as executor:
+            return list(executor.map(_analyse_tuple, champs, chunksize=64))
+    
+    def _detecter_problemes(self, texte: str, problemes_connus: List[Tuple[str, Tuple[int, int]]]) -> List[Dict]:
+        """Détecte les problèmes mentionnés dans le texte"""
+        problemes = [
+            {"type": probleme, "cout_estime": cout}
+            for probleme, cout in problemes_connus
+        ]
         
         # Patterns spécifiques
         patterns_problemes = [
@@ -174,14 +250,10 @@ class AnalyzerService:
         
         return max(0, min(100, score))
     
-    def _detecter_alertes(self, annonce: Annonce, texte: str) -> List[str]:
+    def _detecter_alertes(self, annonce: Annonce, texte: str, exclusions: List[str]) -> List[str]:
         """Détecte les alertes (points négatifs)"""
-        alertes = []
-        
         # Mots-clés d'exclusion
-        for mot in MOTS_CLES_EXCLUSION:
-            if mot.lower() in texte:
-                alertes.append(f"⚠️ Mot-clé exclusion: '{mot}'")
+        alertes = [f"⚠️ Mot-clé exclusion: '{mot}'" for mot in exclusions]
         
         # Prix trop bas (arnaque potentielle?)
         if annonce.prix and annonce.prix < 1000:
@@ -204,14 +276,10 @@ class AnalyzerService:
         
         return alertes
     
-    def _detecter_opportunites(self, annonce: Annonce, texte: str) -> List[str]:
+    def _detecter_opportunites(self, annonce: Annonce, texte: str, mots_cles: List[str]) -> List[str]:
         """Détecte les opportunités (points positifs)"""
-        opportunites = []
-        
         # Mots-clés opportunité
-        for mot in MOTS_CLES_OPPORTUNITE:
-            if mot.lower() in texte:
-                opportunites.append(f"✅ Mot-clé opportunité: '{mot}'")
+        opportunites = [f"✅ Mot-clé opportunité: '{mot}'" for mot in mots_cles]
         
         # Vente urgente
         if any(u in texte for u in ["urgent", "vite", "rapide", "départ"]):
@@ -8,34 +8,139 @@ Keywords Service - Matching mots-clés avec regex normalisé
 
 from __future__ import annotations
 
+import logging
 import re
 import unicodedata
+from functools import lru_cache
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any, Optional
+from typing import Any, Hashable, Optional
 
-import yaml
+try:
+    import hyperscan  # Optionnel: DFA multi-patterns SIMD
+except ImportError:
+    hyperscan = None
 
-from config.settings import CONFIG_DIR
+try:
+    import ahocorasick  # Optionnel: sous-chaînes multi-motifs en une passe
+except ImportError:
+    ahocorasick = None
+
+from config.settings import load_yaml_config
+
+logger = logging.getLogger(__name__)
+
+# Table de translittération des lettres accentuées courantes (FR + latin-1)
+_ACCENTED_CHARS = "àâäáãåçéèêëíìîïñóòôöõúùûüýÿ"
+_ACCENT_TABLE = str.maketrans({
+    c: unicodedata.normalize("NFD", c)[0]
+    for c in _ACCENTED_CHARS + _ACCENTED_CHARS.upper()
+})
+
+# Ponctuation ramenée à un espace avant le matching
+_PUNCT_TO_SPACE = str.maketrans({"'": " ", "-": " ", ":": " ", "/": " "})
+
+# Accents + ponctuation en une seule passe
+_NORMALIZE_TABLE = {**_ACCENT_TABLE, **_PUNCT_TO_SPACE}
+
+_WORD_RE = re.compile(r"\w+")
+
+# Métacaractères signalant un pattern YAML déjà écrit en regex
+_REGEX_META_RE = re.compile(r"[\\.*+?\[\](){}|^$]")
+_BOUNDARY_HEAD = (r"\b", "^")
+_BOUNDARY_TAIL = (r"\b", "$")
+
+# Rang des sévérités (les valeurs inconnues valent 0)
+_SEVERITY_RANK = {"low": 0, "medium": 1, "high": 2, "critical": 3}
+
+
+@lru_cache(maxsize=4096)
+def _pattern_source(pattern: str) -> str:
+    """
+    Source regex finale d'un pattern YAML: normalisé (sans accents),
+    échappé s'il ne contient aucun métacaractère, borné par \\b.
+    """
+    normalized = remove_accents(pattern.lower())
+    
+    # Échapper les caractères spéciaux regex (sauf ceux déjà dans le pattern)
+    if _REGEX_META_RE.search(pattern) is None:
+        normalized = re.escape(normalized)
+    
+    # Ajouter frontières de mots si pas déjà présentes
+    if not normalized.startswith(_BOUNDARY_HEAD):
+        normalized = r"\b" + normalized
+    if not normalized.endswith(_BOUNDARY_TAIL):
+        normalized = normalized + r"\b"
+    
+    return normalized
+
+
+# Variantes ajoutées par KeywordMatcher._add_common_variants,
+# compilées une seule fois à l'import du module
+
+# Variantes CT (contrôle technique) - plus permissif
+_CT_OK_PATTERNS = tuple(re.compile(p, re.IGNORECASE) for p in [
+    r"\bct\s*(ok|vierge|recent|neuf|valide|fait|passe)\b",
+    r"\bcontrole\s*technique\s*(ok|vierge|recent|neuf|valide|fait|passe)\b",
+    r"\bct\s*[:\-]?\s*(ok|vierge|recent)\b",
+    r"\bct\s*ok\b",
+    r"\bctok\b",
+    r"\bc\.?t\.?\s*(ok|vierge)\b",
+])
+
+# Variantes urgence (plus permissif)
+_URGENT_PATTERNS = tuple(re.compile(p, re.IGNORECASE) for p in [
+    r"\burgent\w*\b",  # urgent, urgente, etc.
+    r"\bvente\s*(urgente|rapide)\b",
+    r"\bdoit\s+partir\b",
+    r"\ba\s+saisir\b",
+    r"\boccasion\s+a\s+saisir\b",
+    r"\bdemenagement\b",
+])
+
+# Variantes négociable
+_NEGO_PATTERNS = tuple(re.compile(p, re.IGNORECASE) for p in [
+    r"\bnego(ciable)?\b",
+    r"\ba\s+debattre\b",
+    r"\bprix\s+a\s+discuter\b",
+    r"\bouvert\s+(aux\s+)?propositions?\b",
+])
+
+# Variantes risques - moteur
+_MOTEUR_RISK_PATTERNS = tuple(re.compile(p, re.IGNORECASE) for p in [
+    r"\bmoteur\s*(hs|mort|casse|a\s+refaire)\b",
+    r"\bne\s+(demarre|roule)\s+(plus|pas)\b",
+    r"\bpour\s+pieces\b",
+])
+
+# Variantes risques - CT refusé (patterns plus permissifs)
+_CT_RISK_PATTERNS = tuple(re.compile(p, re.IGNORECASE) for p in [
+    r"\bct\s*(refuse|refus|a\s*faire|expire)\b",
+    r"\bcontre\s*visite\b",
+    r"\bcontrevisite\b",
+    r"\bsans\s+ct\b",
+    r"\bct\s+expire\b",
+])
 
 
 def load_keywords_config() -> dict[str, Any]:
     """Charge la config des mots-clés"""
-    path = CONFIG_DIR / "keywords.yaml"
-    if path.exists():
-        with open(path, "r", encoding="utf-8") as f:
-            return yaml.safe_load(f) or {}
-    return {}
+    return load_yaml_config("keywords.yaml")
 
 
 def remove_accents(text: str) -> str:
     """Supprime les accents d'un texte"""
     if not text:
         return ""
+    text = text.translate(_ACCENT_TABLE)
+    if text.isascii():
+        return text
+    # Caractères hors table: décomposition NFD + suppression des diacritiques
     normalized = unicodedata.normalize("NFD", text)
     return "".join(c for c in normalized if unicodedata.category(c) != "Mn")
 
 
+@lru_cache(maxsize=8192)
 def normalize_text(text: str) -> str:
     """
     Normalise un texte pour le matching:
@@ -43,29 +148,124 @@ def normalize_text(text: str) -> str:
     - accents supprimés
     - ponctuation normalisée
     - espaces multiples → simple
+    
+    Mis en cache: une même annonce est normalisée par plusieurs appels.
     """
     if not text:
         return ""
     
-    text = text.lower()
-    text = remove_accents(text)
+    # Minuscules + accents + ponctuation normalisée (une seule passe C)
+    text = text.lower().translate(_NORMALIZE_TABLE)
+    if not text.isascii():
+        text = remove_accents(text)
     
-    # Normaliser certains caractères
-    text = text.replace("'", " ")
-    text = text.replace("-", " ")
-    text = text.replace(":", " ")
-    text = text.replace("/", " ")
+    # Ponctuation supprimée + espaces normalisés: ne garder que les
+    # suites lettres/chiffres, séparées par un espace simple
+    return " ".join(_WORD_RE.findall(text))
+
+
+class SubstringScanner:
+    """
+    Recherche de sous-chaînes multi-motifs (sémantique de `motif in texte`).
     
-    # Supprimer la ponctuation mais garder les lettres/chiffres/espaces
-    text = re.sub(r"[^\w\s]", " ", text)
+    groups: {clé: [motifs]} (motifs mis en minuscules). Chaque clé reçoit un
+    bit (ordre de groups): find_mask(texte) retourne le masque des clés dont
+    au moins un motif apparaît dans le texte, find(texte) l'ensemble des clés.
+    Une passe avec un automate Aho-Corasick si pyahocorasick est installé,
+    sinon un str.find par motif distinct (recherche C de CPython avec table
+    de saut, plus rapide qu'une alternance regex testée à chaque position).
+    find_split(texte, cut) sépare en plus les clés trouvées dans texte[:cut]
+    (plusieurs textes imbriqués analysés en un seul parcours).
+    Textes et motifs restent en str: le texte français tient déjà sur un
+    octet par caractère (PEP 393), et un encodage en bytes par texte coûte
+    plus que ce que bytes.find fait gagner.
+    """
     
-    # Normaliser les espaces
-    text = re.sub(r"\s+", " ", text).strip()
+    __slots__ = ("_keys", "_bits", "_always", "_automaton", "_patterns")
     
-    return text
+    def __init__(self, groups: dict[Hashable, Any]):
+        self._keys: tuple[Hashable, ...] = tuple(groups)
+        self._bits: dict[Hashable, int] = {key: 1 << i for i, key in enumerate(self._keys)}
+        
+        masks: dict[str, int] = {}
+        always = 0
+        for key, patterns in groups.items():
+            bit = self._bits[key]
+            for pattern in patterns:
+                pattern = pattern.lower()
+                if pattern:
+                    masks[pattern] = masks.get(pattern, 0) | bit
+                else:
+                    always |= bit  # "" in texte est toujours vrai
+        
+        self._always = always
+        self._automaton = None
+        self._patterns: tuple[tuple[str, int], ...] = ()
+        if not masks:
+            return
+        
+        if ahocorasick is not None:
+            self._automaton = ahocorasick.Automaton()
+            for pattern, mask in masks.items():
+                self._automaton.add_word(pattern, mask)
+            self._automaton.make_automaton()
+            return
+        
+        self._patterns = tuple(masks.items())
+    
+    def bit(self, key: Hashable) -> int:
+        """Bit de la clé dans les masques (0 si inconnue)"""
+        return self._bits.get(key, 0)
+    
+    def keys_of(self, mask: int) -> set[Hashable]:
+        """Clés correspondant aux bits du masque"""
+        keys = set()
+        while mask:
+            low = mask & -mask
+            keys.add(self._keys[low.bit_length() - 1])
+            mask ^= low
+        return keys
+    
+    def find_mask(self, text: str) -> int:
+        """Masque des clés dont un motif est présent dans text (déjà en minuscules)"""
+        found = self._always
+        if self._automaton is not None:
+            for _, mask in self._automaton.iter(text):
+                found |= mask
+        else:
+            for pattern, mask in self._patterns:
+                if pattern in text:
+                    found |= mask
+        return found
+    
+    def find_split_mask(self, text: str, cut: int) -> tuple[int, int]:
+        """(masque pour text[:cut], masque pour text), une passe"""
+        head = found = self._always
+        if self._automaton is not None:
+            for end, mask in self._automaton.iter(text):
+                found |= mask
+                if end < cut:
+                    head |= mask
+        else:
+            for pattern, mask in self._patterns:
+                if text.find(pattern, 0, cut) != -1:
+                    head |= mask
+                    found |= mask
+                elif pattern in text:
+                    found |= mask
+        return head, found
+    
+    def find(self, text: str) -> set[Hashable]:
+        """Clés dont un motif est présent dans text (déjà en minuscules)"""
+        return self.keys_of(self.find_mask(text))
+    
+    def find_split(self, text: str, cut: int) -> tuple[set[Hashable], set[Hashable]]:
+        """(clés présentes dans text[:cut], clés présentes dans text), une passe"""
+        head, found = self.find_split_mask(text, cut)
+        return self.keys_of(head), self.keys_of(found)
 
 
-@dataclass
+@dataclass(slots=True)
 class KeywordMatch:
     """Résultat d'un match de mot-clé"""
     keyword_id: str
@@ -78,7 +278,20 @@ class KeywordMatch:
     description: str = ""
 
 
-@dataclass 
+@dataclass
+class KeywordAnalysis:
+    """Résultat agrégé d'une analyse mots-clés (une seule normalisation)"""
+    bonus: int = 0
+    penalty: int = 0
+    cost: int = 0
+    opportunity_ids: list[str] = field(default_factory=list)
+    risk_ids: list[str] = field(default_factory=list)
+    max_severity: str = "none"
+    excluded: bool = False
+    exclusion_reason: str = ""
+
+
+@dataclass(slots=True)
 class CompiledKeyword:
     """Mot-clé compilé avec ses variantes regex"""
     keyword_id: str
@@ -109,7 +322,29 @@ class KeywordMatcher:
         self._risque: list[CompiledKeyword] = []
         self._exclusions: list[re.Pattern] = []
         
+        # Cache source normalisée -> pattern compilé (partagé entre catégories)
+        self._pattern_cache: dict[str, re.Pattern] = {
+            p.pattern: p
+            for p in (
+                *_CT_OK_PATTERNS, *_URGENT_PATTERNS, *_NEGO_PATTERNS,
+                *_MOTEUR_RISK_PATTERNS, *_CT_RISK_PATTERNS,
+            )
+        }
+        
         self._compile_keywords()
+        
+        # Une regex unique par catégorie (groupes nommés -> index du mot-clé)
+        self._opportunite_regex, self._opportunite_groups = self._build_category_regex(
+            self._opportunite, "op"
+        )
+        self._risque_regex, self._risque_groups = self._build_category_regex(
+            self._risque, "rk"
+        )
+        self._exclusion_regex = self._build_union_regex(self._exclusions)
+        
+        # Base Hyperscan par catégorie si disponible (sinon regex `re` ci-dessus)
+        self._opportunite_hs = self._build_hyperscan_db(self._opportunite)
+        self._risque_hs = self._build_hyperscan_db(self._risque)
     
     def _compile_keywords(self):
         """Compile tous les patterns regex"""
@@ -148,170 +383,279 @@ class KeywordMatcher:
     def _build_patterns(self, raw_patterns: list[str]) -> list[re.Pattern]:
         """
         Construit des patterns regex avec frontières de mots.
-        Les patterns sont normalisés (sans accents).
+        Les patterns sont normalisés (sans accents) et dédupliqués : une même
+        source n'est compilée qu'une fois pour tout le matcher.
         """
         compiled = []
+        seen = set()
+        cache = self._pattern_cache
         for pattern in raw_patterns:
-            # Normaliser le pattern
-            normalized = remove_accents(pattern.lower())
-            
-            # Échapper les caractères spéciaux regex (sauf ceux déjà dans le pattern)
-            if not any(c in pattern for c in r"\.*+?[](){}|^$"):
-                normalized = re.escape(normalized)
+            normalized = _pattern_source(pattern)
+            if normalized in seen:
+                continue
+            seen.add(normalized)
             
-            # Ajouter frontières de mots si pas déjà présentes
-            if not normalized.startswith(r"\b") and not normalized.startswith("^"):
-                normalized = r"\b" + normalized
-            if not normalized.endswith(r"\b") and not normalized.endswith("$"):
-                normalized = normalized + r"\b"
+            cached = cache.get(normalized)
+            if cached is not None:
+                compiled.append(cached)
+                continue
             
             try:
-                compiled.append(re.compile(normalized, re.IGNORECASE))
+                cached = cache[normalized] = re.compile(normalized, re.IGNORECASE)
+                compiled.append(cached)
             except re.error as e:
-                print(f"⚠️ Invalid regex pattern '{pattern}': {e}")
+                logger.warning("Invalid regex pattern %r: %s", pattern, e)
         
         return compiled
     
     def _add_common_variants(self):
         """Ajoute des variantes courantes automatiquement"""
         
-        # Variantes CT (contrôle technique) - plus permissif
-        ct_patterns = [
-            r"\bct\s*(ok|vierge|recent|neuf|valide|fait|passe)\b",
-            r"\bcontrole\s*technique\s*(ok|vierge|recent|neuf|valide|fait|passe)\b",
-            r"\bct\s*[:\-]?\s*(ok|vierge|recent)\b",
-            r"\bct\s*ok\b",
-            r"\bctok\b",
-            r"\bc\.?t\.?\s*(ok|vierge)\b",
-        ]
-        
         # Vérifier si pas déjà présent
         existing_ids = {kw.keyword_id for kw in self._opportunite}
         if "ct_ok" not in existing_ids:
             self._opportunite.append(CompiledKeyword(
                 keyword_id="ct_ok",
                 category="opportunite",
-                patterns=[re.compile(p, re.IGNORECASE) for p in ct_patterns],
+                patterns=list(_CT_OK_PATTERNS),
                 bonus=8,
                 description="CT OK/vierge/récent"
             ))
         
-        # Variantes urgence (plus permissif)
-        urgent_patterns = [
-            r"\burgent\w*\b",  # urgent, urgente, etc.
-            r"\bvente\s*(urgente|rapide)\b",
-            r"\bdoit\s+partir\b",
-            r"\ba\s+saisir\b",
-            r"\boccasion\s+a\s+saisir\b",
-            r"\bdemenagement\b",
-        ]
         if "urgent_vente" not in existing_ids:
             self._opportunite.append(CompiledKeyword(
                 keyword_id="urgent_vente",
                 category="opportunite",
-                patterns=[re.compile(p, re.IGNORECASE) for p in urgent_patterns],
+                patterns=list(_URGENT_PATTERNS),
                 bonus=10,
                 description="Vente urgente/rapide"
             ))
         
-        # Variantes négociable
-        nego_patterns = [
-            r"\bnego(ciable)?\b",
-            r"\ba\s+debattre\b",
-            r"\bprix\s+a\s+discuter\b",
-            r"\bouvert\s+(aux\s+)?propositions?\b",
-        ]
         if "negociable" not in existing_ids:
             self._opportunite.append(CompiledKeyword(
                 keyword_id="negociable",
                 category="opportunite",
-                patterns=[re.compile(p, re.IGNORECASE) for p in nego_patterns],
+                patterns=list(_NEGO_PATTERNS),
                 bonus=5,
                 description="Prix négociable"
             ))
         
-        # Variantes risques - moteur
-        moteur_risk_patterns = [
-            r"\bmoteur\s*(hs|mort|casse|a\s+refaire)\b",
-            r"\bne\s+(demarre|roule)\s+(plus|pas)\b",
-            r"\bpour\s+pieces\b",
-        ]
         existing_risk_ids = {kw.keyword_id for kw in self._risque}
         if "moteur_hs" not in existing_risk_ids:
             self._risque.append(CompiledKeyword(
                 keyword_id="moteur_hs",
                 category="risque",
-                patterns=[re.compile(p, re.IGNORECASE) for p in moteur_risk_patterns],
+                patterns=list(_MOTEUR_RISK_PATTERNS),
                 penalty=-30,
                 cost_estimate=2000,
                 severity="critical",
                 description="Moteur HS/cassé"
             ))
         
-        # Variantes risques - CT refusé (patterns plus permissifs)
-        ct_risk_patterns = [
-            r"\bct\s*(refuse|refus|a\s*faire|expire)\b",
-            r"\bcontre\s*visite\b",
-            r"\bcontrevisite\b",
-            r"\bsans\s+ct\b",
-            r"\bct\s+expire\b",
-        ]
         if "ct_refuse" not in existing_risk_ids:
             self._risque.append(CompiledKeyword(
                 keyword_id="ct_refuse",
                 category="risque",
-                patterns=[re.compile(p, re.IGNORECASE) for p in ct_risk_patterns],
+                patterns=list(_CT_RISK_PATTERNS),
                 penalty=-15,
                 cost_estimate=400,
                 severity="medium",
                 description="CT refusé/à faire"
             ))
     
-    def find_matches(self, text: str) -> tuple[list[KeywordMatch], list[KeywordMatch]]:
+    @staticmethod
+    def _build_category_regex(
+        keywords: list[CompiledKeyword], prefix: str
+    ) -> tuple[Optional[re.Pattern], dict[str, int]]:
         """
-        Trouve tous les mots-clés dans un texte.
+        Fusionne toutes les variantes d'une catégorie en une seule regex.
         
-        Returns:
-            Tuple (opportunités, risques)
+        Chaque variante devient un groupe nommé `{prefix}_{kw}_{variante}`.
+        L'alternance est enveloppée dans un lookahead (match de largeur nulle)
+        pour que `finditer` teste chaque position sans consommer le texte.
         """
-        if not text:
-            return [], []
+        alternatives = []
+        groups: dict[str, int] = {}
+        for kw_index, kw in enumerate(keywords):
+            for pattern_index, pattern in enumerate(kw.patterns):
+                name = f"{prefix}_{kw_index}_{pattern_index}"
+                alternatives.append(f"(?P<{name}>{pattern.pattern})")
+                groups[name] = kw_index
         
-        # Normaliser le texte
-        normalized = normalize_text(text)
+        if not alternatives:
+            return None, groups
+        return re.compile("(?=" + "|".join(alternatives) + ")", re.IGNORECASE), groups
+    
+    @staticmethod
+    def _build_hyperscan_db(keywords: list[CompiledKeyword]) -> Optional[Any]:
+        """
+        Compile toutes les variantes d'une catégorie en une base Hyperscan.
         
-        opportunities = []
-        risks = []
+        L'id de chaque expression est l'index du mot-clé. Retourne None si
+        hyperscan n'est pas installé ou refuse un des patterns.
+        """
+        if hyperscan is None:
+            return None
         
-        # Chercher les opportunités
-        for kw in self._opportunite:
+        expressions = []
+        ids = []
+        for kw_index, kw in enumerate(keywords):
             for pattern in kw.patterns:
-                match = pattern.search(normalized)
-                if match:
-                    opportunities.append(KeywordMatch(
-                        keyword_id=kw.keyword_id,
-                        category="opportunite",
-                        matched_text=match.group(0),
-                        bonus=kw.bonus,
-                        description=kw.description
-                    ))
-                    break  # Un seul match par keyword
-        
-        # Chercher les risques
-        for kw in self._risque:
+                expressions.append(pattern.pattern.encode("utf-8"))
+                ids.append(kw_index)
+        
+        if not expressions:
+            return None
+        
+        # \b et \w en mode ASCII: Hyperscan peut sur-détecter autour des
+        # lettres non ASCII, chaque candidat est revérifié avec `re`
+        flags = hyperscan.HS_FLAG_CASELESS | hyperscan.HS_FLAG_UTF8
+        db = hyperscan.Database()
+        try:
+            db.compile(
+                expressions=expressions,
+                ids=ids,
+                elements=len(expressions),
+                flags=[flags] * len(expressions),
+            )
+        except hyperscan.error:
+            return None
+        return db
+    
+    @staticmethod
+    def _build_union_regex(patterns: list[re.Pattern]) -> Optional[re.Pattern]:
+        """Fusionne une liste de patterns en une seule alternance"""
+        if not patterns:
+            return None
+        return re.compile("|".join(f"(?:{p.pattern})" for p in patterns), re.IGNORECASE)
+    
+    @staticmethod
+    def _scan_category(
+        normalized: str,
+        regex: Optional[re.Pattern],
+        groups: dict[str, int],
+        keywords: list[CompiledKeyword],
+        hs_db: Optional[Any] = None,
+    ) -> list[tuple[CompiledKeyword, str]]:
+        """
+        Parcourt le texte une seule fois avec la regex de catégorie
+        (ou la base Hyperscan si disponible) pour trouver les mots-clés
+        présents.
+        
+        Le texte matché est ensuite celui de la première variante de la
+        config qui matche (comme une recherche variante par variante),
+        pas celui de la variante la plus tôt dans le texte.
+        
+        Returns:
+            Liste (mot-clé, texte matché), un seul match par mot-clé,
+            dans l'ordre de la config.
+        """
+        hits: set[int] = set()
+        if hs_db is not None:
+            hs_db.scan(
+                normalized.encode("utf-8"),
+                match_event_handler=lambda kw_index, start, end, flags, ctx: hits.add(kw_index),
+            )
+        elif regex is not None:
+            for m in regex.finditer(normalized):
+                kw_index = groups[m.lastgroup]
+                hits.add(kw_index)
+                
+                # L'alternance ne rapporte que la première variante qui matche à
+                # cette position: vérifier les mots-clés suivants au même endroit
+                pos = m.start()
+                for other_index in range(kw_index + 1, len(keywords)):
+                    if other_index in hits:
+                        continue
+                    for pattern in keywords[other_index].patterns:
+                        if pattern.match(normalized, pos):
+                            hits.add(other_index)
+                            break
+                
+                if len(hits) == len(keywords):
+                    break
+        
+        # Texte matché via `re`, uniquement pour les mots-clés présents
+        # (revérifie aussi les candidats Hyperscan)
+        results = []
+        for kw_index in sorted(hits):
+            kw = keywords[kw_index]
             for pattern in kw.patterns:
                 match = pattern.search(normalized)
                 if match:
-                    risks.append(KeywordMatch(
-                        keyword_id=kw.keyword_id,
-                        category="risque",
-                        matched_text=match.group(0),
-                        penalty=kw.penalty,
-                        cost_estimate=kw.cost_estimate,
-                        severity=kw.severity,
-                        description=kw.description
-                    ))
+                    results.append((kw, match.group(0)))
+                    break
+        return results
+    
+    def _present_keywords(
+        self,
+        normalized: str,
+        keywords: list[CompiledKeyword],
+        hs_db: Optional[Any] = None,
+    ) -> list[CompiledKeyword]:
+        """
+        Mots-clés présents dans le texte, dans l'ordre de la config.
+        
+        Sans texte matché à rapporter, un search par variante (préfixes
+        littéraux optimisés par `re`) est plus rapide que la regex de
+        catégorie en lookahead, testée à chaque position du texte.
+        """
+        if hs_db is not None:
+            return [kw for kw, _ in self._scan_category(normalized, None, {}, keywords, hs_db)]
+        
+        present = []
+        for kw in keywords:
+            for pattern in kw.patterns:
+                if pattern.search(normalized):
+                    present.append(kw)
                     break
+        return present
+    
+    def find_matches(self, text: str) -> tuple[list[KeywordMatch], list[KeywordMatch]]:
+        """
+        Trouve tous les mots-clés dans un texte.
+        
+        Returns:
+            Tuple (opportunités, risques)
+        """
+        if not text:
+            return [], []
+        
+        return self._find_matches_normalized(normalize_text(text))
+    
+    def _find_matches_normalized(
+        self, normalized: str
+    ) -> tuple[list[KeywordMatch], list[KeywordMatch]]:
+        """find_matches sur un texte déjà normalisé"""
+        opportunities = [
+            KeywordMatch(
+                keyword_id=kw.keyword_id,
+                category="opportunite",
+                matched_text=matched_text,
+                bonus=kw.bonus,
+                description=kw.description
+            )
+            for kw, matched_text in self._scan_category(
+                normalized, self._opportunite_regex, self._opportunite_groups,
+                self._opportunite, self._opportunite_hs
+            )
+        ]
+        
+        risks = [
+            KeywordMatch(
+                keyword_id=kw.keyword_id,
+                category="risque",
+                matched_text=matched_text,
+                penalty=kw.penalty,
+                cost_estimate=kw.cost_estimate,
+                severity=kw.severity,
+                description=kw.description
+            )
+            for kw, matched_text in self._scan_category(
+                normalized, self._risque_regex, self._risque_groups,
+                self._risque, self._risque_hs
+            )
+        ]
         
         return opportunities, risks
     
@@ -325,8 +669,17 @@ class KeywordMatcher:
         if not text:
             return False, ""
         
-        normalized = normalize_text(text)
+        return self._is_excluded_normalized(normalize_text(text))
+    
+    def _is_excluded_normalized(self, normalized: str) -> tuple[bool, str]:
+        """is_excluded sur un texte déjà normalisé"""
+        if self._exclusion_regex is None:
+            return False, ""
+        
+        if not self._exclusion_regex.search(normalized):
+            return False, ""
         
+        # Raison = premier pattern de la config qui matche (comme avant la fusion)
         for pattern in self._exclusions:
             match = pattern.search(normalized)
             if match:
@@ -341,28 +694,69 @@ class KeywordMatcher:
         Returns:
             (bonus_total, penalty_total, cost_estimate, opportunity_ids, risk_ids)
         """
-        opportunities, risks = self.find_matches(text)
+        analysis = self.analyze(text, stop_on_exclusion=False)
+        return (analysis.bonus, analysis.penalty, analysis.cost,
+                analysis.opportunity_ids, analysis.risk_ids)
+    
+    def get_severity_max(self, text: str) -> str:
+        """Retourne la sévérité maximale des risques détectés"""
+        return self.analyze(text, stop_on_exclusion=False).max_severity
+    
+    def analyze(self, text: str, stop_on_exclusion: bool = True) -> KeywordAnalysis:
+        """
+        Analyse complète d'un texte: normalisation unique puis
+        exclusions, opportunités et risques.
+        
+        Par défaut, un texte exclu est rejeté tout de suite (scores à zéro)
+        sans scanner opportunités ni risques.
+        """
+        if not text:
+            return KeywordAnalysis()
         
-        bonus_total = sum(m.bonus for m in opportunities)
-        penalty_total = sum(m.penalty for m in risks)  # Déjà négatif
-        cost_estimate = sum(m.cost_estimate for m in risks)
+        return self._analyze_normalized(normalize_text(text), stop_on_exclusion)
+    
+    def analyze_many(self, texts: list[str]) -> list[KeywordAnalysis]:
+        """
+        Analyse un lot de textes (même résultat que `analyze` sur chacun).
         
-        opportunity_ids = [m.keyword_id for m in opportunities]
-        risk_ids = [m.keyword_id for m in risks]
+        Normalise tout le lot d'abord, puis enchaîne les scans dans une
+        boucle serrée avec les méthodes liées en variables locales.
+        """
+        normalize = normalize_text
+        normalized_texts = [normalize(t) if t else "" for t in texts]
         
-        return bonus_total, penalty_total, cost_estimate, opportunity_ids, risk_ids
+        analyze_normalized = self._analyze_normalized
+        return [
+            analyze_normalized(normalized) if normalized else KeywordAnalysis()
+            for normalized in normalized_texts
+        ]
     
-    def get_severity_max(self, text: str) -> str:
-        """Retourne la sévérité maximale des risques détectés"""
-        _, risks = self.find_matches(text)
+    def _analyze_normalized(
+        self, normalized: str, stop_on_exclusion: bool = True
+    ) -> KeywordAnalysis:
+        """analyze sur un texte déjà normalisé"""
+        excluded, exclusion_reason = self._is_excluded_normalized(normalized)
+        analysis = KeywordAnalysis(excluded=excluded, exclusion_reason=exclusion_reason)
+        if excluded and stop_on_exclusion:
+            return analysis
         
-        if not risks:
-            return "none"
+        # Cumuls directs sur les mots-clés compilés (pas de KeywordMatch)
+        for kw in self._present_keywords(normalized, self._opportunite, self._opportunite_hs):
+            analysis.bonus += kw.bonus
+            analysis.opportunity_ids.append(kw.keyword_id)
         
-        severity_order = {"low": 0, "medium": 1, "high": 2, "critical": 3}
-        max_severity = max(risks, key=lambda r: severity_order.get(r.severity, 0))
+        # Risques: cumuls + sévérité max (rang entier courant) en une boucle
+        max_rank = -1
+        for kw in self._present_keywords(normalized, self._risque, self._risque_hs):
+            analysis.penalty += kw.penalty  # Déjà négatif
+            analysis.cost += kw.cost_estimate
+            analysis.risk_ids.append(kw.keyword_id)
+            rank = _SEVERITY_RANK.get(kw.severity, 0)
+            if rank > max_rank:
+                max_rank = rank
+                analysis.max_severity = kw.severity
         
-        return max_severity.severity
+        return analysis
 
 
 # Instance globale
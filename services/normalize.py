@@ -10,8 +10,61 @@ import unicodedata
 from datetime import datetime
 from typing import Optional, Tuple
 
+try:
+    import ahocorasick  # Optionnel: détection des marques en une passe
+except ImportError:
+    ahocorasick = None
+
 from models.enums import Carburant, Boite, SellerType
 
+# Table de translittération des lettres accentuées courantes (FR + latin-1)
+_ACCENTED_CHARS = "àâäáãåçéèêëíìîïñóòôöõúùûüýÿ"
+_ACCENT_TABLE = str.maketrans({
+    c: unicodedata.normalize("NFD", c)[0]
+    for c in _ACCENTED_CHARS + _ACCENTED_CHARS.upper()
+})
+
+# Séparateurs possibles dans un nombre capturé par _PRICE_PATTERN / _KM_PATTERN
+# (\s unicode, espaces insécables, points, virgules): supprimés en une passe C
+_DIGIT_SEPARATORS = str.maketrans("", "", ".,\u202f\u00a0" + "".join(
+    c for c in map(chr, range(0x3001)) if c.isspace()
+))
+
+# Séparateur de milliers "," -> espace (format français)
+_THOUSANDS_TO_SPACE = str.maketrans(",", " ")
+
+
+def _build_marque_automaton(marques: list[str]):
+    """Automate Aho-Corasick marque (minuscules) -> index dans la liste"""
+    if ahocorasick is None:
+        return None
+    automaton = ahocorasick.Automaton()
+    for index, marque in enumerate(marques):
+        automaton.add_word(marque.lower(), index)
+    automaton.make_automaton()
+    return automaton
+
+
+def _build_modele_regex(modeles) -> re.Pattern:
+    """
+    Alternance de tous les modèles connus, matchant un mot entier du titre.
+    
+    Reproduit la comparaison mot par mot (mot sans caractères non
+    alphanumériques == modèle): ces caractères sont tolérés partout dans
+    le mot. Les modèles non alphanumériques (ex: "C-Max") ne pouvaient
+    jamais matcher et sont ignorés.
+    """
+    filler = r"[^a-zA-Z0-9\s]*"
+    alternatives = [
+        filler.join(re.escape(c) for c in modele)
+        for modele in modeles
+        if modele.isalnum() and modele.isascii()
+    ]
+    return re.compile(
+        rf"(?<!\S){filler}({'|'.join(alternatives)}){filler}(?!\S)",
+        re.IGNORECASE,
+    )
+
 
 class NormalizeService:
     """Service de normalisation des données d'annonces"""
@@ -25,6 +78,26 @@ class NormalizeService:
     _DEPT_PATTERN = re.compile(r"\b(\d{2})\d{3}\b|\((\d{2})\)")
     _PHONE_PATTERN = re.compile(r"(?:0|\+33)[1-9](?:[\s.-]?\d{2}){4}")
     _POWER_PATTERN = re.compile(r"(\d{2,3})\s*(?:ch|cv|hp)", re.IGNORECASE)
+    # Type de vendeur (mots entiers: "pro" ne matche pas "propre")
+    _PRO_RE = re.compile(
+        r"\b(professionnel|pro|garage|concessionnaire|marchand|négociant|société|sarl|sas|eurl)\b",
+        re.IGNORECASE,
+    )
+    _PART_RE = re.compile(r"\b(particulier|privé|private|owner)\b", re.IGNORECASE)
+    _CP_RE = re.compile(r"\b(\d{5})\b")
+    _PAREN_DEPT_RE = re.compile(r"\((\d{2})\)")
+    _NONDIGIT_RE = re.compile(r"[^\d]")
+    _NONALNUM_LOWER_RE = re.compile(r"[^a-z0-9]")
+    _NONALNUM_RE = re.compile(r"[^a-zA-Z0-9]")
+    _PHONE_SEP_RE = re.compile(r"[\s.-]")
+    _MODELE_STRIP1_RE = re.compile(r"\d+\.\d+\s*(hdi|dci|tdi|vti|tce|dti|cdti|jtd).*", re.IGNORECASE)
+    _MODELE_STRIP2_RE = re.compile(r"\d+\s*(ch|cv).*", re.IGNORECASE)
+    # Motorisation, par ordre de priorité
+    _MOTOR_PATTERNS = (
+        re.compile(r"(\d+\.\d+)\s*(hdi|dci|tdi|vti|tce|dti|cdti|jtd|d-4d|bluehdi|blue\s*hdi)", re.IGNORECASE),
+        re.compile(r"(\d+\.\d+)\s*(l|litres?)?", re.IGNORECASE),
+        re.compile(r"(\d{2,3})\s*(ch|cv|hp)", re.IGNORECASE),
+    )
     
     def __init__(self):
         pass
@@ -36,20 +109,19 @@ class NormalizeService:
         if not text:
             return ""
         
-        # Minuscules
-        text = text.lower().strip()
-        
-        # Normaliser les espaces
-        text = re.sub(r"\s+", " ", text)
-        
-        return text
+        # Minuscules + espaces normalisés (split/join: une passe C, sans regex)
+        return " ".join(text.lower().split())
     
     def remove_accents(self, text: str) -> str:
         """Supprime les accents d'un texte"""
         if not text:
             return ""
         
-        # Décomposition NFD + suppression des marques diacritiques
+        text = text.translate(_ACCENT_TABLE)
+        if text.isascii():
+            return text
+        
+        # Caractères hors table: décomposition NFD + suppression des marques diacritiques
         normalized = unicodedata.normalize("NFD", text)
         return "".join(c for c in normalized if unicodedata.category(c) != "Mn")
     
@@ -57,7 +129,7 @@ class NormalizeService:
         """Nettoie un texte pour matching (alphanum uniquement)"""
         text = self.normalize_text(text)
         text = self.remove_accents(text)
-        return re.sub(r"[^a-z0-9]", "", text)
+        return self._NONALNUM_LOWER_RE.sub("", text)
     
     # === Prix ===
     
@@ -72,14 +144,15 @@ class NormalizeService:
         match = self._PRICE_PATTERN.search(text)
         if not match:
             # Essayer sans symbole €
-            cleaned = re.sub(r"[^\d]", "", text)
-            if cleaned and 500 <= int(cleaned) <= 100000:
-                return int(cleaned)
+            cleaned = self._NONDIGIT_RE.sub("", text)
+            if cleaned:
+                price = int(cleaned)
+                if 500 <= price <= 100000:
+                    return price
             return None
         
-        price_str = match.group(1)
         # Nettoyer: garder uniquement les chiffres
-        price_str = re.sub(r"[^\d]", "", price_str)
+        price_str = match.group(1).translate(_DIGIT_SEPARATORS)
         
         if not price_str:
             return None
@@ -96,7 +169,7 @@ class NormalizeService:
         """Formate un prix en français (espaces)"""
         if price is None:
             return "N/C"
-        return f"{price:,}".replace(",", " ") + " €"
+        return f"{price:,} €".translate(_THOUSANDS_TO_SPACE)
     
     # === Kilométrage ===
     
@@ -112,8 +185,7 @@ class NormalizeService:
         if not match:
             return None
         
-        km_str = match.group(1)
-        km_str = re.sub(r"[^\d]", "", km_str)
+        km_str = match.group(1).translate(_DIGIT_SEPARATORS)
         
         if not km_str:
             return None
@@ -130,7 +202,7 @@ class NormalizeService:
         """Formate un kilométrage en français"""
         if km is None:
             return "N/C"
-        return f"{km:,}".replace(",", " ") + " km"
+        return f"{km:,} km".translate(_THOUSANDS_TO_SPACE)
     
     # === Année ===
     
@@ -163,12 +235,12 @@ class NormalizeService:
             return None
         
         # Chercher code postal (5 chiffres)
-        cp_match = re.search(r"\b(\d{5})\b", text)
+        cp_match = self._CP_RE.search(text)
         if cp_match:
             return cp_match.group(1)[:2]
         
         # Chercher département entre parenthèses
-        paren_match = re.search(r"\((\d{2})\)", text)
+        paren_match = self._PAREN_DEPT_RE.search(text)
         if paren_match:
             return paren_match.group(1)
         
@@ -179,7 +251,7 @@ class NormalizeService:
         if not text:
             return None
         
-        match = re.search(r"\b(\d{5})\b", text)
+        match = self._CP_RE.search(text)
         if match:
             return match.group(1)
         
@@ -219,24 +291,11 @@ class NormalizeService:
         if not text:
             return SellerType.UNKNOWN
         
-        text_lower = text.lower()
+        if self._PRO_RE.search(text):
+            return SellerType.PROFESSIONNEL
         
-        pro_patterns = [
-            "professionnel", "pro", "garage", "concessionnaire",
-            "marchand", "négociant", "société", "sarl", "sas", "eurl"
-        ]
-        
-        particulier_patterns = [
-            "particulier", "privé", "private", "owner"
-        ]
-        
-        for pattern in pro_patterns:
-            if pattern in text_lower:
-                return SellerType.PROFESSIONNEL
-        
-        for pattern in particulier_patterns:
-            if pattern in text_lower:
-                return SellerType.PARTICULIER
+        if self._PART_RE.search(text):
+            return SellerType.PARTICULIER
         
         return SellerType.UNKNOWN
     
@@ -251,7 +310,7 @@ class NormalizeService:
         if match:
             phone = match.group(0)
             # Nettoyer le format
-            phone = re.sub(r"[\s.-]", "", phone)
+            phone = self._PHONE_SEP_RE.sub("", phone)
             return phone
         
         return None
@@ -289,8 +348,8 @@ class NormalizeService:
         modele = modele.strip()
         
         # Supprimer les infos de version/motorisation du modèle
-        modele = re.sub(r"\d+\.\d+\s*(hdi|dci|tdi|vti|tce|dti|cdti|jtd).*", "", modele, flags=re.IGNORECASE)
-        modele = re.sub(r"\d+\s*(ch|cv).*", "", modele, flags=re.IGNORECASE)
+        modele = self._MODELE_STRIP1_RE.sub("", modele)
+        modele = self._MODELE_STRIP2_RE.sub("", modele)
         
         return modele.strip().title()
     
@@ -332,6 +391,32 @@ class NormalizeService:
         "Punto": "Fiat", "Panda": "Fiat", "500": "Fiat",
         "Tipo": "Fiat", "Doblo": "Fiat", "Bravo": "Fiat",
     }
+    # Index minuscules pour lookup O(1)
+    _MODELE_TO_MARQUE_LOWER = {k.lower(): v for k, v in _MODELE_TO_MARQUE.items()}
+    _MODELE_CANONIQUE = {k.lower(): k for k in _MODELE_TO_MARQUE}
+    _MODELE_ANY_RE = _build_modele_regex(_MODELE_TO_MARQUE)
+    
+    # Marques connues (+ pattern de suppression dans le titre)
+    _MARQUES = [
+        "Peugeot", "Renault", "Citroën", "Citroen", "Dacia", "Ford",
+        "Volkswagen", "VW", "Toyota", "Opel", "Fiat", "Nissan",
+        "Hyundai", "Kia", "Seat", "Skoda", "BMW", "Mercedes", "Audi"
+    ]
+    _MARQUE_PATTERNS = tuple(
+        (m, m.lower(), re.compile(re.escape(m), re.IGNORECASE)) for m in _MARQUES
+    )
+    _MARQUE_AC = _build_marque_automaton(_MARQUES)
+    
+    def _find_marque_index(self, titre_lower: str) -> Optional[int]:
+        """Index de la première marque de `_MARQUES` présente dans le titre"""
+        if self._MARQUE_AC is not None:
+            # Un seul parcours du titre, puis priorité à l'ordre de la liste
+            return min((index for _, index in self._MARQUE_AC.iter(titre_lower)), default=None)
+        
+        for index, (_, m_lower, _) in enumerate(self._MARQUE_PATTERNS):
+            if m_lower in titre_lower:
+                return index
+        return None
     
     def parse_title(self, titre: str | None) -> Tuple[str, str, str]:
         """
@@ -346,42 +431,27 @@ class NormalizeService:
         
         titre = titre.strip()
         
-        # Marques connues
-        marques = [
-            "Peugeot", "Renault", "Citroën", "Citroen", "Dacia", "Ford",
-            "Volkswagen", "VW", "Toyota", "Opel", "Fiat", "Nissan",
-            "Hyundai", "Kia", "Seat", "Skoda", "BMW", "Mercedes", "Audi"
-        ]
-        
         marque = ""
         modele = ""
         version = titre
         
         # Chercher la marque explicitement mentionnée
         titre_lower = titre.lower()
-        for m in marques:
-            if m.lower() in titre_lower:
-                marque = m
-                # Supprimer la marque du reste
-                pattern = re.compile(re.escape(m), re.IGNORECASE)
-                version = pattern.sub("", version, 1).strip()
-                break
+        marque_index = self._find_marque_index(titre_lower)
+        if marque_index is not None:
+            marque, _, pattern = self._MARQUE_PATTERNS[marque_index]
+            # Supprimer la marque du reste
+            version = pattern.sub("", version, 1).strip()
         
         # Chercher le modèle (premier mot après marque ou premier mot)
         words = version.split()
         if words:
-            # Modèles courants
-            modeles_connus = list(self._MODELE_TO_MARQUE.keys())
-            
-            for word in words[:3]:
-                word_clean = re.sub(r"[^a-zA-Z0-9]", "", word)
-                for m in modeles_connus:
-                    if word_clean.lower() == m.lower():
-                        modele = m
-                        version = " ".join(w for w in words if w != word)
-                        break
-                if modele:
-                    break
+            # Un seul scan regex sur les 3 premiers mots
+            match = self._MODELE_ANY_RE.search(" ".join(words[:3]))
+            if match:
+                word = match.group(0)
+                modele = self._MODELE_CANONIQUE[self._NONALNUM_RE.sub("", match.group(1)).lower()]
+                version = " ".join(w for w in words if w != word)
             
             # Si pas trouvé, prendre le premier mot
             if not modele and words:
@@ -390,11 +460,7 @@ class NormalizeService:
         
         # INFÉRENCE MARQUE: Si modèle connu mais pas de marque, déduire la marque
         if modele and not marque:
-            # Chercher dans le mapping
-            for modele_ref, marque_ref in self._MODELE_TO_MARQUE.items():
-                if modele.lower() == modele_ref.lower():
-                    marque = marque_ref
-                    break
+            marque = self._MODELE_TO_MARQUE_LOWER.get(modele.lower(), "")
         
         return (
             self.normalize_marque(marque),
@@ -402,6 +468,17 @@ class NormalizeService:
             version.strip()
         )
     
+    def parse_titles_batch(self, titres: list[str | None]) -> list[Tuple[str, str, str]]:
+        """
+        parse_title sur un lot: chaque titre distinct n'est parsé qu'une fois.
+        Retourne les (marque, modele, version) dans l'ordre des titres.
+        """
+        parsed: dict[str | None, Tuple[str, str, str]] = {}
+        for titre in titres:
+            if titre not in parsed:
+                parsed[titre] = self.parse_title(titre)
+        return [parsed[titre] for titre in titres]
+    
     # === Motorisation ===
     
     def extract_motorisation(self, text: str | None) -> str:
@@ -409,15 +486,9 @@ class NormalizeService:
         if not text:
             return ""
         
-        # Patterns de motorisation
-        patterns = [
-            r"(\d+\.\d+)\s*(hdi|dci|tdi|vti|tce|dti|cdti|jtd|d-4d|bluehdi|blue\s*hdi)",
-            r"(\d+\.\d+)\s*(l|litres?)?",
-            r"(\d{2,3})\s*(ch|cv|hp)",
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
+        # Patterns de motorisation (le premier qui matche l'emporte)
+        for pattern in self._MOTOR_PATTERNS:
+            match = pattern.search(text)
             if match:
                 return match.group(0).strip()
         
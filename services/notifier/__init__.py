@@ -3,5 +3,18 @@ Notifier module - Multi-channel notifications
 """
 
 from .discord import send_discord_notification
+from .shared_client import get_http_client, close_http_client
 
-__all__ = ["send_discord_notification"]
+__all__ = [
+    "send_discord_notification", "get_http_client", "close_http_client",
+    "NotificationService",
+]
+
+
+def __getattr__(name):
+    # Import différé: le service legacy (models.annonce, .env) n'est chargé
+    # que par ses utilisateurs, pas par `services.notifier.discord`
+    if name == "NotificationService":
+        from .service import NotificationService
+        return NotificationService
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -7,8 +7,11 @@ Discord Notifier V2 - Notifications intelligentes
 
 from __future__ import annotations
 
+import logging
 import os
+import re
 from datetime import datetime, timezone
+from functools import lru_cache
 from typing import Optional
 
 import httpx
@@ -16,29 +19,73 @@ import httpx
 from models.annonce_v2 import Annonce
 from models.enums import AlertLevel
 from config.settings import get_settings
+from services.notifier.shared_client import get_http_client, post_json
+
+logger = logging.getLogger(__name__)
+
+
+# Limites Discord par message webhook
+DISCORD_MAX_EMBEDS = 10
+DISCORD_MAX_EMBED_CHARS = 6000
+
+# Messages webhook envoyés simultanément par send_batch_notification
+DISCORD_BATCH_CONCURRENCY = 5
+
+
+# Emojis par niveau d'alerte (statiques)
+_ALERT_EMOJIS = {
+    AlertLevel.URGENT: "🔴",
+    AlertLevel.INTERESSANT: "🟠",
+    AlertLevel.SURVEILLER: "🟡",
+    AlertLevel.ARCHIVE: "⚪",
+}
+
+# Couleurs par niveau d'alerte (construites une fois depuis les settings)
+_embed_colors: Optional[dict[AlertLevel, int]] = None
+
+
+def _get_embed_colors() -> dict[AlertLevel, int]:
+    """Table niveau -> couleur, construite au premier appel"""
+    global _embed_colors
+    if _embed_colors is None:
+        discord = get_settings().discord
+        _embed_colors = {
+            AlertLevel.URGENT: discord.embed_color_urgent,
+            AlertLevel.INTERESSANT: discord.embed_color_interessant,
+            AlertLevel.SURVEILLER: discord.embed_color_surveiller,
+            AlertLevel.ARCHIVE: discord.embed_color_archive,
+        }
+    return _embed_colors
 
 
 def get_embed_color(alert_level: AlertLevel) -> int:
     """Retourne la couleur de l'embed selon le niveau d'alerte"""
-    settings = get_settings()
-    colors = {
-        AlertLevel.URGENT: settings.discord.embed_color_urgent,
-        AlertLevel.INTERESSANT: settings.discord.embed_color_interessant,
-        AlertLevel.SURVEILLER: settings.discord.embed_color_surveiller,
-        AlertLevel.ARCHIVE: settings.discord.embed_color_archive,
-    }
-    return colors.get(alert_level, 0x808080)
+    return _get_embed_colors().get(alert_level, 0x808080)
 
 
 def get_alert_emoji(alert_level: AlertLevel) -> str:
     """Retourne l'emoji selon le niveau d'alerte"""
-    emojis = {
-        AlertLevel.URGENT: "🔴",
-        AlertLevel.INTERESSANT: "🟠",
-        AlertLevel.SURVEILLER: "🟡",
-        AlertLevel.ARCHIVE: "⚪",
-    }
-    return emojis.get(alert_level, "⚪")
+    return _ALERT_EMOJIS.get(alert_level, "⚪")
+
+
+# Config Discord lue une seule fois (ne change pas en cours d'exécution)
+
+@lru_cache(maxsize=1)
+def _get_webhook_url() -> Optional[str]:
+    """URL du webhook: settings, sinon variable d'environnement DISCORD_WEBHOOK_URL"""
+    return get_settings().discord.webhook_url or os.getenv("DISCORD_WEBHOOK_URL")
+
+
+@lru_cache(maxsize=1)
+def _discord_enabled() -> bool:
+    """Notifications Discord activées dans les settings"""
+    return get_settings().discord.enabled
+
+
+@lru_cache(maxsize=1)
+def _batch_delay() -> int:
+    """Délai entre messages groupés (secondes)"""
+    return get_settings().notification.batch_delay_seconds
 
 
 async def send_discord_notification(annonce: Annonce) -> bool:
@@ -51,17 +98,15 @@ async def send_discord_notification(annonce: Annonce) -> bool:
     Returns:
         True si envoi réussi, False sinon
     """
-    settings = get_settings()
-    
     # Vérifier la config
-    webhook_url = settings.discord.webhook_url or os.getenv("DISCORD_WEBHOOK_URL")
+    webhook_url = _get_webhook_url()
     
     if not webhook_url:
-        print("⚠️ Discord webhook URL non configuré")
+        logger.warning("Discord webhook URL non configuré")
         return False
     
-    if not settings.discord.enabled:
-        print("⚠️ Discord notifications désactivées")
+    if not _discord_enabled():
+        logger.warning("Discord notifications désactivées")
         return False
     
     # Construire l'embed
@@ -75,27 +120,43 @@ async def send_discord_notification(annonce: Annonce) -> bool:
     
     # Envoyer
     try:
-        async with httpx.AsyncClient(timeout=30) as client:
-            response = await client.post(
-                webhook_url,
-                json=payload,
-                headers={"Content-Type": "application/json"}
-            )
+        client = await get_http_client()
+        response = await post_json(client, webhook_url, payload)
+        
+        if response.status_code in (200, 204):
+            return True
+        else:
+            logger.error("Discord error: %s - %s", response.status_code, response.text)
+            return False
             
-            if response.status_code in (200, 204):
-                return True
-            else:
-                print(f"❌ Discord error: {response.status_code} - {response.text}")
-                return False
-                
     except httpx.HTTPError as e:
-        print(f"❌ Discord HTTP error: {e}")
+        logger.error("Discord HTTP error: %s", e)
         return False
     except Exception as e:
-        print(f"❌ Discord error: {e}")
+        logger.error("Discord error: %s", e)
         return False
 
 
+# Raison en 1 ligne: pourcentage vs marché et libellés courts des mots-clés
+_PCT_RE = re.compile(r'-?(\d+)%')
+
+_KW_DISPLAY = {
+    "ct_ok": "CT OK",
+    "urgent": "Urgent",
+    "urgent_vente": "Vente urgente",
+    "negociable": "Négo",
+    "premiere_main": "1ère main",
+    "entretien_suivi": "Entretien OK",
+    "faible_km": "Faible km",
+}
+
+_RISK_DISPLAY = {
+    "ct_refuse": "⚠️ CT",
+    "moteur_hs": "❌ Moteur",
+    "prix_a_verifier": "❓ Prix",
+}
+
+
 def _build_reason_line(annonce: Annonce) -> str:
     """
     Construit une raison en 1 ligne pour décision rapide.
@@ -108,8 +169,7 @@ def _build_reason_line(annonce: Annonce) -> str:
         detail = annonce.score_breakdown.prix_detail
         if "%" in detail:
             # Extraire le pourcentage
-            import re
-            match = re.search(r'-?(\d+)%', detail)
+            match = _PCT_RE.search(detail)
             if match:
                 reasons.append(f"-{match.group(1)}% marché")
         elif "très bas" in detail.lower() or "bonne affaire" in detail.lower():
@@ -117,17 +177,8 @@ def _build_reason_line(annonce: Annonce) -> str:
     
     # Mots-clés opportunité
     if annonce.keywords_opportunite:
-        kw_display = {
-            "ct_ok": "CT OK",
-            "urgent": "Urgent",
-            "urgent_vente": "Vente urgente",
-            "negociable": "Négo",
-            "premiere_main": "1ère main",
-            "entretien_suivi": "Entretien OK",
-            "faible_km": "Faible km",
-        }
         for kw in annonce.keywords_opportunite[:3]:
-            reasons.append(kw_display.get(kw, kw.replace("_", " ").title()))
+            reasons.append(_KW_DISPLAY.get(kw) or kw.replace("_", " ").title())
     
     # Département si prioritaire
     if annonce.departement:
@@ -139,14 +190,9 @@ def _build_reason_line(annonce: Annonce) -> str:
     
     # Risques (warning)
     if annonce.keywords_risque:
-        risk_display = {
-            "ct_refuse": "⚠️ CT",
-            "moteur_hs": "❌ Moteur",
-            "prix_a_verifier": "❓ Prix",
-        }
         for risk in annonce.keywords_risque[:2]:
-            if risk in risk_display:
-                reasons.append(risk_display[risk])
+            if risk in _RISK_DISPLAY:
+                reasons.append(_RISK_DISPLAY[risk])
     
     if not reasons:
         return ""
@@ -154,11 +200,21 @@ def _build_reason_line(annonce: Annonce) -> str:
     return " + ".join(reasons)
 
 
-def _build_embed(annonce: Annonce, reason: str = "", is_update: bool = False) -> dict:
-    """Construit l'embed Discord avec raison en 1 ligne"""
+def _build_embed(
+    annonce: Annonce,
+    reason: str = "",
+    is_update: bool = False,
+    timestamp: Optional[str] = None
+) -> dict:
+    """
+    Construit l'embed Discord avec raison en 1 ligne.
+    timestamp: horodatage ISO partagé (envois groupés), sinon l'instant présent.
+    """
     
-    emoji = get_alert_emoji(annonce.alert_level)
-    color = get_embed_color(annonce.alert_level)
+    level = annonce.alert_level
+    emoji = _ALERT_EMOJIS.get(level, "⚪")
+    color = _get_embed_colors().get(level, 0x808080)
+    score_total = annonce.score_total
     
     # Titre
     title = f"{emoji} {annonce.marque} {annonce.modele}"
@@ -179,7 +235,7 @@ def _build_embed(annonce: Annonce, reason: str = "", is_update: bool = False) ->
     if reason:
         description_parts.append(f"**🎯 {reason}**")
     
-    description_parts.append(f"Score: **{annonce.score_total}/100** ({annonce.alert_level.value})")
+    description_parts.append(f"Score: **{score_total}/100** ({level.value})")
     
     # Breakdown compact
     if annonce.score_breakdown:
@@ -201,83 +257,40 @@ def _build_embed(annonce: Annonce, reason: str = "", is_update: bool = False) ->
     
     description = "\n".join(description_parts)
     
-    # Champs
-    fields = []
-    
-    # Prix
-    fields.append({
-        "name": "💰 Prix",
-        "value": annonce.format_prix(),
-        "inline": True
-    })
-    
-    # Kilométrage
-    fields.append({
-        "name": "🛣️ Kilométrage",
-        "value": annonce.format_km(),
-        "inline": True
-    })
-    
-    # Année
-    fields.append({
-        "name": "📅 Année",
-        "value": str(annonce.annee) if annonce.annee else "N/C",
-        "inline": True
-    })
-    
     # Localisation
     loc = annonce.ville or ""
     if annonce.departement:
         loc += f" ({annonce.departement})" if loc else annonce.departement
-    if loc:
-        fields.append({
-            "name": "📍 Localisation",
-            "value": loc,
-            "inline": True
-        })
-    
-    # Carburant
-    if annonce.carburant and annonce.carburant.value != "unknown":
-        fields.append({
-            "name": "⛽ Carburant",
-            "value": annonce.carburant.value.capitalize(),
-            "inline": True
-        })
-    
-    # Vendeur
-    if annonce.seller_type and annonce.seller_type.value != "unknown":
-        fields.append({
-            "name": "👤 Vendeur",
-            "value": annonce.seller_type.value.capitalize(),
-            "inline": True
-        })
     
     # Marge estimée
+    margin = None
     if annonce.margin_estimate_min or annonce.margin_estimate_max:
-        margin = f"{annonce.margin_estimate_min:,} - {annonce.margin_estimate_max:,} €".replace(",", " ")
+        margin = f"{annonce.margin_estimate_min:,} - {annonce.margin_estimate_max:,} €"
         if annonce.repair_cost_estimate:
-            margin += f"\n*(réparations: ~{annonce.repair_cost_estimate:,}€)*".replace(",", " ")
-        fields.append({
-            "name": "💵 Marge potentielle",
-            "value": margin,
-            "inline": False
-        })
-    
-    # Mots-clés opportunité
-    if annonce.keywords_opportunite:
-        fields.append({
-            "name": "✅ Opportunités",
-            "value": ", ".join(annonce.keywords_opportunite[:5]),
-            "inline": True
-        })
-    
-    # Mots-clés risque
-    if annonce.keywords_risque:
-        fields.append({
-            "name": "⚠️ Risques",
-            "value": ", ".join(annonce.keywords_risque[:5]),
-            "inline": True
-        })
+            margin += f"\n*(réparations: ~{annonce.repair_cost_estimate:,}€)*"
+        margin = margin.replace(",", " ")
+    
+    carburant = annonce.carburant.value if annonce.carburant else None
+    seller = annonce.seller_type.value if annonce.seller_type else None
+    
+    # Champs: Prix / Kilométrage / Année toujours présents, puis les optionnels
+    fields = [
+        {"name": "💰 Prix", "value": annonce.format_prix(), "inline": True},
+        {"name": "🛣️ Kilométrage", "value": annonce.format_km(), "inline": True},
+        {"name": "📅 Année", "value": str(annonce.annee) if annonce.annee else "N/C", "inline": True},
+    ]
+    fields.extend(f for f in (
+        {"name": "📍 Localisation", "value": loc, "inline": True} if loc else None,
+        {"name": "⛽ Carburant", "value": carburant.capitalize(), "inline": True}
+        if carburant and carburant != "unknown" else None,
+        {"name": "👤 Vendeur", "value": seller.capitalize(), "inline": True}
+        if seller and seller != "unknown" else None,
+        {"name": "💵 Marge potentielle", "value": margin, "inline": False} if margin else None,
+        {"name": "✅ Opportunités", "value": ", ".join(annonce.keywords_opportunite[:5]), "inline": True}
+        if annonce.keywords_opportunite else None,
+        {"name": "⚠️ Risques", "value": ", ".join(annonce.keywords_risque[:5]), "inline": True}
+        if annonce.keywords_risque else None,
+    ) if f is not None)
     
     # Construire l'embed
     embed = {
@@ -286,9 +299,9 @@ def _build_embed(annonce: Annonce, reason: str = "", is_update: bool = False) ->
         "color": color,
         "fields": fields[:25],  # Limite Discord
         "url": annonce.url,
-        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "timestamp": timestamp or datetime.now(timezone.utc).isoformat(),
         "footer": {
-            "text": f"{annonce.source.value} • Score {annonce.score_total}/100"
+            "text": f"{annonce.source.value} • Score {score_total}/100"
         }
     }
     
@@ -301,24 +314,92 @@ def _build_embed(annonce: Annonce, reason: str = "", is_update: bool = False) ->
 
 async def send_batch_notification(annonces: list[Annonce]) -> int:
     """
-    Envoie plusieurs notifications (avec throttling).
+    Envoie plusieurs notifications groupées (jusqu'à 10 embeds par message,
+    messages envoyés en parallèle avec concurrence bornée et throttling).
     
     Returns:
         Nombre de notifications envoyées avec succès
     """
     import asyncio
     
-    settings = get_settings()
-    delay = settings.notification.batch_delay_seconds
+    if not annonces:
+        return 0
+    
+    webhook_url = _get_webhook_url()
     
-    sent = 0
-    for annonce in annonces:
-        success = await send_discord_notification(annonce)
-        if success:
-            sent += 1
-        await asyncio.sleep(delay)
+    if not webhook_url:
+        logger.warning("Discord webhook URL non configuré")
+        return 0
+    
+    if not _discord_enabled():
+        logger.warning("Discord notifications désactivées")
+        return 0
+    
+    delay = _batch_delay()
+    timestamp = datetime.now(timezone.utc).isoformat()
+    chunks = _chunk_embeds([_build_embed(a, timestamp=timestamp) for a in annonces])
+    client = await get_http_client()
+    
+    # Au plus DISCORD_BATCH_CONCURRENCY messages en vol; le délai reste pris
+    # sous le sémaphore pour borner le débit (limite Discord par webhook)
+    sem = asyncio.Semaphore(DISCORD_BATCH_CONCURRENCY)
+    
+    async def _send_chunk(embeds: list[dict]) -> int:
+        async with sem:
+            payload = {
+                "embeds": embeds,
+                "username": "Voitures Bot",
+            }
+            
+            try:
+                response = await post_json(client, webhook_url, payload)
+                
+                if response.status_code in (200, 204):
+                    return len(embeds)
+                logger.error("Discord error: %s - %s", response.status_code, response.text)
+                return 0
+                
+            except Exception as e:
+                logger.error("Discord error: %s", e)
+                return 0
+            
+            finally:
+                await asyncio.sleep(delay)
     
-    return sent
+    results = await asyncio.gather(*(_send_chunk(c) for c in chunks))
+    return sum(results)
+
+
+def _embed_length(embed: dict) -> int:
+    """Taille d'un embed au sens de la limite Discord (6000 caractères / message)"""
+    size = len(embed.get("title", "")) + len(embed.get("description", ""))
+    size += len(embed.get("footer", {}).get("text", ""))
+    for f in embed.get("fields", ()):
+        size += len(f["name"]) + len(f["value"])
+    return size
+
+
+def _chunk_embeds(embeds: list[dict]) -> list[list[dict]]:
+    """Regroupe les embeds par message: max 10 embeds et 6000 caractères"""
+    chunks: list[list[dict]] = []
+    current: list[dict] = []
+    current_size = 0
+    
+    for embed in embeds:
+        size = _embed_length(embed)
+        if current and (
+            len(current) >= DISCORD_MAX_EMBEDS
+            or current_size + size > DISCORD_MAX_EMBED_CHARS
+        ):
+            chunks.append(current)
+            current, current_size = [], 0
+        current.append(embed)
+        current_size += size
+    
+    if current:
+        chunks.append(current)
+    
+    return chunks
 
 
 async def send_update_notification(
@@ -355,10 +436,9 @@ async def send_update_notification(
     
     reason_line = " | ".join(reasons)
     
-    settings = get_settings()
-    webhook_url = settings.discord.webhook_url or os.getenv("DISCORD_WEBHOOK_URL")
+    webhook_url = _get_webhook_url()
     
-    if not webhook_url or not settings.discord.enabled:
+    if not webhook_url or not _discord_enabled():
         return False
     
     embed = _build_embed(annonce, reason=reason_line, is_update=True)
@@ -370,13 +450,9 @@ async def send_update_notification(
     }
     
     try:
-        async with httpx.AsyncClient(timeout=30) as client:
-            response = await client.post(
-                webhook_url,
-                json=payload,
-                headers={"Content-Type": "application/json"}
-            )
-            return response.status_code in (200, 204)
+        client = await get_http_client()
+        response = await post_json(client, webhook_url, payload)
+        return response.status_code in (200, 204)
     except Exception:
         return False
 
@@ -392,27 +468,30 @@ def should_notify(
     Returns:
         (should_notify, reason)
     """
-    # Nouvelle annonce avec bon score
+    score = annonce.score_total
+    
+    # Nouvelle annonce: seul le score compte
     if existing is None:
-        if annonce.score_total >= min_score:
+        if score >= min_score:
             return True, "new"
         return False, "score_too_low"
     
     # Annonce déjà notifiée et pas de changement significatif
     if existing.notified:
-        # Prix baissé de plus de 5%
-        if existing.prix and annonce.prix:
-            if annonce.prix < existing.prix * 0.95:
-                return True, "price_dropped"
+        # Prix baissé de plus de 5% (prix < 0.95 * ancien, en entiers)
+        old_prix = existing.prix
+        prix = annonce.prix
+        if old_prix and prix and prix * 20 < old_prix * 19:
+            return True, "price_dropped"
         
         # Score monté significativement (>=10 pts)
-        if annonce.score_total >= existing.score_total + 10:
+        if score >= existing.score_total + 10:
             return True, "score_increased"
         
         return False, "already_notified"
     
     # Pas encore notifiée mais score suffisant
-    if annonce.score_total >= min_score:
+    if score >= min_score:
         return True, "score_threshold"
     
     return False, "score_too_low"
@@ -0,0 +1,517 @@
+"""
+Notification Service - Gestion des notifications multi-canaux
+"""
+
+import asyncio
+import logging
+import os
+import smtplib
+from dataclasses import dataclass
+from email.message import EmailMessage
+from typing import Callable, List, Optional
+import httpx
+from dotenv import load_dotenv
+
+try:
+    import aiosmtplib  # Optionnel: session SMTP asynchrone persistante
+except ImportError:
+    aiosmtplib = None
+
+from models.annonce import Annonce
+from services.notifier.shared_client import create_http_client, post_json
+
+logger = logging.getLogger(__name__)
+
+# Annonces par message de récapitulatif (reste sous la limite Telegram de 4096 caractères)
+RECAP_CHUNK_SIZE = 50
+
+# Intervalle du NOOP qui garde la session SMTP ouverte (secondes)
+SMTP_KEEPALIVE_SECONDS = 60
+
+# Durée max d'un envoi sur un canal (un canal lent ne bloque pas les autres)
+CHANNEL_TIMEOUT_SECONDS = 15
+
+# Gabarit HTML des emails (rempli par str.format_map dans send_email)
+_EMAIL_HTML = """
+            <html>
+            <body style="font-family: Arial, sans-serif;">
+                <h2>{emoji_alerte} {marque} {modele}</h2>
+                <p><strong>Prix:</strong> {prix:,}€</p>
+                <p><strong>Kilométrage:</strong> {kilometrage:,} km</p>
+                <p><strong>Année:</strong> {annee}</p>
+                <p><strong>Lieu:</strong> {ville} ({departement})</p>
+                <p><strong>Score:</strong> {score}/100</p>
+                {mots_cles_block}
+                <p><strong>Marge estimée:</strong> {marge_min}€ - {marge_max}€</p>
+                <p><a href="{url}" style="background-color: #4CAF50; color: white; padding: 10px 20px; text-decoration: none; border-radius: 5px;">Voir l'annonce</a></p>
+            </body>
+            </html>
+            """
+
+# Couleur des embeds Discord par niveau d'alerte (statiques)
+_DISCORD_COLORS = {
+    "urgent": 0xFF0000,      # Rouge
+    "interessant": 0xFFA500,  # Orange
+    "surveiller": 0xFFFF00,   # Jaune
+    "archive": 0x808080       # Gris
+}
+
+# Canaux par niveau d'alerte: (canal, options du payload)
+CANAUX_PAR_NIVEAU = {
+    # Tous les canaux
+    "urgent": (("discord", {}), ("telegram", {}), ("pushover", {"priority": 1}), ("sms", {})),
+    # Push + Discord
+    "interessant": (("discord", {}), ("telegram", {}), ("pushover", {})),
+    # Discord + Email
+    "surveiller": (("discord", {}), ("email", {})),
+}
+
+
+@dataclass
+class Channel:
+    """Canal de notification HTTP (client dédié, URL relative ou absolue, payload)"""
+    name: str
+    enabled: bool
+    client: Optional[httpx.AsyncClient]
+    url: str
+    build_payload: Callable[..., dict]
+    as_json: bool = True
+    success_codes: tuple[int, ...] = (200,)
+
+
+class NotificationService:
+    """Service de notifications multi-canaux"""
+    
+    def __init__(self):
+        # Identifiants des canaux: mêmes variables d'environnement que config.py,
+        # lues à la création du service (pas à l'import)
+        load_dotenv()
+        telegram_bot_token = os.getenv("TELEGRAM_BOT_TOKEN")
+        self._telegram_chat_id = os.getenv("TELEGRAM_CHAT_ID")
+        self._pushover_user_key = os.getenv("PUSHOVER_USER_KEY")
+        self._pushover_api_token = os.getenv("PUSHOVER_API_TOKEN")
+        twilio_sid = os.getenv("TWILIO_SID")
+        twilio_auth_token = os.getenv("TWILIO_AUTH_TOKEN")
+        self._twilio_phone_from = os.getenv("TWILIO_PHONE_FROM")
+        self._phone_to = os.getenv("PHONE_TO")
+        self._smtp_host = os.getenv("SMTP_HOST", "smtp.gmail.com")
+        self._smtp_port = int(os.getenv("SMTP_PORT", "587"))
+        self._smtp_user = os.getenv("SMTP_USER")
+        self._smtp_password = os.getenv("SMTP_PASSWORD")
+        self._email_to = os.getenv("EMAIL_TO")
+        discord_webhook_url = os.getenv("DISCORD_WEBHOOK_URL")
+        
+        self.telegram_enabled = bool(telegram_bot_token and self._telegram_chat_id)
+        self.pushover_enabled = bool(self._pushover_user_key and self._pushover_api_token)
+        self.sms_enabled = bool(twilio_sid and twilio_auth_token and self._phone_to)
+        self.email_enabled = bool(self._smtp_user and self._smtp_password and self._email_to)
+        self.discord_enabled = bool(discord_webhook_url)
+        
+        # Un client HTTP par hôte (pool keep-alive dédié, auth/base_url fixés une fois)
+        per_host = httpx.Limits(max_keepalive_connections=10)
+        self._telegram = create_http_client(
+            base_url=f"https://api.telegram.org/bot{telegram_bot_token}", limits=per_host
+        ) if self.telegram_enabled else None
+        self._pushover = create_http_client(
+            base_url="https://api.pushover.net/1", limits=per_host
+        ) if self.pushover_enabled else None
+        self._twilio = create_http_client(
+            base_url=f"https://api.twilio.com/2010-04-01/Accounts/{twilio_sid}",
+            auth=(twilio_sid, twilio_auth_token),
+            limits=per_host
+        ) if self.sms_enabled else None
+        self._discord = create_http_client(limits=per_host) if self.discord_enabled else None
+        
+        # Canaux HTTP: un descripteur par canal, envoyés par _send
+        self._channels = {
+            "telegram": Channel(
+                "Telegram", self.telegram_enabled, self._telegram, "/sendMessage",
+                self._telegram_payload
+            ),
+            "pushover": Channel(
+                "Pushover", self.pushover_enabled, self._pushover, "/messages.json",
+                self._pushover_payload, as_json=False
+            ),
+            "sms": Channel(
+                "SMS", self.sms_enabled, self._twilio, "/Messages.json",
+                self._sms_payload, as_json=False, success_codes=(200, 201)
+            ),
+            "discord": Channel(
+                "Discord", self.discord_enabled, self._discord, discord_webhook_url,
+                self._discord_payload, success_codes=(200, 204)
+            ),
+        }
+        
+        # Envois restants après un premier succès (voir _first_success)
+        self._background: set[asyncio.Future] = set()
+        
+        # Session SMTP persistante (aiosmtplib), partagée par tous les emails
+        self._smtp = None
+        self._smtp_lock = asyncio.Lock()
+        self._smtp_keepalive: Optional[asyncio.Task] = None
+    
+    async def __aenter__(self) -> "NotificationService":
+        return self
+    
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+    
+    async def aclose(self):
+        """Attend les envois en arrière-plan puis ferme les clients HTTP par hôte"""
+        if self._background:
+            await asyncio.gather(*self._background, return_exceptions=True)
+        for client in (self._telegram, self._pushover, self._twilio, self._discord):
+            if client is not None:
+                await client.aclose()
+        
+        if self._smtp_keepalive is not None:
+            self._smtp_keepalive.cancel()
+        if self._smtp is not None:
+            try:
+                await self._smtp.quit()
+            except Exception:
+                pass
+            self._smtp = None
+    
+    async def notifier(self, annonce: Annonce) -> bool:
+        """Envoie les notifications appropriées selon le score"""
+        niveau = annonce.niveau_alerte
+        success = False
+        
+        try:
+            # Texte formaté une seule fois pour tous les canaux qui l'utilisent
+            message = annonce.format_notification()
+            
+            # Seuls les canaux configurés donnent lieu à une tâche
+            coros = []
+            for name, options in CANAUX_PAR_NIVEAU.get(niveau, ()):
+                if name == "email":
+                    if self.email_enabled:
+                        coros.append(self.send_email(annonce, message))
+                else:
+                    channel = self._channels[name]
+                    if channel.enabled:
+                        coros.append(self._send(channel, annonce, text=message, **options))
+            
+            if coros:
+                success = await self._first_success(*coros)
+            
+            if success:
+                logger.info("📤 Notification envoyée via %s: %s %s", niveau, annonce.marque, annonce.modele)
+            
+        except Exception as e:
+            logger.error("❌ Erreur notification pour %s: %s", annonce.url, e, exc_info=True)
+        
+        return success
+    
+    async def _first_success(self, *coros) -> bool:
+        """
+        Lance les envois en parallèle (chacun borné à CHANNEL_TIMEOUT_SECONDS)
+        et rend la main dès le premier succès. Les canaux restants continuent
+        en arrière-plan.
+        """
+        tasks = [
+            asyncio.create_task(asyncio.wait_for(c, CHANNEL_TIMEOUT_SECONDS))
+            for c in coros
+        ]
+        success = False
+        
+        for fut in asyncio.as_completed(tasks):
+            try:
+                if await fut is True:
+                    success = True
+                    break
+            except Exception:
+                continue
+        
+        pending = [t for t in tasks if not t.done()]
+        if pending:
+            background = asyncio.ensure_future(
+                asyncio.gather(*pending, return_exceptions=True)
+            )
+            # Garder une référence tant que la tâche tourne
+            self._background.add(background)
+            background.add_done_callback(self._background.discard)
+        
+        return success
+    
+    # === Canaux HTTP (Telegram, Pushover, SMS, Discord) ===
+    
+    async def _send(self, channel: Channel, annonce: Annonce, **options) -> bool:
+        """
+        Envoi générique sur un canal HTTP: payload, POST, contrôle du statut.
+        Le canal doit être activé (vérifié par l'appelant).
+        """
+        try:
+            payload = channel.build_payload(annonce, **options)
+            
+            if channel.as_json:
+                response = await post_json(channel.client, channel.url, payload)
+            else:
+                response = await channel.client.post(channel.url, data=payload)
+            
+            if response.status_code in channel.success_codes:
+                logger.debug("%s envoyé: %s", channel.name, annonce.titre)
+                return True
+            else:
+                logger.error("❌ %s erreur %s: %s", channel.name, response.status_code, response.text)
+                return False
+                
+        except Exception as e:
+            logger.error("❌ Erreur envoi %s: %s", channel.name, e, exc_info=True)
+            return False
+    
+    async def send_telegram(self, annonce: Annonce, message: Optional[str] = None) -> bool:
+        """Envoie une notification Telegram"""
+        channel = self._channels["telegram"]
+        if not channel.enabled:
+            return False
+        return await self._send(channel, annonce, text=message)
+    
+    async def send_pushover(self, annonce: Annonce, priority: int = 0) -> bool:
+        """Envoie une notification Pushover"""
+        channel = self._channels["pushover"]
+        if not channel.enabled:
+            return False
+        return await self._send(channel, annonce, priority=priority)
+    
+    async def send_sms(self, annonce: Annonce) -> bool:
+        """Envoie un SMS via Twilio"""
+        channel = self._channels["sms"]
+        if not channel.enabled:
+            return False
+        return await self._send(channel, annonce)
+    
+    async def send_discord(self, annonce: Annonce) -> bool:
+        """Envoie une notification Discord via webhook"""
+        channel = self._channels["discord"]
+        if not channel.enabled:
+            return False
+        return await self._send(channel, annonce)
+    
+    def _telegram_payload(self, annonce: Annonce, text: Optional[str] = None) -> dict:
+        """Payload Telegram sendMessage (texte déjà formaté si fourni)"""
+        return {
+            "chat_id": self._telegram_chat_id,
+            "text": text if text is not None else annonce.format_notification(),
+            "parse_mode": "HTML",
+            "disable_web_page_preview": False
+        }
+    
+    def _pushover_payload(self, annonce: Annonce, text: Optional[str] = None, priority: int = 0) -> dict:
+        """Payload Pushover (formulaire)"""
+        titre = f"{annonce.emoji_alerte} {annonce.marque} {annonce.modele} - {annonce.prix}€"
+        parts = [f"Score: {annonce.score_rentabilite}/100"]
+        if annonce.kilometrage:
+            parts.append(f"Km: {annonce.kilometrage:,} km")
+        if annonce.ville:
+            parts.append(f"Lieu: {annonce.ville} ({annonce.departement})")
+        if annonce.marge_estimee_min:
+            parts.append(f"Marge: {annonce.marge_estimee_min}€-{annonce.marge_estimee_max}€")
+        
+        return {
+            "token": self._pushover_api_token,
+            "user": self._pushover_user_key,
+            "title": titre,
+            "message": "\n".join(parts),
+            "url": annonce.url,
+            "url_title": "Voir l'annonce",
+            "priority": priority,
+            "sound": "cashregister" if priority >= 1 else "pushover"
+        }
+    
+    def _sms_payload(self, annonce: Annonce, text: Optional[str] = None) -> dict:
+        """Payload Twilio Messages (formulaire)"""
+        return {
+            "From": self._twilio_phone_from,
+            "To": self._phone_to,
+            "Body": (
+                f"🚗 ALERTE VOITURE {annonce.score_rentabilite}/100\n"
+                f"{annonce.marque} {annonce.modele}\n"
+                f"{annonce.prix}€ - {annonce.ville}\n"
+                f"{annonce.url}"
+            )
+        }
+    
+    def _discord_payload(self, annonce: Annonce, text: Optional[str] = None) -> dict:
+        """Payload webhook Discord (embed)"""
+        color = _DISCORD_COLORS.get(annonce.niveau_alerte, 0x808080)
+        
+        # Construire l'embed Discord
+        embed = {
+            "title": f"{annonce.emoji_alerte} {annonce.marque} {annonce.modele} - Score: {annonce.score_rentabilite}/100",
+            "url": annonce.url,
+            "color": color,
+            "fields": [
+                {"name": "💰 Prix", "value": f"{annonce.prix:,}€" if annonce.prix else "N/A", "inline": True},
+                {"name": "🛣️ Kilométrage", "value": f"{annonce.kilometrage:,} km" if annonce.kilometrage else "N/A", "inline": True},
+                {"name": "📅 Année", "value": str(annonce.annee) if annonce.annee else "N/A", "inline": True},
+                {"name": "📍 Localisation", "value": f"{annonce.ville} ({annonce.departement})" if annonce.ville else "N/A", "inline": True},
+                {"name": "⛽ Carburant", "value": annonce.carburant or "N/A", "inline": True},
+                {"name": "👤 Vendeur", "value": annonce.type_vendeur or "particulier", "inline": True},
+            ],
+            "footer": {"text": f"Source: {annonce.source}"},
+        }
+        
+        # Ajouter la marge estimée si disponible
+        if annonce.marge_estimee_min and annonce.marge_estimee_max:
+            embed["fields"].append({
+                "name": "💵 Marge potentielle",
+                "value": f"{annonce.marge_estimee_min}€ - {annonce.marge_estimee_max}€",
+                "inline": True
+            })
+        
+        # Ajouter les mots-clés si détectés
+        if annonce.mots_cles_detectes:
+            embed["fields"].append({
+                "name": "🔑 Mots-clés",
+                "value": ", ".join(annonce.mots_cles_detectes[:5]),
+                "inline": False
+            })
+        
+        # Ajouter une image si disponible
+        if annonce.images_urls and len(annonce.images_urls) > 0:
+            embed["thumbnail"] = {"url": annonce.images_urls[0]}
+        
+        # Payload Discord
+        return {
+            "username": "🚗 Bot Voitures",
+            "embeds": [embed]
+        }
+    
+    async def send_email(self, annonce: Annonce, text: Optional[str] = None) -> bool:
+        """Envoie un email"""
+        if not self.email_enabled:
+            return False
+        
+        try:
+            msg = EmailMessage()
+            msg["Subject"] = f"{annonce.emoji_alerte} {annonce.marque} {annonce.modele} - {annonce.prix}€ - Score {annonce.score_rentabilite}"
+            msg["From"] = self._smtp_user
+            msg["To"] = self._email_to
+            
+            # Version texte
+            if text is None:
+                text = annonce.format_notification()
+            
+            # Version HTML
+            html = _EMAIL_HTML.format_map({
+                "emoji_alerte": annonce.emoji_alerte,
+                "marque": annonce.marque,
+                "modele": annonce.modele,
+                "prix": annonce.prix,
+                "kilometrage": annonce.kilometrage,
+                "annee": annonce.annee,
+                "ville": annonce.ville,
+                "departement": annonce.departement,
+                "score": annonce.score_rentabilite,
+                "mots_cles_block": (
+                    "<p><strong>Mots-clés:</strong> " + ", ".join(annonce.mots_cles_detectes) + "</p>"
+                    if annonce.mots_cles_detectes else ""
+                ),
+                "marge_min": annonce.marge_estimee_min,
+                "marge_max": annonce.marge_estimee_max,
+                "url": annonce.url,
+            })
+            
+            msg.set_content(text)
+            msg.add_alternative(html, subtype="html")
+            
+            if aiosmtplib is not None:
+                await self._send_email_async(msg)
+            else:
+                # Envoi synchrone (dans un thread)
+                loop = asyncio.get_running_loop()
+                await loop.run_in_executor(None, self._send_email_sync, msg)
+            
+            logger.debug("Email envoyé: %s", annonce.titre)
+            return True
+            
+        except Exception as e:
+            logger.error("❌ Erreur envoi Email: %s", e, exc_info=True)
+            return False
+    
+    async def _get_smtp(self):
+        """Session SMTP (connexion + STARTTLS + login une seule fois), appelée sous _smtp_lock"""
+        if self._smtp is None or not self._smtp.is_connected:
+            smtp = aiosmtplib.SMTP(hostname=self._smtp_host, port=self._smtp_port, start_tls=True)
+            await smtp.connect()
+            await smtp.login(self._smtp_user, self._smtp_password)
+            self._smtp = smtp
+            
+            if self._smtp_keepalive is None or self._smtp_keepalive.done():
+                self._smtp_keepalive = asyncio.create_task(self._smtp_noop_loop())
+        return self._smtp
+    
+    async def _send_email_async(self, msg):
+        """Envoi email via la session persistante (reconnexion si coupée)"""
+        async with self._smtp_lock:
+            smtp = await self._get_smtp()
+            try:
+                await smtp.send_message(msg)
+            except aiosmtplib.SMTPServerDisconnected:
+                self._smtp = None
+                smtp = await self._get_smtp()
+                await smtp.send_message(msg)
+    
+    async def _smtp_noop_loop(self):
+        """Garde la session SMTP ouverte; s'arrête si elle tombe (reconnexion paresseuse)"""
+        while True:
+            await asyncio.sleep(SMTP_KEEPALIVE_SECONDS)
+            async with self._smtp_lock:
+                if self._smtp is None:
+                    return
+                try:
+                    await self._smtp.noop()
+                except aiosmtplib.SMTPException:
+                    self._smtp = None
+                    return
+    
+    def _send_email_sync(self, msg):
+        """Envoi email synchrone (repli si aiosmtplib absent)"""
+        with smtplib.SMTP(self._smtp_host, self._smtp_port) as server:
+            server.starttls()
+            server.login(self._smtp_user, self._smtp_password)
+            server.send_message(msg)
+    
+    async def send_recap(self, annonces: List[Annonce]) -> bool:
+        """Envoie un récapitulatif des annonces"""
+        if not annonces:
+            return True
+        
+        try:
+            lignes = [
+                f"{annonce.emoji_alerte} {annonce.marque} {annonce.modele} - "
+                f"{annonce.prix}€ - Score: {annonce.score_rentabilite}"
+                for annonce in annonces
+            ]
+            
+            # Envoyer via Telegram (un message par groupe de RECAP_CHUNK_SIZE annonces)
+            if self.telegram_enabled:
+                total = len(lignes)
+                nb_messages = -(-total // RECAP_CHUNK_SIZE)
+                for i in range(0, total, RECAP_CHUNK_SIZE):
+                    header = f"📊 RÉCAPITULATIF - {total} annonces"
+                    if nb_messages > 1:
+                        header += f" ({i // RECAP_CHUNK_SIZE + 1}/{nb_messages})"
+                    message = header + "\n\n" + "\n".join(lignes[i:i + RECAP_CHUNK_SIZE]) + "\n"
+                    await post_json(self._telegram, "/sendMessage", {
+                        "chat_id": self._telegram_chat_id,
+                        "text": message
+                    })
+            
+            return True
+            
+        except Exception as e:
+            logger.error("❌ Erreur envoi récap: %s", e, exc_info=True)
+            return False
+    
+    def get_status(self) -> dict:
+        """Retourne le statut des canaux de notification"""
+        return {
+            "discord": self.discord_enabled,
+            "telegram": self.telegram_enabled,
+            "pushover": self.pushover_enabled,
+            "sms": self.sms_enabled,
+            "email": self.email_enabled
+        }
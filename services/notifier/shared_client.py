@@ -0,0 +1,85 @@
+"""
+Client HTTP partagé pour les notifications
+- Un seul pool keep-alive pour Discord / Telegram / Pushover / Twilio
+- HTTP/2 si le paquet `h2` est installé
+- Clients dédiés par hôte via create_http_client (base_url, auth)
+- POST JSON sérialisé par orjson si disponible (post_json)
+- Fermé explicitement à l'arrêt (close_http_client)
+"""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Optional
+
+import httpx
+
+try:
+    import orjson  # Optionnel: sérialisation JSON rapide
+except ImportError:
+    orjson = None
+
+try:
+    import h2  # noqa: F401  Optionnel: httpx[http2]
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+# Échec rapide sur un hôte mort (connexion), marge raisonnable en lecture
+DEFAULT_TIMEOUT = httpx.Timeout(connect=3.0, read=10.0, write=5.0, pool=5.0)
+DEFAULT_LIMITS = httpx.Limits(
+    max_connections=100,
+    max_keepalive_connections=40,
+    keepalive_expiry=60,
+)
+
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+
+def create_http_client(**kwargs) -> httpx.AsyncClient:
+    """
+    Crée un client dédié (ex: un par hôte avec base_url) avec les mêmes
+    réglages que le client partagé; kwargs surcharge les valeurs par défaut.
+    """
+    kwargs.setdefault("http2", HTTP2_AVAILABLE)
+    kwargs.setdefault("timeout", DEFAULT_TIMEOUT)
+    kwargs.setdefault("limits", DEFAULT_LIMITS)
+    return httpx.AsyncClient(**kwargs)
+
+
+# Instance globale (liée à la boucle asyncio qui l'a créée)
+_client: Optional[httpx.AsyncClient] = None
+_client_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+async def get_http_client() -> httpx.AsyncClient:
+    """
+    Retourne le client HTTP partagé (création paresseuse).
+    Recréé si la boucle asyncio a changé (plusieurs asyncio.run successifs).
+    """
+    global _client, _client_loop
+
+    loop = asyncio.get_running_loop()
+    if _client is None or _client.is_closed or _client_loop is not loop:
+        _client = create_http_client()
+        _client_loop = loop
+    return _client
+
+
+async def close_http_client():
+    """Ferme le client partagé (à appeler à l'arrêt de l'application)"""
+    global _client, _client_loop
+
+    if _client is not None:
+        if _client_loop is asyncio.get_running_loop():
+            await _client.aclose()
+        _client = None
+        _client_loop = None
+
+
+async def post_json(client: httpx.AsyncClient, url: str, payload: Any) -> httpx.Response:
+    """POST d'un payload JSON (orjson si installé, sinon l'encodeur de httpx)"""
+    if orjson is None:
+        return await client.post(url, json=payload)
+    return await client.post(url, content=orjson.dumps(payload), headers=_JSON_HEADERS)
@@ -9,26 +9,157 @@ Delta scan : ne traite que les nouvelles annonces (fingerprint/url)
 from __future__ import annotations
 
 import asyncio
+import heapq
+import logging
+import re
+import threading
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from typing import Any, Callable, Optional, Protocol
 from enum import Enum
+from functools import lru_cache, partial
+from operator import attrgetter
 
-from models.annonce_v2 import Annonce, ScoreBreakdown
+import httpx
+
+from models.annonce_v2 import Annonce, ScoreBreakdown, canonicalize_url
 from models.enums import Source, AlertLevel, AnnonceStatus
 from services.scoring_v2 import get_scoring_service_v3, ScoringServiceV3
 from services.normalize import get_normalize_service, NormalizeService
 from services.keywords import normalize_text
+from services.notifier.discord import (
+    send_discord_notification,
+    send_update_notification,
+    should_notify,
+)
 from db.repo import get_repo, AnnonceRepository
 from config.settings import get_settings
 
+try:
+    import ahocorasick  # Optionnel: mots-clés du titre en une passe
+except ImportError:
+    ahocorasick = None
+
+logger = logging.getLogger(__name__)
+
+# Échecs réseau attendus d'un scraper (le reste est un bug: traceback loggée)
+_FETCH_ERRORS = (httpx.HTTPError, asyncio.TimeoutError, OSError)
+
+
+def _log_failure(message: str, exc: BaseException):
+    """Log un échec: warning court si réseau, sinon erreur avec traceback"""
+    if isinstance(exc, _FETCH_ERRORS):
+        logger.warning("%s: %s", message, exc)
+    else:
+        logger.error("%s: %s", message, exc, exc_info=exc)
+
+
+# Mots-clés du scoring light (titre normalisé, recherche de sous-chaîne)
+_TITRE_KEYWORDS = {
+    "urgence": ("urgent", "vite", "depart", "demenagement"),
+    "nego": ("negociable", "a debattre", "nego"),
+    "ct_ok": ("ct ok", "ct vierge", "controle technique ok"),
+    "risque": ("hs", "panne", "accident", "epave", "pour pieces"),
+}
+
+
+def _build_titre_automaton():
+    """Automate Aho-Corasick mot-clé -> tag (None si non installé)"""
+    if ahocorasick is None:
+        return None
+    automaton = ahocorasick.Automaton()
+    for tag, keywords in _TITRE_KEYWORDS.items():
+        for kw in keywords:
+            automaton.add_word(kw, tag)
+    automaton.make_automaton()
+    return automaton
+
+
+_TITRE_AUTOMATON = _build_titre_automaton()
+
+# Repli sans ahocorasick: un seul scan, un groupe nommé par tag.
+# Lookahead (largeur nulle) pour tester chaque position: les mots-clés
+# qui se chevauchent ("vitepave" -> urgence + risque) sont tous vus
+# (aucun mot-clé n'est préfixe d'un mot-clé d'un autre tag).
+_TITRE_RE = re.compile("(?=" + "|".join(
+    f"(?P<{tag}>{'|'.join(map(re.escape, keywords))})"
+    for tag, keywords in _TITRE_KEYWORDS.items()
+) + ")")
+
+
+@lru_cache(maxsize=4096)
+def _titre_tags(titre: str) -> frozenset[str]:
+    """
+    Tags de _TITRE_KEYWORDS présents dans le titre (normalisé ici).
+    Mémoïsé par titre brut: les reposts reviennent à chaque scan.
+    """
+    titre_normalized = normalize_text(titre)
+    if _TITRE_AUTOMATON is not None:
+        return frozenset(tag for _, tag in _TITRE_AUTOMATON.iter(titre_normalized))
+    return frozenset(m.lastgroup for m in _TITRE_RE.finditer(titre_normalized))
+
+
+# Nombre de fetches détail en parallèle
+DETAIL_WORKERS = 5
+
+# Fetches détail simultanés max sur une même source (le débit par source
+# reste géré par le rate limiter partagé des scrapers)
+DETAIL_PER_SOURCE = 2
+
+# Threads dédiés aux appels DB synchrones de la phase détail
+DB_WORKERS = 4
+
+# Annonces détaillées persistées par lot (mémoire bornée sur les gros runs)
+SAVE_BATCH_SIZE = 2 * DETAIL_WORKERS
+
+# Clé de tri de la queue détail (appel C, sans frame Python)
+_PRIORITY_KEY = attrgetter("priority")
+
+# Bonus (score, priorité) du scoring light, par tranche (bisect)
+_NO_BONUS = (0, 0)
+
+_PRIX_SEUILS = (2000, 3000, 4000)  # bornes exclues de la tranche inférieure
+_PRIX_BONUS = ((25, 20), (20, 10), (10, 0), _NO_BONUS)
+
+_KM_MIN_IDEAL = 80000
+_KM_SEUILS = (150000, 200000)  # bornes incluses dans la tranche inférieure
+_KM_SCORES = (20, 10, 0)
+_KM_SCORE_FAIBLE = 15  # < 80 000 km
+
+_AGE_SEUILS = (1, 6, 24)  # heures
+_AGE_BONUS = ((15, 30), (10, 20), (5, 10), _NO_BONUS)  # < 1h: très prioritaire
+
+
+def _prix_bonus(prix: Optional[int]) -> tuple[int, int]:
+    """Score prix (approximatif sans config véhicule)"""
+    if not prix:
+        return _NO_BONUS
+    return _PRIX_BONUS[bisect_right(_PRIX_SEUILS, prix)]
+
+
+def _km_score(km: Optional[int]) -> int:
+    """Score kilométrage"""
+    if not km:
+        return 0
+    if km < _KM_MIN_IDEAL:
+        return _KM_SCORE_FAIBLE
+    return _KM_SCORES[bisect_left(_KM_SEUILS, km)]
+
+
+def _age_bonus(age_hours: float) -> tuple[int, int]:
+    """Score fraîcheur (boost priorité)"""
+    return _AGE_BONUS[bisect_right(_AGE_SEUILS, age_hours)]
+
 
 class ScanPhase(Enum):
     INDEX = "index"
     DETAIL = "detail"
 
 
-@dataclass
+@dataclass(slots=True)
 class IndexResult:
     """Résultat d'un scan index (données légères)"""
     url: str
@@ -54,7 +185,7 @@ class IndexResult:
     priority: int = 0  # Pour la queue (plus haut = plus prioritaire)
 
 
-@dataclass
+@dataclass(slots=True)
 class DetailResult:
     """Résultat d'un fetch détail (données complètes)"""
     description: str = ""
@@ -80,7 +211,7 @@ class DetailScraper(Protocol):
     async def fetch_detail(self, url: str) -> Optional[DetailResult]: ...
 
 
-@dataclass
+@dataclass(slots=True)
 class PipelineStats:
     """Statistiques d'exécution du pipeline"""
     started_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
@@ -107,9 +238,10 @@ class PipelineStats:
     
     @property
     def duration_seconds(self) -> float:
-        if self.finished_at:
-            return (self.finished_at - self.started_at).total_seconds()
-        return (datetime.now(timezone.utc) - self.started_at).total_seconds()
+        """Durée du run (0 tant que finished_at n'est pas renseigné)"""
+        if self.finished_at is None:
+            return 0.0
+        return (self.finished_at - self.started_at).total_seconds()
     
     def summary(self) -> str:
         return (
@@ -149,7 +281,7 @@ class Orchestrator:
         
         # Cache en mémoire pour éviter DB lookups répétés
         self._seen_urls: set[str] = set()
-        self._seen_source_listings: set[tuple[str, str]] = set()  # (source, source_listing_id)
+        self._seen_by_source: defaultdict[str, set[str]] = defaultdict(set)  # source -> {source_listing_id}
         
         # Scrapers enregistrés
         self._index_scrapers: dict[Source, IndexScraper] = {}
@@ -159,8 +291,22 @@ class Orchestrator:
         self._on_new_annonce: Optional[Callable[[Annonce], None]] = None
         self._on_urgent: Optional[Callable[[Annonce], None]] = None
         
-        # Concurrence pour detail fetch
-        self._detail_semaphore = asyncio.Semaphore(5)  # Max 5 fetches en parallèle
+        # Concurrence pour detail fetch (global + par source)
+        self._detail_workers = DETAIL_WORKERS
+        self._source_slots = self._new_source_slots()
+        
+        # Pool séparé pour sqlite: la boucle asyncio continue les fetches
+        self._db_executor = ThreadPoolExecutor(max_workers=DB_WORKERS, thread_name_prefix="orchestrator-db")
+    
+    @staticmethod
+    def _new_source_slots() -> defaultdict[Source, asyncio.Semaphore]:
+        """Un sémaphore par source, créé à la demande"""
+        return defaultdict(lambda: asyncio.Semaphore(DETAIL_PER_SOURCE))
+    
+    async def _db(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Exécute un appel repo synchrone dans le pool DB"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._db_executor, partial(fn, *args, **kwargs))
     
     def register_scraper(
         self,
@@ -208,75 +354,90 @@ class Orchestrator:
         if sources is None:
             sources = list(self._index_scrapers.keys())
         
-        # Phase 1: Index scan
+        # Phase 1: Index scan (toutes les sources en parallèle)
         all_index_results: list[IndexResult] = []
         
-        for source in sources:
-            if source not in self._index_scrapers:
+        scanned = [s for s in sources if s in self._index_scrapers]
+        scans = await asyncio.gather(
+            *(self._index_scrapers[s].scan_index(**scraper_kwargs) for s in scanned),
+            return_exceptions=True
+        )
+        
+        for source, results in zip(scanned, scans):
+            if isinstance(results, Exception):
+                _log_failure(f"Index scan error {source.value}", results)
+                stats.index_errors += 1
                 continue
             
-            try:
-                results = await self._index_scrapers[source].scan_index(**scraper_kwargs)
-                for r in results:
-                    r.source = source
-                all_index_results.extend(results)
-                stats.index_scanned += len(results)
-            except Exception as e:
-                print(f"❌ Index scan error {source.value}: {e}")
-                stats.index_errors += 1
+            for r in results:
+                r.source = source
+            all_index_results.extend(results)
+            stats.index_scanned += len(results)
         
         # Phase 2: Filtrage doublons
-        new_results = []
-        for result in all_index_results:
-            if self._is_duplicate(result):
-                stats.index_duplicates += 1
-                continue
-            new_results.append(result)
-            stats.index_new += 1
-        
-        # Phase 3: Scoring light + priorité
-        scored_results = self._score_light_batch(new_results)
+        new_results = self._filter_duplicates(all_index_results)
+        stats.index_new += len(new_results)
+        stats.index_duplicates += len(all_index_results) - len(new_results)
         
-        # Trier par priorité (score + fraîcheur)
-        scored_results.sort(key=lambda r: r.priority, reverse=True)
+        # Phase 3: Scoring light + priorité (une seule horloge pour tout le lot)
+        scored_results = self._score_light_batch(new_results, now=datetime.now(timezone.utc))
         
-        # Phase 4: Sélection pour détail
-        to_detail = [r for r in scored_results if r.score_light >= detail_threshold]
-        to_detail = to_detail[:max_detail_per_run]
+        # Phase 4: Sélection pour détail (top-K par priorité: score + fraîcheur)
+        candidates = [r for r in scored_results if r.score_light >= detail_threshold]
+        to_detail = heapq.nlargest(max_detail_per_run, candidates, key=_PRIORITY_KEY)
         
         stats.score_above_threshold = len(to_detail)
         
-        # Phase 5: Detail fetch + scoring final (avec concurrence)
-        async def process_one(index_result: IndexResult) -> Optional[Annonce]:
-            async with self._detail_semaphore:
-                return await self._process_with_detail(index_result, notify_threshold)
-        
-        # Lancer en parallèle avec semaphore
-        tasks = [process_one(r) for r in to_detail]
-        results = await asyncio.gather(*tasks, return_exceptions=True)
-        
-        for i, result in enumerate(results):
-            if isinstance(result, Exception):
-                print(f"❌ Detail error {to_detail[i].url}: {result}")
-                stats.detail_errors += 1
-            elif result is not None:
-                annonce = result
-                stats.detail_fetched += 1
-                
-                # Stats par niveau
-                if annonce.alert_level == AlertLevel.URGENT:
-                    stats.urgent_count += 1
-                elif annonce.alert_level == AlertLevel.INTERESSANT:
-                    stats.interessant_count += 1
-                
-                if annonce.notified:
-                    stats.notified += 1
-                
-                # Callback
-                if self._on_new_annonce:
-                    self._on_new_annonce(annonce)
-                if annonce.alert_level == AlertLevel.URGENT and self._on_urgent:
-                    self._on_urgent(annonce)
+        # Marque/modèle manquants: titres parsés en un lot avant les workers
+        self._fill_from_titles(to_detail)
+        
+        # Phase 5: Detail fetch + scoring final (workers sur une file)
+        self._source_slots = self._new_source_slots()  # liés à la boucle de ce run
+        work_q: asyncio.Queue[IndexResult] = asyncio.Queue()
+        for r in to_detail:
+            work_q.put_nowait(r)
+        to_save: list[Annonce] = []
+        
+        async def worker():
+            while not work_q.empty():
+                index_result = work_q.get_nowait()
+                try:
+                    result = await self._process_with_detail(index_result, notify_threshold)
+                except Exception as e:
+                    result = e
+                # Stats + callbacks dès la fin de chaque annonce (sans attendre le plus lent);
+                # un callback qui échoue n'arrête ni ce worker ni les autres
+                try:
+                    self._record_detail(stats, index_result, result)
+                except Exception as e:
+                    _log_failure(f"Detail callback error {index_result.url}", e)
+                if not isinstance(result, Annonce):
+                    continue
+                try:
+                    if result.notified:
+                        # État notifié persisté tout de suite (pas de renvoi si le run s'arrête)
+                        await self._db(self.repo.save_many, [result])
+                    else:
+                        to_save.append(result)
+                        if len(to_save) >= SAVE_BATCH_SIZE:
+                            batch = to_save.copy()
+                            to_save.clear()
+                            await self._db(self.repo.save_many, batch)
+                except Exception as e:
+                    _log_failure(f"Detail save error {index_result.url}", e)
+        
+        workers = [
+            asyncio.create_task(worker())
+            for _ in range(min(self._detail_workers, len(to_detail)))
+        ]
+        try:
+            await asyncio.gather(*workers)
+        finally:
+            # Annulation du run uniquement: les workers ne lèvent pas
+            for w in workers:
+                w.cancel()
+            # Persist (upsert sur fingerprint) du reste, une transaction
+            await self._db(self.repo.save_many, to_save)
         
         # Log scan history
         self._log_scan_history(sources, stats)
@@ -284,101 +445,131 @@ class Orchestrator:
         stats.finished_at = datetime.now(timezone.utc)
         return stats
     
-    def _is_duplicate(self, result: IndexResult) -> bool:
+    def _record_detail(self, stats: PipelineStats, index_result: IndexResult, result: Any):
+        """Comptabilise un résultat de detail fetch et déclenche les callbacks"""
+        if isinstance(result, Exception):
+            _log_failure(f"Detail error {index_result.url}", result)
+            stats.detail_errors += 1
+            return
+        if result is None:
+            return
+        
+        annonce = result
+        stats.detail_fetched += 1
+        
+        # Stats par niveau
+        if annonce.alert_level == AlertLevel.URGENT:
+            stats.urgent_count += 1
+        elif annonce.alert_level == AlertLevel.INTERESSANT:
+            stats.interessant_count += 1
+        
+        if annonce.notified:
+            stats.notified += 1
+        
+        # Callback
+        if self._on_new_annonce:
+            self._on_new_annonce(annonce)
+        if annonce.alert_level == AlertLevel.URGENT and self._on_urgent:
+            self._on_urgent(annonce)
+    
+    def _filter_duplicates(self, results: list[IndexResult]) -> list[IndexResult]:
         """
-        Vérifie si une annonce est un doublon.
+        Retire les doublons (cache mémoire puis une vérification DB groupée).
         Priorité: source_listing_id > url_canonique
         """
-        from models.annonce_v2 import canonicalize_url
+        urls = [canonicalize_url(r.url) for r in results]
+        
+        # Une seule requête pour tout ce qui n'est pas déjà en cache
+        known_listings, known_urls = self.repo.find_existing_keys(
+            listings=(
+                (r.source.value, r.source_listing_id) for r in results
+                if r.source_listing_id and r.source_listing_id not in self._seen_by_source[r.source.value]
+            ),
+            urls=(url for url in urls if url not in self._seen_urls),
+        )
+        known_by_source: defaultdict[str, set[str]] = defaultdict(set)
+        for source, source_listing_id in known_listings:
+            known_by_source[source].add(source_listing_id)
         
-        # 1. Check par source_listing_id (le plus fiable)
-        if result.source_listing_id:
-            key = (result.source.value, result.source_listing_id)
-            if key in self._seen_source_listings:
-                return True
-            
-            # Check DB
-            existing = self.repo.get_by_source_listing(result.source, result.source_listing_id)
-            if existing:
-                self._seen_source_listings.add(key)
-                return True
+        new_results = []
+        for result, url_canon in zip(results, urls):
+            # 1. Check par source_listing_id (le plus fiable)
+            listing_id = result.source_listing_id
+            if listing_id:
+                seen = self._seen_by_source[result.source.value]
+                if listing_id in seen:
+                    continue
+                seen.add(listing_id)
+                if listing_id in known_by_source[result.source.value]:
+                    continue
             
-            self._seen_source_listings.add(key)
-        
-        # 2. Fallback: check par URL
-        url_canon = canonicalize_url(result.url)
-        
-        if url_canon in self._seen_urls:
-            return True
-        
-        if self.repo.exists(url=url_canon):
+            # 2. Fallback: check par URL
+            if url_canon in self._seen_urls:
+                continue
             self._seen_urls.add(url_canon)
-            return True
+            if url_canon in known_urls:
+                continue
+            
+            new_results.append(result)
         
-        self._seen_urls.add(url_canon)
-        return False
+        return new_results
     
-    def _score_light_batch(self, results: list[IndexResult]) -> list[IndexResult]:
+    def _score_light_batch(
+        self,
+        results: list[IndexResult],
+        now: Optional[datetime] = None
+    ) -> list[IndexResult]:
         """
         Scoring léger basé sur les données d'index uniquement.
         Calcule aussi la priorité pour la queue.
+        
+        Args:
+            results: Résultats d'index à scorer (modifiés en place)
+            now: Instant de référence pour la fraîcheur (maintenant si None)
         """
-        for result in results:
-            score = 0
-            priority = 0
-            
-            # Score prix (approximatif sans config véhicule)
-            if result.prix:
-                if result.prix < 2000:
-                    score += 25
-                    priority += 20
-                elif result.prix < 3000:
-                    score += 20
-                    priority += 10
-                elif result.prix < 4000:
-                    score += 10
-            
-            # Score km
-            if result.kilometrage:
-                if 80000 <= result.kilometrage <= 150000:
-                    score += 20
-                elif result.kilometrage < 80000:
-                    score += 15
-                elif result.kilometrage <= 200000:
-                    score += 10
-            
-            # Score fraîcheur (boost priorité)
-            if result.published_at:
-                age_hours = (datetime.now(timezone.utc) - result.published_at).total_seconds() / 3600
-                if age_hours < 1:
-                    score += 15
-                    priority += 30  # Très prioritaire
-                elif age_hours < 6:
-                    score += 10
-                    priority += 20
-                elif age_hours < 24:
-                    score += 5
-                    priority += 10
-            
-            # Détection mots-clés dans titre (normalisé - sans accents)
-            titre_normalized = normalize_text(result.titre or "")
-            if any(kw in titre_normalized for kw in ["urgent", "vite", "depart", "demenagement"]):
-                score += 10
-                priority += 15
-            if any(kw in titre_normalized for kw in ["negociable", "a debattre", "nego"]):
-                score += 5
-            if any(kw in titre_normalized for kw in ["ct ok", "ct vierge", "controle technique ok"]):
-                score += 8
-            
-            # Pénalité mots risque dans titre (normalisé)
-            if any(kw in titre_normalized for kw in ["hs", "panne", "accident", "epave", "pour pieces"]):
-                score -= 20
-            
+        scores, priorities = self._score_numeric(results, now or datetime.now(timezone.utc))
+        self._score_keywords(results, scores, priorities)
+        
+        for result, score, priority in zip(results, scores, priorities):
             result.score_light = max(0, score)
             result.priority = priority + score
         
         return results
     
+    def _score_numeric(self, results: list[IndexResult], now: datetime) -> tuple[list[int], list[int]]:
+        """
+        Score prix / km / fraîcheur, colonne par colonne.
+        Retourne (scores, priorités) parallèles à results.
+        """
+        prix_bonus = [_prix_bonus(r.prix) for r in results]
+        km_scores = [_km_score(r.kilometrage) for r in results]
+        age_bonus = [
+            _age_bonus((now - r.published_at).total_seconds() / 3600) if r.published_at else _NO_BONUS
+            for r in results
+        ]
+        
+        scores = [p[0] + k + a[0] for p, k, a in zip(prix_bonus, km_scores, age_bonus)]
+        priorities = [p[1] + a[1] for p, a in zip(prix_bonus, age_bonus)]
+        return scores, priorities
+    
+    def _score_keywords(self, results: list[IndexResult], scores: list[int], priorities: list[int]):
+        """Ajoute aux colonnes le score des mots-clés du titre (normalisé - sans accents)"""
+        for i, result in enumerate(results):
+            tags = _titre_tags(result.titre or "")
+            if not tags:
+                continue
+            if "urgence" in tags:
+                scores[i] += 10
+                priorities[i] += 15
+            if "nego" in tags:
+                scores[i] += 5
+            if "ct_ok" in tags:
+                scores[i] += 8
+            
+            # Pénalité mots risque dans titre
+            if "risque" in tags:
+                scores[i] -= 20
+    
     async def _process_with_detail(
         self, 
         index_result: IndexResult,
@@ -388,32 +579,37 @@ class Orchestrator:
         Fetch le détail et crée l'annonce complète.
         Utilise should_notify pour des notifications intelligentes.
         """
-        from services.notifier.discord import should_notify, send_update_notification
-        
         source = index_result.source
         
         # Chercher une annonce existante (pour near-duplicate / update)
         existing = None
         if index_result.source_listing_id:
-            existing = self.repo.get_by_source_listing(source, index_result.source_listing_id)
+            existing = await self._db(self.repo.get_by_source_listing, source, index_result.source_listing_id)
         
         # Créer l'annonce de base depuis l'index
         annonce = self._index_to_annonce(index_result)
         
         # Check near-duplicate
-        is_near_dup, near_dup_existing = self.repo.is_near_duplicate(annonce)
+        is_near_dup, near_dup_existing = await self._db(self.repo.is_near_duplicate, annonce)
         if is_near_dup and near_dup_existing and not existing:
             # Near-duplicate trouvé - on peut merger ou ignorer
             existing = near_dup_existing
         
+        # Déjà notifiée et données d'index identiques: le score final ne
+        # changerait pas, ni fetch détail ni re-scoring
+        if existing and existing.notified and self._index_unchanged(existing, index_result):
+            return None
+        
         # Fetch détail si scraper disponible
         if source in self._detail_scrapers:
             try:
-                detail = await self._detail_scrapers[source].fetch_detail(index_result.url)
+                async with self._source_slots[source]:
+                    detail = await self._detail_scrapers[source].fetch_detail(index_result.url)
                 if detail:
                     self._merge_detail(annonce, detail)
-            except Exception as e:
-                print(f"⚠️ Detail fetch failed: {e}")
+            except _FETCH_ERRORS as e:
+                # Réseau: on continue avec les données d'index
+                logger.warning("Detail fetch failed %s: %s", index_result.url, e)
         
         # Scoring final
         self.scorer.calculate_score(annonce)
@@ -436,11 +632,30 @@ class Orchestrator:
             if success:
                 annonce.mark_notified(["discord"])
         
-        # Persist (upsert sur fingerprint)
-        self.repo.save(annonce)
-        
+        # Persistance par run_pipeline (immédiate si notifiée, sinon groupée)
         return annonce
     
+    @staticmethod
+    def _index_unchanged(existing: Annonce, index_result: IndexResult) -> bool:
+        """Vrai si prix, km et titre de l'index sont ceux déjà enregistrés"""
+        return (
+            existing.prix == index_result.prix
+            and existing.kilometrage == index_result.kilometrage
+            and existing.titre == index_result.titre
+        )
+    
+    def _fill_from_titles(self, results: list[IndexResult]):
+        """Complète marque/modele/version vides depuis le titre (parse groupé)"""
+        missing = [r for r in results if not r.marque or not r.modele]
+        if not missing:
+            return
+        
+        parsed = self.normalizer.parse_titles_batch([r.titre for r in missing])
+        for result, (marque, modele, version) in zip(missing, parsed):
+            result.marque = result.marque or marque
+            result.modele = result.modele or modele
+            result.version = result.version or version
+    
     def _index_to_annonce(self, result: IndexResult) -> Annonce:
         """Convertit un IndexResult en Annonce"""
         # Utiliser marque/modele du scraper si disponible, sinon parser le titre
@@ -501,33 +716,29 @@ class Orchestrator:
             return False
         
         try:
-            from services.notifier.discord import send_discord_notification
-            success = await send_discord_notification(annonce)
-            if success:
-                self.repo.mark_notified(annonce.id, ["discord"])
-            return success
+            # L'état notifié est persisté avec l'annonce (save_many)
+            return await send_discord_notification(annonce)
         except Exception as e:
-            print(f"❌ Notification error: {e}")
+            _log_failure("Notification error", e)
             return False
     
     def _log_scan_history(self, sources: list[Source], stats: PipelineStats):
         """Log l'historique du scan pour observabilité"""
         try:
-            for source in sources:
-                self.repo.log_scan(
-                    source=source.value,
-                    index_count=stats.index_scanned,
-                    new_count=stats.index_new,
-                    notified_count=stats.notified,
-                    error_count=stats.index_errors + stats.detail_errors
-                )
+            self.repo.log_scans(
+                sources=[source.value for source in sources],
+                index_count=stats.index_scanned,
+                new_count=stats.index_new,
+                notified_count=stats.notified,
+                error_count=stats.index_errors + stats.detail_errors
+            )
         except Exception as e:
-            print(f"⚠️ Failed to log scan history: {e}")
+            logger.warning("Failed to log scan history: %s", e)
     
     def clear_cache(self):
         """Vide le cache en mémoire"""
         self._seen_urls.clear()
-        self._seen_source_listings.clear()
+        self._seen_by_source.clear()
     
     def preload_cache(self, hours: int = 24):
         """
@@ -538,23 +749,23 @@ class Orchestrator:
         
         cutoff = datetime.now(timezone.utc) - timedelta(hours=hours)
         
-        # Charger les URLs des dernières X heures
-        annonces = self.repo.get_all(limit=5000, order_by="created_at DESC")
-        
-        for a in annonces:
-            if a.created_at and a.created_at >= cutoff:
-                self._seen_urls.add(a.url_canonique)
-                if a.source_listing_id:
-                    self._seen_source_listings.add((a.source.value, a.source_listing_id))
+        # Charger les clés des dernières X heures (filtre fait en SQL)
+        for url_canonique, source, source_listing_id in self.repo.get_cache_keys(since=cutoff):
+            self._seen_urls.add(url_canonique)
+            if source_listing_id:
+                self._seen_by_source[source].add(source_listing_id)
 
 
 # Instance globale
 _orchestrator: Optional[Orchestrator] = None
+_orchestrator_lock = threading.Lock()
 
 
 def get_orchestrator() -> Orchestrator:
-    """Retourne l'instance de l'orchestrateur"""
+    """Retourne l'instance de l'orchestrateur (création unique, thread-safe)"""
     global _orchestrator
     if _orchestrator is None:
-        _orchestrator = Orchestrator()
+        with _orchestrator_lock:
+            if _orchestrator is None:
+                _orchestrator = Orchestrator()
     return _orchestrator
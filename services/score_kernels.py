@@ -0,0 +1,147 @@
+"""
+Noyaux numériques du scoring (prix, km, fraîcheur)
+- Arguments et retours primitifs uniquement (aucun objet Python)
+- Compilés par Numba (njit, cache disque) si le paquet est installé
+- Chaque noyau retourne (score, cas): le service construit le détail texte
+- score_batch_kernel: lot entier en tableaux (SoA), boucle parallèle (prange)
+"""
+
+from __future__ import annotations
+
+from array import array
+
+try:
+    import numba  # Optionnel: compilation JIT des noyaux numériques
+except ImportError:
+    numba = None
+
+
+JIT_AVAILABLE = numba is not None
+prange = numba.prange if numba is not None else range
+
+
+def _jit(fn):
+    """njit(cache=True) si Numba est disponible, sinon la fonction telle quelle"""
+    if numba is None:
+        return fn
+    return numba.njit(cache=True)(fn)
+
+
+def _jit_parallel(fn):
+    """njit(parallel=True, cache=True) si Numba est disponible"""
+    if numba is None:
+        return fn
+    return numba.njit(parallel=True, cache=True)(fn)
+
+
+# Cas du score prix
+PRIX_TRES_BAS = 0
+PRIX_TROP_ELEVE = 1
+PRIX_FOURCHETTE_INVALIDE = 2
+PRIX_SOUS_MARCHE = 3
+PRIX_DANS_FOURCHETTE = 4
+
+# Cas du score kilométrage
+KM_TROP_BAS = 0
+KM_TROP_ELEVE = 1
+KM_IDEAL = 2
+KM_SOUS_IDEAL = 3
+KM_AU_DESSUS_IDEAL = 4
+
+# Cas du score fraîcheur
+FRESH_1H = 0
+FRESH_6H = 1
+FRESH_24H = 2
+FRESH_48H = 3
+FRESH_SEMAINE = 4
+FRESH_ANCIEN = 5
+
+
+@_jit
+def score_prix_kernel(prix, prix_min, prix_max, prix_marche, max_pts):
+    """Score prix: position dans la fourchette + bonus sous le marché (prix_marche=0: inconnu)"""
+    if prix < prix_min:
+        return int(max_pts * 0.3), PRIX_TRES_BAS
+    if prix > prix_max:
+        return 0, PRIX_TROP_ELEVE
+
+    range_total = prix_max - prix_min
+    if range_total <= 0:
+        return int(max_pts * 0.5), PRIX_FOURCHETTE_INVALIDE
+
+    score = int(max_pts * ((prix_max - prix) / range_total))
+    if prix_marche and prix < prix_marche * 0.8:
+        return min(max_pts, score + int(max_pts * 0.2)), PRIX_SOUS_MARCHE
+    return score, PRIX_DANS_FOURCHETTE
+
+
+@_jit
+def score_km_kernel(km, km_min, km_max, km_ideal_min, km_ideal_max, max_pts):
+    """Score kilométrage: max dans la plage idéale, dégressif autour"""
+    if km < km_min:
+        return int(max_pts * 0.4), KM_TROP_BAS
+    if km > km_max:
+        return 0, KM_TROP_ELEVE
+    if km_ideal_min <= km <= km_ideal_max:
+        return max_pts, KM_IDEAL
+
+    if km < km_ideal_min:
+        ratio = (km - km_min) / (km_ideal_min - km_min) if km_ideal_min > km_min else 1
+        return int(max_pts * (0.7 + 0.3 * ratio)), KM_SOUS_IDEAL
+
+    ratio = (km_max - km) / (km_max - km_ideal_max) if km_max > km_ideal_max else 0
+    return int(max_pts * ratio * 0.7), KM_AU_DESSUS_IDEAL
+
+
+@_jit
+def score_freshness_kernel(hours, max_pts):
+    """Score fraîcheur selon l'âge de l'annonce en heures"""
+    if hours < 1:
+        return max_pts, FRESH_1H
+    if hours < 6:
+        return int(max_pts * 0.9), FRESH_6H
+    if hours < 24:
+        return int(max_pts * 0.7), FRESH_24H
+    if hours < 48:
+        return int(max_pts * 0.5), FRESH_48H
+    if hours < 168:  # 1 semaine
+        return int(max_pts * 0.3), FRESH_SEMAINE
+    return 0, FRESH_ANCIEN
+
+
+@_jit_parallel
+def score_batch_kernel(
+    prix, km, hours,
+    prix_min, prix_max, prix_marche,
+    km_min, km_max, km_ideal_min, km_ideal_max,
+    max_prix, max_km, max_fresh,
+    out_scores, out_cases,
+):
+    """
+    Scores prix/km/fraîcheur d'un lot (un élément par annonce dans chaque
+    tableau d'entrée). Sorties entrelacées: out[3*i] prix, +1 km, +2 fraîcheur.
+    Les annonces sont indépendantes: boucle parallèle sans GIL sous Numba.
+    """
+    for i in prange(len(prix)):
+        j = 3 * i
+        out_scores[j], out_cases[j] = score_prix_kernel(
+            prix[i], prix_min[i], prix_max[i], prix_marche[i], max_prix
+        )
+        out_scores[j + 1], out_cases[j + 1] = score_km_kernel(
+            km[i], km_min[i], km_max[i], km_ideal_min[i], km_ideal_max[i], max_km
+        )
+        out_scores[j + 2], out_cases[j + 2] = score_freshness_kernel(hours[i], max_fresh)
+
+
+def new_batch_outputs(size: int) -> tuple[array, array]:
+    """Tableaux de sortie (scores, cas) pour score_batch_kernel"""
+    return array("q", bytes(8 * 3 * size)), array("q", bytes(8 * 3 * size))
+
+
+def warmup():
+    """Compile les noyaux à l'avance (no-op sans Numba)"""
+    if not JIT_AVAILABLE:
+        return
+    score_prix_kernel(2000, 1000, 5000, 3000.0, 40)
+    score_km_kernel(150000, 50000, 200000, 50000, 170000, 30)
+    score_freshness_kernel(2.0, 10)
@@ -2,6 +2,11 @@
 Scoring Service - Calcul du score de rentabilité des annonces
 """
 
+import logging
+from bisect import bisect_left
+from dataclasses import dataclass
+from itertools import accumulate
+from operator import attrgetter
 from typing import List, Optional, Tuple
 from datetime import datetime
 
@@ -13,9 +18,69 @@ from config import (
     SEUILS_ALERTE,
     DEPARTEMENTS_PRIORITAIRES
 )
-from utils.logger import get_logger
+from services.keywords import SubstringScanner
 
-logger = get_logger(__name__)
+logger = logging.getLogger(__name__)
+
+# Clé de tri en C (pas d'appel de lambda par annonce)
+_CLE_SCORE = attrgetter("score_rentabilite")
+
+# Recherche O(1) des départements prioritaires
+_DEPT_PRIO_SET = frozenset(DEPARTEMENTS_PRIORITAIRES)
+
+# Points par palier (du plus favorable au moins favorable, dernier = hors fourchette)
+SCORES_PRIX = (40, 35, 30, 20, 10, 0)
+SCORES_KM = (30, 25, 15, 5, 0)
+
+
+def _paliers(*seuils: float) -> Tuple[float, ...]:
+    """
+    Seuils cumulés (max glissant): bisect_left donne le premier palier
+    atteint, comme la cascade de `<=` même si la config n'est pas ordonnée.
+    """
+    return tuple(accumulate(seuils, max))
+
+
+@dataclass(slots=True, frozen=True)
+class CibleMinuscules:
+    """Critères texte d'un véhicule cible, en minuscules"""
+    marque: str
+    modeles: Tuple[str, ...]
+    motorisation_exclude: Tuple[str, ...]
+    motorisation_include: Tuple[str, ...]
+    
+    @classmethod
+    def from_config(cls, config: dict) -> "CibleMinuscules":
+        return cls(
+            marque=config.get("marque", "").lower(),
+            modeles=tuple(m.lower() for m in config.get("modele", [])),
+            motorisation_exclude=tuple(m.lower() for m in config.get("motorisation_exclude", [])),
+            motorisation_include=tuple(m.lower() for m in config.get("motorisation_include", [])),
+        )
+
+
+@dataclass(slots=True, frozen=True)
+class TablesScore:
+    """Seuils prix/km d'un véhicule cible, calculés une fois au chargement"""
+    prix_min: float
+    paliers_prix: Tuple[float, ...]
+    km_ideal_min: float
+    paliers_km: Tuple[float, ...]
+    
+    @classmethod
+    def from_config(cls, config: dict) -> "TablesScore":
+        prix_ideal = config.get("prix_ideal_max", config.get("prix_max", 3000))
+        prix_max = config.get("prix_max", 4000)
+        km_ideal_max = config.get("km_ideal_max", 160000)
+        km_max = config.get("km_max", 200000)
+        return cls(
+            prix_min=config.get("prix_min", 1500),
+            paliers_prix=_paliers(
+                prix_ideal * 0.7, prix_ideal * 0.85, prix_ideal, prix_max * 0.9, prix_max
+            ),
+            km_ideal_min=config.get("km_ideal_min", config.get("km_min", 100000)),
+            paliers_km=_paliers(km_ideal_max, km_ideal_max * 1.1, km_max * 0.9, km_max),
+        )
 
 
 class ScoringService:
@@ -25,11 +90,28 @@ class ScoringService:
         self.vehicules_cibles = VEHICULES_CIBLES
         self.mots_cles_opportunite = MOTS_CLES_OPPORTUNITE
         self.mots_cles_exclusion = MOTS_CLES_EXCLUSION
+        
+        # Recherche des mots-clés en une passe (clé = mot de la config)
+        self._opportunite_scanner = SubstringScanner({mot: [mot] for mot in self.mots_cles_opportunite})
+        self._exclusion_scanner = SubstringScanner({mot: [mot] for mot in self.mots_cles_exclusion})
+        
+        # Critères texte des véhicules cibles mis en minuscules une fois
+        self._cibles_lc = {
+            vehicule_id: CibleMinuscules.from_config(config)
+            for vehicule_id, config in self.vehicules_cibles.items()
+        }
+        
+        # Seuils prix/km précalculés par véhicule cible
+        self._tables = {
+            vehicule_id: TablesScore.from_config(config)
+            for vehicule_id, config in self.vehicules_cibles.items()
+        }
     
-    def calculer_score(self, annonce: Annonce) -> Tuple[int, List[str]]:
+    def calculer_score(self, annonce: Annonce, maintenant: Optional[datetime] = None) -> Tuple[int, List[str]]:
         """
         Calcule le score de rentabilité d'une annonce.
         Retourne (score, mots_cles_detectes)
+        maintenant: heure de référence pour la fraîcheur (partagée par un lot)
         """
         score = 0
         mots_cles = []
@@ -40,24 +122,28 @@ class ScoringService:
         if not vehicule_config:
             return 0, []
         
+        # Texte titre + description en minuscules, construit une seule fois
+        texte = f"{annonce.titre or ''} {annonce.description or ''}".lower()
+        
         # 1. Score Prix (40 points max)
-        score += self._score_prix(annonce.prix, vehicule_config)
+        tables = self._tables[vehicule_id]
+        score += self._score_prix(annonce.prix, tables)
         
         # 2. Score Kilométrage (30 points max)
-        score += self._score_kilometrage(annonce.kilometrage, vehicule_config)
+        score += self._score_kilometrage(annonce.kilometrage, tables)
         
         # 3. Score Mots-clés opportunité (20 points max)
-        points_mots_cles, mots_cles = self._score_mots_cles(annonce)
+        points_mots_cles, mots_cles = self._score_mots_cles(annonce, texte)
         score += points_mots_cles
         
         # 4. Score Fraîcheur (10 points max)
-        score += self._score_fraicheur(annonce.date_publication)
+        score += self._score_fraicheur(annonce.date_publication, maintenant)
         
         # 5. Bonus/Malus
-        score += self._score_bonus(annonce, vehicule_config)
+        score += self._score_bonus(annonce, vehicule_config, texte)
         
         # 6. Pénalités (mots-clés d'exclusion)
-        if self._contient_exclusion(annonce):
+        if self._contient_exclusion(annonce, texte):
             score = max(0, score - 50)
         
         # Plafonner le score
@@ -80,8 +166,9 @@ class ScoringService:
         titre = (annonce.titre or "").lower()
         
         for vehicule_id, config in self.vehicules_cibles.items():
-            marque_config = config.get("marque", "").lower()
-            modeles_config = [m.lower() for m in config.get("modele", [])]
+            cible = self._cibles_lc[vehicule_id]
+            marque_config = cible.marque
+            modeles_config = cible.modeles
             
             # Vérifier la marque
             if marque_config and marque_config not in marque_annonce and marque_config not in titre:
@@ -98,7 +185,7 @@ class ScoringService:
                 continue
             
             # Vérifier les motorisations à inclure
-            motorisation_ok = self._verifier_motorisation(annonce, config)
+            motorisation_ok = self._verifier_motorisation(annonce, cible)
             if not motorisation_ok:
                 continue
             
@@ -106,22 +193,21 @@ class ScoringService:
         
         return None, None
     
-    def _verifier_motorisation(self, annonce: Annonce, config: dict) -> bool:
+    def _verifier_motorisation(self, annonce: Annonce, cible: "CibleMinuscules") -> bool:
         """Vérifie si la motorisation correspond aux critères"""
         texte = f"{annonce.titre or ''} {annonce.description or ''} {annonce.motorisation or ''}".lower()
         
         # Vérifier les exclusions d'abord
-        for exclu in config.get("motorisation_exclude", []):
-            if exclu.lower() in texte:
+        for exclu in cible.motorisation_exclude:
+            if exclu in texte:
                 return False
         
         # Vérifier les inclusions (au moins une doit matcher)
-        inclusions = config.get("motorisation_include", [])
-        if not inclusions:
+        if not cible.motorisation_include:
             return True
         
-        for inclu in inclusions:
-            if inclu.lower() in texte:
+        for inclu in cible.motorisation_include:
+            if inclu in texte:
                 return True
         
         # Si on a des inclusions mais aucune ne matche, 
@@ -131,72 +217,42 @@ class ScoringService:
         
         return False
     
-    def _score_prix(self, prix: Optional[int], config: dict) -> int:
+    def _score_prix(self, prix: Optional[int], tables: TablesScore) -> int:
         """Calcule le score basé sur le prix (40 points max)"""
         if not prix:
             return 10  # Score neutre si pas de prix
         
-        prix_ideal = config.get("prix_ideal_max", config.get("prix_max", 3000))
-        prix_min = config.get("prix_min", 1500)
-        prix_max = config.get("prix_max", 4000)
-        
-        if prix < prix_min:
+        if prix < tables.prix_min:
             return 40  # Très bon prix (possiblement trop beau?)
-        elif prix <= prix_ideal * 0.7:
-            return 40  # Excellent
-        elif prix <= prix_ideal * 0.85:
-            return 35
-        elif prix <= prix_ideal:
-            return 30
-        elif prix <= prix_max * 0.9:
-            return 20
-        elif prix <= prix_max:
-            return 10
-        else:
-            return 0
+        return SCORES_PRIX[bisect_left(tables.paliers_prix, prix)]
     
-    def _score_kilometrage(self, km: Optional[int], config: dict) -> int:
+    def _score_kilometrage(self, km: Optional[int], tables: TablesScore) -> int:
         """Calcule le score basé sur le kilométrage (30 points max)"""
         if not km:
             return 10  # Score neutre
         
-        km_ideal_min = config.get("km_ideal_min", config.get("km_min", 100000))
-        km_ideal_max = config.get("km_ideal_max", 160000)
-        km_max = config.get("km_max", 200000)
-        
-        if km < km_ideal_min:
+        if km < tables.km_ideal_min:
             return 30  # Très bas km
-        elif km <= km_ideal_max:
-            return 30  # Zone idéale
-        elif km <= km_ideal_max * 1.1:
-            return 25
-        elif km <= km_max * 0.9:
-            return 15
-        elif km <= km_max:
-            return 5
-        else:
-            return 0
+        return SCORES_KM[bisect_left(tables.paliers_km, km)]
     
-    def _score_mots_cles(self, annonce: Annonce) -> Tuple[int, List[str]]:
+    def _score_mots_cles(self, annonce: Annonce, texte: Optional[str] = None) -> Tuple[int, List[str]]:
         """Calcule le score basé sur les mots-clés opportunité (20 points max)"""
-        texte = f"{annonce.titre or ''} {annonce.description or ''}".lower()
-        mots_trouves = []
-        
-        for mot in self.mots_cles_opportunite:
-            if mot.lower() in texte:
-                mots_trouves.append(mot)
+        if texte is None:
+            texte = f"{annonce.titre or ''} {annonce.description or ''}".lower()
+        trouves = self._opportunite_scanner.find(texte)
+        mots_trouves = [mot for mot in self.mots_cles_opportunite if mot in trouves]
         
         # 5 points par mot-clé, max 20 points
         score = min(len(mots_trouves) * 5, 20)
         
         return score, mots_trouves
     
-    def _score_fraicheur(self, date_pub: Optional[datetime]) -> int:
+    def _score_fraicheur(self, date_pub: Optional[datetime], maintenant: Optional[datetime] = None) -> int:
         """Calcule le score basé sur la fraîcheur (10 points max)"""
         if not date_pub:
             return 5  # Score neutre
         
-        age_minutes = (datetime.now() - date_pub).total_seconds() / 60
+        age_minutes = ((maintenant or datetime.now()) - date_pub).total_seconds() / 60
         
         if age_minutes < 5:
             return 10
@@ -211,13 +267,14 @@ class ScoringService:
         else:
             return 0
     
-    def _score_bonus(self, annonce: Annonce, config: dict) -> int:
+    def _score_bonus(self, annonce: Annonce, config: dict, texte: Optional[str] = None) -> int:
         """Calcule les bonus/malus additionnels"""
         bonus = 0
-        texte = f"{annonce.titre or ''} {annonce.description or ''}".lower()
+        if texte is None:
+            texte = f"{annonce.titre or ''} {annonce.description or ''}".lower()
         
         # Bonus département prioritaire
-        if annonce.departement in DEPARTEMENTS_PRIORITAIRES:
+        if annonce.departement in _DEPT_PRIO_SET:
             bonus += 5
         
         # Bonus Stepway au prix Sandero
@@ -244,15 +301,11 @@ class ScoringService:
         
         return bonus
     
-    def _contient_exclusion(self, annonce: Annonce) -> bool:
+    def _contient_exclusion(self, annonce: Annonce, texte: Optional[str] = None) -> bool:
         """Vérifie si l'annonce contient des mots-clés d'exclusion"""
-        texte = f"{annonce.titre or ''} {annonce.description or ''}".lower()
-        
-        for mot in self.mots_cles_exclusion:
-            if mot.lower() in texte:
-                return True
-        
-        return False
+        if texte is None:
+            texte = f"{annonce.titre or ''} {annonce.description or ''}".lower()
+        return bool(self._exclusion_scanner.find(texte))
     
     def _calculer_marge(self, annonce: Annonce, config: dict):
         """Calcule la marge potentielle estimée"""
@@ -269,13 +322,18 @@ class ScoringService:
         annonce.marge_estimee_min = max(0, revente_min - annonce.prix - cout_reparation_estime)
         annonce.marge_estimee_max = max(0, revente_max - annonce.prix - cout_reparation_estime // 2)
     
+    def calculer_scores(self, annonces: List[Annonce], maintenant: Optional[datetime] = None) -> List[int]:
+        """Calcule le score d'un lot d'annonces (seuils par véhicule et heure partagés)"""
+        maintenant = maintenant or datetime.now()
+        return [self.calculer_score(annonce, maintenant)[0] for annonce in annonces]
+    
     def filtrer_par_score(self, annonces: List[Annonce], score_min: int = 40) -> List[Annonce]:
         """Filtre les annonces par score minimum"""
         return [a for a in annonces if a.score_rentabilite >= score_min]
     
     def trier_par_score(self, annonces: List[Annonce]) -> List[Annonce]:
         """Trie les annonces par score décroissant"""
-        return sorted(annonces, key=lambda a: a.score_rentabilite, reverse=True)
+        return sorted(annonces, key=_CLE_SCORE, reverse=True)
     
     def get_niveau_alerte(self, score: int) -> str:
         """Retourne le niveau d'alerte pour un score donné"""
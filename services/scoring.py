@@ -7,25 +7,186 @@ Scoring Service V2 - Calcul de score explicable
 
 from __future__ import annotations
 
+import logging
 import re
+from array import array
+from dataclasses import dataclass
 from datetime import datetime, timezone
+from functools import lru_cache
 from pathlib import Path
 from typing import Any, Optional
 
-import yaml
-
 from models.annonce_v2 import Annonce, ScoreBreakdown
 from models.enums import AlertLevel, SellerType, AnnonceStatus
-from config.settings import CONFIG_DIR
+from config.settings import load_yaml_config
+from services import score_kernels
+from services.keywords import SubstringScanner
+from services.score_kernels import (
+    new_batch_outputs,
+    score_batch_kernel,
+    score_freshness_kernel,
+    score_km_kernel,
+    score_prix_kernel,
+)
+
+logger = logging.getLogger(__name__)
 
 
 def load_yaml(filename: str) -> dict[str, Any]:
-    """Charge un fichier YAML de config"""
-    path = CONFIG_DIR / filename
-    if path.exists():
-        with open(path, "r", encoding="utf-8") as f:
-            return yaml.safe_load(f) or {}
-    return {}
+    """Charge un fichier YAML de config (parse mis en cache, libyaml si dispo)"""
+    return load_yaml_config(filename)
+
+
+# Taille du mémo d'identification véhicule (entrées)
+IDENTIFY_CACHE_SIZE = 4096
+
+# Score minimal d'une alerte (AlertLevel.SURVEILLER)
+ALERT_MIN_SCORE = 40
+
+# Catégories des clés du scanner de mots-clés
+OPPORTUNITE = "opportunite"
+RISQUE = "risque"
+EXCLUSION = "exclusion"
+
+
+def _lower_text(*parts: Optional[str]) -> str:
+    """Concatène les champs texte (None ignorés) en minuscules"""
+    return " ".join(part or "" for part in parts).lower()
+
+
+# Indices carburant cherchés dans titre/version quand le champ ne correspond pas
+CARBURANT_HINTS = {
+    "diesel": re.compile("hdi|dci|tdi|diesel|d-4d"),
+    "essence": re.compile(r"vti|tce|essence|1\.2|1\.4"),
+}
+
+
+@dataclass(slots=True, frozen=True)
+class CompiledVehicle:
+    """
+    Config véhicule avec patterns précompilés (construite au chargement).
+    Les textes comparés sont déjà en minuscules: les patterns sans
+    majuscule sont compilés sans IGNORECASE (matching plus direct).
+    Porte aussi les paramètres dérivés (bonus en minuscules, bornes
+    prix/km) sans modifier la config.
+    """
+    vehicle_id: str
+    config: dict[str, Any]
+    marque: str
+    modele_patterns: tuple[re.Pattern, ...]
+    carburant: Optional[str]
+    carburant_hints: Optional[re.Pattern]
+    exclusions: Optional[re.Pattern]
+    bonus_lc: tuple[tuple[str, str, Any], ...]
+    prix_bounds: tuple[Any, Any, Any]
+    km_bounds: tuple[Any, Any, Any, Any]
+
+    def matches_modele(self, modele: str, titre: str, version: str) -> bool:
+        for regex in self.modele_patterns:
+            if regex.search(modele) or regex.search(titre) or regex.search(version):
+                return True
+        return False
+
+
+def match_vehicle(
+    candidates: tuple[CompiledVehicle, ...],
+    modele: str,
+    titre: str,
+    version: str,
+    carburant: str
+) -> tuple[str, Optional[dict[str, Any]]]:
+    """Premier véhicule candidat qui correspond (champs de l'annonce en minuscules)"""
+    for vehicle in candidates:
+        # Vérifier le modèle avec patterns regex
+        if not vehicle.matches_modele(modele, titre, version):
+            continue
+        
+        # Vérifier le carburant si spécifié
+        if vehicle.carburant and vehicle.carburant not in carburant:
+            # Vérifier aussi dans le titre/version
+            carburant_ok = vehicle.carburant_hints is not None and bool(
+                vehicle.carburant_hints.search(f"{titre} {version}")
+            )
+            if not carburant_ok and carburant != "unknown":
+                continue
+        
+        # Vérifier les exclusions du véhicule
+        if vehicle.exclusions and (
+            vehicle.exclusions.search(titre) or vehicle.exclusions.search(version)
+        ):
+            continue
+        
+        return vehicle.vehicle_id, vehicle.config
+    
+    return "", None
+
+
+def lowercase_bonus(vehicle_config: dict[str, Any]) -> tuple[tuple[str, str, Any], ...]:
+    """Bonus véhicule en (nom, nom en minuscules, valeur)"""
+    return tuple(
+        (name, name.lower(), value) for name, value in vehicle_config.get("bonus", {}).items()
+    )
+
+
+def prix_bounds(vehicle_config: dict[str, Any]) -> tuple[Any, Any, Any]:
+    """(prix_min, prix_max, prix_marche_median) d'un véhicule cible"""
+    criteres = vehicle_config.get("criteres", {})
+    return (
+        criteres.get("prix_min", 1000),
+        criteres.get("prix_max", 5000),
+        vehicle_config.get("estimation", {}).get("prix_marche_median"),
+    )
+
+
+def km_bounds(vehicle_config: dict[str, Any]) -> tuple[Any, Any, Any, Any]:
+    """(km_min, km_max, km_ideal_min, km_ideal_max) d'un véhicule cible"""
+    criteres = vehicle_config.get("criteres", {})
+    km_min = criteres.get("km_min", 50000)
+    km_max = criteres.get("km_max", 200000)
+    return (
+        km_min,
+        km_max,
+        criteres.get("km_ideal_min", km_min),
+        criteres.get("km_ideal_max", km_max - 30000),
+    )
+
+
+def _mask_of(entries: tuple[tuple[Any, ...], ...]) -> int:
+    """Masque réunissant les bits (2e élément) de chaque entrée"""
+    mask = 0
+    for entry in entries:
+        mask |= entry[1]
+    return mask
+
+
+def compile_vehicles(vehicles: dict[str, Any]) -> tuple[CompiledVehicle, ...]:
+    """Précompile les patterns des véhicules cibles (ordre de la config conservé)"""
+    compiled = []
+    for vehicle_id, config in vehicles.items():
+        patterns = []
+        for pattern in config.get("modele_patterns", []):
+            flags = 0 if pattern == pattern.lower() else re.IGNORECASE
+            try:
+                patterns.append(re.compile(pattern, flags))
+            except re.error as e:
+                # Validé une seule fois au chargement: pattern invalide ignoré
+                logger.warning("Invalid modele pattern %r for %s: %s", pattern, vehicle_id, e)
+        
+        carburant = config.get("carburant")
+        exclusions = [excl.lower() for excl in config.get("exclusions", [])]
+        compiled.append(CompiledVehicle(
+            vehicle_id=vehicle_id,
+            config=config,
+            marque=config.get("marque", "").lower(),
+            modele_patterns=tuple(patterns),
+            carburant=carburant.lower() if carburant else None,
+            carburant_hints=CARBURANT_HINTS.get(carburant),
+            exclusions=re.compile("|".join(map(re.escape, exclusions))) if exclusions else None,
+            bonus_lc=lowercase_bonus(config),
+            prix_bounds=prix_bounds(config),
+            km_bounds=km_bounds(config),
+        ))
+    return tuple(compiled)
 
 
 class ScoringService:
@@ -41,7 +202,10 @@ class ScoringService:
     - Pénalités risques (soustractif)
     """
     
-    def __init__(self):
+    def __init__(self, verbose_breakdown: bool = True):
+        # verbose_breakdown=False: pas de textes de détail (scoring en masse)
+        self.verbose_breakdown = verbose_breakdown
+        
         # Charger les configs YAML
         self.vehicles_config = load_yaml("vehicles.yaml")
         self.keywords_config = load_yaml("keywords.yaml")
@@ -54,27 +218,174 @@ class ScoringService:
             "freshness": 10,
             "bonus": 5
         })
+        self._w_prix = self.weights.get("prix", 40)
+        self._w_km = self.weights.get("km", 30)
+        self._w_keywords = self.weights.get("keywords", 15)
+        self._w_freshness = self.weights.get("freshness", 10)
+        self._w_bonus = self.weights.get("bonus", 5)
         
         # Véhicules cibles
         self.vehicles = self.vehicles_config.get("vehicles", {})
+        self._compiled_vehicles = compile_vehicles(self.vehicles)
+        
+        # Mémo de l'identification: candidats par marque, résultat par
+        # (marque, modèle, titre, version, carburant) en minuscules
+        self._vehicles_by_marque: dict[str, tuple[CompiledVehicle, ...]] = {}
+        self._identify_cached = lru_cache(maxsize=IDENTIFY_CACHE_SIZE)(self._identify_lowered)
+        # Paramètres précalculés (bonus en minuscules, bornes prix/km) par config
+        self._compiled_by_config = {id(v.config): v for v in self._compiled_vehicles}
         
         # Départements prioritaires
         self.dept_priority = self.vehicles_config.get("departements_prioritaires", {})
+        self._dept_tiers = tuple(
+            frozenset(self.dept_priority.get(tier, [])) for tier in ("tier1", "tier2", "tier3")
+        )
         
         # Mots-clés
         self.keywords_opportunite = self.keywords_config.get("opportunite", {})
         self.keywords_risque = self.keywords_config.get("risque", {})
         self.exclusions = self.keywords_config.get("exclusions", {})
+        self._exclusion_patterns = tuple(self.exclusions.get("patterns", []))
+        
+        # Toutes les catégories de mots-clés en un seul automate, clés
+        # (catégorie, id) indexées par bit: résultats en masque entier
+        groups: dict[tuple[str, str], list[str]] = {}
+        for kw_id, kw_config in self.keywords_opportunite.items():
+            groups[(OPPORTUNITE, kw_id)] = kw_config.get("patterns", [])
+        for risk_id, risk_config in self.keywords_risque.items():
+            groups[(RISQUE, risk_id)] = risk_config.get("patterns", [])
+        for pattern in self._exclusion_patterns:
+            groups[(EXCLUSION, pattern)] = [pattern]
+        self._keyword_scanner = scanner = SubstringScanner(groups)
+        self._opportunite_bits = tuple(
+            (kw_id, scanner.bit((OPPORTUNITE, kw_id)), kw_config)
+            for kw_id, kw_config in self.keywords_opportunite.items()
+        )
+        self._risque_bits = tuple(
+            (risk_id, scanner.bit((RISQUE, risk_id)), risk_config)
+            for risk_id, risk_config in self.keywords_risque.items()
+        )
+        self._exclusion_bits = tuple(
+            (pattern, scanner.bit((EXCLUSION, pattern))) for pattern in self._exclusion_patterns
+        )
+        self._opportunite_mask = _mask_of(self._opportunite_bits)
+        self._risque_mask = _mask_of(self._risque_bits)
+        self._exclusion_mask = _mask_of(self._exclusion_bits)
+        
+        # Compilation JIT des noyaux numériques dès le chargement
+        score_kernels.warmup()
     
-    def calculate_score(self, annonce: Annonce) -> ScoreBreakdown:
+    def calculate_score(
+        self, 
+        annonce: Annonce, 
+        early_exit_threshold: Optional[int] = None,
+        now: Optional[datetime] = None
+    ) -> ScoreBreakdown:
         """
         Calcule le score complet avec breakdown.
         Retourne un ScoreBreakdown détaillé.
+        early_exit_threshold: si prix + km + fraîcheur + maximum possible des
+        mots-clés et bonus reste sous ce seuil (exclusions déjà vérifiées),
+        mots-clés, bonus et risques sont sautés et le total vaut le score
+        partiel prix + km + fraîcheur.
+        now: horodatage de référence pour la fraîcheur (partagé par un lot).
         """
-        breakdown = ScoreBreakdown()
-        
         # 1. Identifier le véhicule cible
         vehicle_id, vehicle_config = self._identify_vehicle(annonce)
+        return self._score_vehicle(
+            annonce, vehicle_id, vehicle_config, now=now, early_exit_threshold=early_exit_threshold
+        )
+    
+    def calculate_score_into(
+        self, 
+        annonce: Annonce, 
+        breakdown: ScoreBreakdown,
+        now: Optional[datetime] = None
+    ) -> ScoreBreakdown:
+        """
+        Comme calculate_score, mais remplit une instance fournie par l'appelant
+        (remise à zéro puis réutilisée: pool d'instances en traitement de masse).
+        L'annonce référence cette instance: la copier avant de la réutiliser
+        si le détail doit être conservé.
+        """
+        vehicle_id, vehicle_config = self._identify_vehicle(annonce)
+        return self._score_vehicle(annonce, vehicle_id, vehicle_config, now=now, breakdown=breakdown)
+    
+    def score_batch(
+        self, 
+        annonces: list[Annonce], 
+        early_exit_threshold: Optional[int] = None,
+        now: Optional[datetime] = None
+    ) -> list[ScoreBreakdown]:
+        """
+        Score un lot d'annonces.
+        Prix/km/fraîcheur calculés en un seul appel de noyau sur des tableaux
+        (parallèle sous Numba), le reste (texte, mots-clés) par annonce.
+        Un seul horodatage (now) pour tout le lot.
+        """
+        targets = [(annonce, *self._identify_vehicle(annonce)) for annonce in annonces]
+        identified = [t for t in targets if t[2]]
+        now = now or datetime.now(timezone.utc)
+        
+        columns = [array("d") for _ in range(10)]
+        for annonce, _, vehicle_config in identified:
+            prix_min, prix_max, prix_marche = self._prix_params(annonce, vehicle_config)
+            hours = (now - annonce.published_at).total_seconds() / 3600 if annonce.published_at else 0
+            values = (
+                annonce.prix or 0, annonce.kilometrage or 0, hours,
+                prix_min, prix_max, prix_marche or 0,
+                *self._km_params(vehicle_config),
+            )
+            for column, value in zip(columns, values):
+                column.append(value)
+        
+        scores, cases = new_batch_outputs(len(identified))
+        score_batch_kernel(
+            *columns,
+            self._w_prix, self._w_km, self._w_freshness,
+            scores, cases,
+        )
+        
+        numeric = {
+            id(annonce): tuple(zip(scores[3 * i:3 * i + 3], cases[3 * i:3 * i + 3]))
+            for i, (annonce, _, _) in enumerate(identified)
+        }
+        return [
+            self._score_vehicle(
+                annonce, vehicle_id, vehicle_config, numeric.get(id(annonce)), now, early_exit_threshold
+            )
+            for annonce, vehicle_id, vehicle_config in targets
+        ]
+    
+    def score_batch_for_alerts(
+        self, 
+        annonces: list[Annonce], 
+        now: Optional[datetime] = None
+    ) -> list[ScoreBreakdown]:
+        """Score un lot en écartant tôt les annonces qui ne peuvent pas atteindre SURVEILLER"""
+        return self.score_batch(annonces, early_exit_threshold=ALERT_MIN_SCORE, now=now)
+    
+    def _score_vehicle(
+        self, 
+        annonce: Annonce, 
+        vehicle_id: str, 
+        vehicle_config: Optional[dict[str, Any]],
+        numeric: Optional[tuple[tuple[int, int], ...]] = None,
+        now: Optional[datetime] = None,
+        early_exit_threshold: Optional[int] = None,
+        breakdown: Optional[ScoreBreakdown] = None
+    ) -> ScoreBreakdown:
+        """
+        Score d'une annonce dont le véhicule cible est identifié.
+        numeric: résultats (score, cas) prix/km/fraîcheur déjà calculés en lot.
+        breakdown: instance à réutiliser (remise à zéro), sinon une nouvelle.
+        """
+        if breakdown is None:
+            breakdown = ScoreBreakdown()
+        else:
+            breakdown.reset()
+        prix_result, km_result, freshness_result = numeric or (None, None, None)
+        
         if not vehicle_config:
             breakdown.total = 0
             breakdown.prix_detail = "Véhicule non ciblé"
@@ -82,8 +393,18 @@ class ScoringService:
         
         annonce.vehicule_cible_id = vehicle_id
         
+        # Textes en minuscules construits une seule fois par annonce
+        titre = (annonce.titre or "").lower()
+        version = (annonce.version or "").lower()
+        text_td = f"{titre} {(annonce.description or '').lower()}"
+        text_full = f"{text_td} {version}"
+        
+        # Un seul parcours: opportunités/risques sur titre + description,
+        # exclusions sur le texte complet (avec version)
+        found_td, found_full = self._keyword_scanner.find_split_mask(text_full, len(text_td))
+        
         # 2. Vérifier exclusions absolues
-        excluded, exclude_reason = self._check_exclusions(annonce)
+        excluded, exclude_reason = self._check_exclusions(annonce, found_full)
         if excluded:
             breakdown.total = 0
             breakdown.risk_detail = f"EXCLU: {exclude_reason}"
@@ -91,29 +412,43 @@ class ScoringService:
             annonce.ignore_reason = exclude_reason
             return breakdown
         
-        # 3. Calculer chaque composante
-        breakdown.prix_score, breakdown.prix_detail = self._score_prix(
-            annonce, vehicle_config
-        )
+        # Ni prix, ni km, ni description: rien à scorer au-delà des exclusions
+        if annonce.prix is None and annonce.kilometrage is None and not annonce.description:
+            breakdown.total = 0
+            breakdown.prix_detail = "Données insuffisantes"
+            return breakdown
         
-        breakdown.km_score, breakdown.km_detail = self._score_km(
-            annonce, vehicle_config
-        )
+        # Composantes numériques
+        prix = self._score_prix(annonce, vehicle_config, prix_result)
+        km = self._score_km(annonce, vehicle_config, km_result)
+        freshness = self._score_freshness(annonce, freshness_result, now)
         
-        breakdown.freshness_score, breakdown.freshness_detail = self._score_freshness(
-            annonce
-        )
+        # 3. Calculer chaque composante
+        breakdown.prix_score, breakdown.prix_detail = prix
+        breakdown.km_score, breakdown.km_detail = km
+        breakdown.freshness_score, breakdown.freshness_detail = freshness
+        
+        if early_exit_threshold is not None:
+            # Plafond = partiel + maximum possible des mots-clés et bonus
+            partial = prix[0] + km[0] + freshness[0]
+            ceiling = partial + self._w_keywords + self._w_bonus
+            if ceiling < early_exit_threshold:
+                # Total = score partiel réel (mots-clés, bonus, risques non analysés)
+                breakdown.keywords_detail = f"Non analysé (max {ceiling} < {early_exit_threshold})"
+                breakdown.total = max(0, min(100, partial))
+                annonce.update_score(breakdown.total, breakdown)
+                return breakdown
         
         breakdown.keywords_score, breakdown.keywords_detail = self._score_keywords(
-            annonce
+            annonce, found_td
         )
         
         breakdown.bonus_score, breakdown.bonus_detail = self._score_bonus(
-            annonce, vehicle_config
+            annonce, vehicle_config, f"{titre} {version}"
         )
         
         breakdown.risk_penalty, breakdown.risk_detail = self._score_risks(
-            annonce
+            annonce, found_td
         )
         
         # 4. Calculer le total
@@ -149,239 +484,204 @@ class ScoringService:
         if not annonce.marque or not annonce.modele:
             return "", None
         
-        annonce_marque = annonce.marque.lower().strip()
-        annonce_modele = annonce.modele.lower().strip()
-        annonce_titre = (annonce.titre or "").lower()
-        annonce_version = (annonce.version or "").lower()
-        
-        for vehicle_id, config in self.vehicles.items():
-            # Vérifier la marque
-            config_marque = config.get("marque", "").lower()
-            if config_marque not in annonce_marque and annonce_marque not in config_marque:
-                continue
-            
-            # Vérifier le modèle avec patterns regex
-            modele_patterns = config.get("modele_patterns", [])
-            modele_match = False
-            
-            for pattern in modele_patterns:
-                try:
-                    regex = re.compile(pattern, re.IGNORECASE)
-                    if (regex.search(annonce_modele) or 
-                        regex.search(annonce_titre) or
-                        regex.search(annonce_version)):
-                        modele_match = True
-                        break
-                except re.error:
-                    # Pattern invalide, essayer matching simple
-                    pattern_clean = pattern.replace("^", "").replace("$", "").replace("\\s", " ")
-                    if pattern_clean.lower() in annonce_modele:
-                        modele_match = True
-                        break
-            
-            if not modele_match:
-                continue
-            
-            # Vérifier le carburant si spécifié
-            config_carburant = config.get("carburant")
-            if config_carburant:
-                annonce_carburant = str(annonce.carburant.value).lower()
-                if config_carburant.lower() not in annonce_carburant:
-                    # Vérifier aussi dans le titre/version
-                    text_to_check = f"{annonce_titre} {annonce_version}"
-                    carburant_ok = False
-                    
-                    if config_carburant == "diesel":
-                        if any(p in text_to_check for p in ["hdi", "dci", "tdi", "diesel", "d-4d"]):
-                            carburant_ok = True
-                    elif config_carburant == "essence":
-                        if any(p in text_to_check for p in ["vti", "tce", "essence", "1.2", "1.4"]):
-                            carburant_ok = True
-                    
-                    if not carburant_ok and annonce_carburant != "unknown":
-                        continue
-            
-            # Vérifier les exclusions du véhicule
-            exclusions = config.get("exclusions", [])
-            excluded = False
-            for excl in exclusions:
-                if excl.lower() in annonce_titre or excl.lower() in annonce_version:
-                    excluded = True
-                    break
-            
-            if excluded:
-                continue
-            
-            return vehicle_id, config
-        
-        return "", None
+        return self._identify_cached(
+            annonce.marque.lower().strip(),
+            annonce.modele.lower().strip(),
+            (annonce.titre or "").lower(),
+            (annonce.version or "").lower(),
+            str(annonce.carburant.value).lower(),
+        )
+    
+    def _candidates_for_marque(self, annonce_marque: str) -> tuple[CompiledVehicle, ...]:
+        """Véhicules dont la marque correspond (ne dépend que de la marque)"""
+        candidates = self._vehicles_by_marque.get(annonce_marque)
+        if candidates is None:
+            candidates = tuple(
+                vehicle for vehicle in self._compiled_vehicles
+                if vehicle.marque in annonce_marque or annonce_marque in vehicle.marque
+            )
+            self._vehicles_by_marque[annonce_marque] = candidates
+        return candidates
+    
+    def _identify_lowered(
+        self, 
+        annonce_marque: str, 
+        annonce_modele: str, 
+        annonce_titre: str, 
+        annonce_version: str, 
+        annonce_carburant: str
+    ) -> tuple[str, Optional[dict[str, Any]]]:
+        """Identification sur les champs déjà en minuscules (mémoïsée)"""
+        return match_vehicle(
+            self._candidates_for_marque(annonce_marque),
+            annonce_modele, annonce_titre, annonce_version, annonce_carburant,
+        )
     
-    def _check_exclusions(self, annonce: Annonce) -> tuple[bool, str]:
+    def _check_exclusions(
+        self, 
+        annonce: Annonce, 
+        found: Optional[int] = None
+    ) -> tuple[bool, str]:
         """Vérifie les exclusions absolues (score = 0)"""
-        text_to_check = " ".join([
-            annonce.titre or "",
-            annonce.description or "",
-            annonce.version or ""
-        ]).lower()
+        if found is None:
+            found = self._keyword_scanner.find_mask(
+                _lower_text(annonce.titre, annonce.description, annonce.version)
+            )
         
-        exclusion_patterns = self.exclusions.get("patterns", [])
-        
-        for pattern in exclusion_patterns:
-            if pattern.lower() in text_to_check:
-                return True, f"Mot-clé exclu: {pattern}"
+        if found & self._exclusion_mask:
+            # Premier pattern exclu dans l'ordre de la config
+            for pattern, bit in self._exclusion_bits:
+                if found & bit:
+                    return True, f"Mot-clé exclu: {pattern}"
         
         return False, ""
     
+    def _prix_params(self, annonce: Annonce, vehicle_config: dict[str, Any]) -> tuple[Any, Any, Any]:
+        """(prix_min, prix_max, prix_marche) pour le score prix"""
+        compiled = self._compiled_by_config.get(id(vehicle_config))
+        prix_min, prix_max, prix_marche = (
+            compiled.prix_bounds if compiled else prix_bounds(vehicle_config)
+        )
+        return prix_min, prix_max, prix_marche or annonce.prix_marche_estime
+    
+    def _km_params(self, vehicle_config: dict[str, Any]) -> tuple[Any, Any, Any, Any]:
+        """(km_min, km_max, km_ideal_min, km_ideal_max) pour le score km"""
+        compiled = self._compiled_by_config.get(id(vehicle_config))
+        return compiled.km_bounds if compiled else km_bounds(vehicle_config)
+    
     def _score_prix(
         self, 
         annonce: Annonce, 
-        vehicle_config: dict[str, Any]
+        vehicle_config: dict[str, Any],
+        result: Optional[tuple[int, int]] = None
     ) -> tuple[int, str]:
         """
         Score prix (max 40 pts).
         Basé sur écart avec prix marché estimé ou config.
         """
-        max_pts = self.weights.get("prix", 40)
+        max_pts = self._w_prix
         
         if annonce.prix is None:
             return 0, "Prix non renseigné"
         
-        criteres = vehicle_config.get("criteres", {})
-        estimation = vehicle_config.get("estimation", {})
-        
-        prix_min = criteres.get("prix_min", 1000)
-        prix_max = criteres.get("prix_max", 5000)
-        prix_marche = estimation.get("prix_marche_median") or annonce.prix_marche_estime
-        
-        # Hors fourchette = score réduit
-        if annonce.prix < prix_min:
-            return int(max_pts * 0.3), f"Prix très bas ({annonce.prix}€ < {prix_min}€ min) - suspect"
-        
-        if annonce.prix > prix_max:
-            return 0, f"Prix trop élevé ({annonce.prix}€ > {prix_max}€ max)"
-        
-        # Calcul du score basé sur position dans la fourchette
-        # Plus le prix est bas, meilleur est le score
-        range_total = prix_max - prix_min
-        if range_total <= 0:
-            return int(max_pts * 0.5), "Fourchette prix invalide"
-        
-        position = (prix_max - annonce.prix) / range_total
-        score = int(max_pts * position)
-        
-        # Bonus si bien en dessous du prix marché
-        if prix_marche and annonce.prix < prix_marche * 0.8:
-            bonus = int(max_pts * 0.2)
-            score = min(max_pts, score + bonus)
-            detail = f"{annonce.prix}€ (-{int((1 - annonce.prix/prix_marche) * 100)}% vs marché {prix_marche}€)"
+        prix_min, prix_max, prix_marche = self._prix_params(annonce, vehicle_config)
+        prix = annonce.prix
+        
+        score, case = result or score_prix_kernel(prix, prix_min, prix_max, prix_marche or 0, max_pts)
+        if not self.verbose_breakdown:
+            return score, ""
+        
+        if case == score_kernels.PRIX_TRES_BAS:
+            detail = f"Prix très bas ({prix}€ < {prix_min}€ min) - suspect"
+        elif case == score_kernels.PRIX_TROP_ELEVE:
+            detail = f"Prix trop élevé ({prix}€ > {prix_max}€ max)"
+        elif case == score_kernels.PRIX_FOURCHETTE_INVALIDE:
+            detail = "Fourchette prix invalide"
+        elif case == score_kernels.PRIX_SOUS_MARCHE:
+            detail = f"{prix}€ (-{int((1 - prix/prix_marche) * 100)}% vs marché {prix_marche}€)"
         else:
-            detail = f"{annonce.prix}€ (fourchette {prix_min}-{prix_max}€)"
+            detail = f"{prix}€ (fourchette {prix_min}-{prix_max}€)"
         
         return score, detail
     
     def _score_km(
         self, 
         annonce: Annonce, 
-        vehicle_config: dict[str, Any]
+        vehicle_config: dict[str, Any],
+        result: Optional[tuple[int, int]] = None
     ) -> tuple[int, str]:
         """
         Score kilométrage (max 30 pts).
         Basé sur position dans la plage idéale.
         """
-        max_pts = self.weights.get("km", 30)
+        max_pts = self._w_km
         
         if annonce.kilometrage is None:
             return int(max_pts * 0.3), "Km non renseigné"
         
-        criteres = vehicle_config.get("criteres", {})
-        
-        km_min = criteres.get("km_min", 50000)
-        km_max = criteres.get("km_max", 200000)
-        km_ideal_min = criteres.get("km_ideal_min", km_min)
-        km_ideal_max = criteres.get("km_ideal_max", km_max - 30000)
-        
+        km_min, km_max, km_ideal_min, km_ideal_max = self._km_params(vehicle_config)
         km = annonce.kilometrage
         
-        # Trop peu de km = suspect (compteur?)
-        if km < km_min:
-            return int(max_pts * 0.4), f"{km:,} km < {km_min:,} km min - suspect".replace(",", " ")
-        
-        # Trop de km = hors cible
-        if km > km_max:
-            return 0, f"{km:,} km > {km_max:,} km max".replace(",", " ")
-        
-        # Dans la plage idéale = score max
-        if km_ideal_min <= km <= km_ideal_max:
-            return max_pts, f"{km:,} km (idéal {km_ideal_min:,}-{km_ideal_max:,})".replace(",", " ")
-        
-        # Entre min et ideal_min = bon score
-        if km < km_ideal_min:
-            ratio = (km - km_min) / (km_ideal_min - km_min) if km_ideal_min > km_min else 1
-            score = int(max_pts * (0.7 + 0.3 * ratio))
-            return score, f"{km:,} km (sous idéal)".replace(",", " ")
-        
-        # Entre ideal_max et max = score décroissant
-        if km > km_ideal_max:
-            ratio = (km_max - km) / (km_max - km_ideal_max) if km_max > km_ideal_max else 0
-            score = int(max_pts * ratio * 0.7)
-            return score, f"{km:,} km (au-dessus idéal)".replace(",", " ")
+        score, case = result or score_km_kernel(km, km_min, km_max, km_ideal_min, km_ideal_max, max_pts)
+        if not self.verbose_breakdown:
+            return score, ""
+        
+        if case == score_kernels.KM_TROP_BAS:
+            detail = f"{km:,} km < {km_min:,} km min - suspect"
+        elif case == score_kernels.KM_TROP_ELEVE:
+            detail = f"{km:,} km > {km_max:,} km max"
+        elif case == score_kernels.KM_IDEAL:
+            detail = f"{km:,} km (idéal {km_ideal_min:,}-{km_ideal_max:,})"
+        elif case == score_kernels.KM_SOUS_IDEAL:
+            detail = f"{km:,} km (sous idéal)"
+        else:
+            detail = f"{km:,} km (au-dessus idéal)"
         
-        return int(max_pts * 0.5), f"{km:,} km".replace(",", " ")
+        return score, detail.replace(",", " ")
     
-    def _score_freshness(self, annonce: Annonce) -> tuple[int, str]:
+    def _score_freshness(
+        self, 
+        annonce: Annonce, 
+        result: Optional[tuple[int, int]] = None,
+        now: Optional[datetime] = None
+    ) -> tuple[int, str]:
         """
         Score fraîcheur (max 10 pts).
         Basé sur l'âge de l'annonce.
         """
-        max_pts = self.weights.get("freshness", 10)
+        max_pts = self._w_freshness
         
         if not annonce.published_at:
             return int(max_pts * 0.5), "Date publication inconnue"
         
-        now = datetime.now(timezone.utc)
+        now = now or datetime.now(timezone.utc)
         age = now - annonce.published_at
         hours = age.total_seconds() / 3600
         
-        if hours < 1:
-            return max_pts, "< 1h (très frais)"
-        elif hours < 6:
-            return int(max_pts * 0.9), f"{int(hours)}h"
-        elif hours < 24:
-            return int(max_pts * 0.7), f"{int(hours)}h"
-        elif hours < 48:
-            return int(max_pts * 0.5), "1-2 jours"
-        elif hours < 168:  # 1 semaine
-            return int(max_pts * 0.3), f"{int(hours/24)} jours"
-        else:
-            return 0, f"> 1 semaine ({int(hours/24)} jours)"
+        score, case = result or score_freshness_kernel(hours, max_pts)
+        if not self.verbose_breakdown:
+            return score, ""
+        
+        if case == score_kernels.FRESH_1H:
+            return score, "< 1h (très frais)"
+        elif case in (score_kernels.FRESH_6H, score_kernels.FRESH_24H):
+            return score, f"{int(hours)}h"
+        elif case == score_kernels.FRESH_48H:
+            return score, "1-2 jours"
+        elif case == score_kernels.FRESH_SEMAINE:
+            return score, f"{int(hours/24)} jours"
+        return score, f"> 1 semaine ({int(hours/24)} jours)"
     
-    def _score_keywords(self, annonce: Annonce) -> tuple[int, str]:
+    def _score_keywords(
+        self, 
+        annonce: Annonce, 
+        found: Optional[int] = None
+    ) -> tuple[int, str]:
         """
         Score mots-clés opportunité (max 15 pts).
         """
-        max_pts = self.weights.get("keywords", 15)
+        max_pts = self._w_keywords
         
-        text_to_check = " ".join([
-            annonce.titre or "",
-            annonce.description or "",
-        ]).lower()
+        if found is None:
+            found = self._keyword_scanner.find_mask(_lower_text(annonce.titre, annonce.description))
         
+        if not found & self._opportunite_mask:
+            annonce.keywords_opportunite = []
+            return 0, "Aucun" if self.verbose_breakdown else ""
+        
+        # Un seul match par catégorie (un bit par id), noms en ordre de config
         total_bonus = 0
         found_keywords = []
-        
-        for kw_id, kw_config in self.keywords_opportunite.items():
-            patterns = kw_config.get("patterns", [])
-            bonus = kw_config.get("bonus", 5)
-            
-            for pattern in patterns:
-                if pattern.lower() in text_to_check:
-                    total_bonus += bonus
-                    found_keywords.append(kw_id)
-                    break  # Un seul match par catégorie
+        for kw_id, bit, kw_config in self._opportunite_bits:
+            if found & bit:
+                total_bonus += kw_config.get("bonus", 5)
+                found_keywords.append(kw_id)
         
         annonce.keywords_opportunite = found_keywords
         
         score = min(max_pts, total_bonus)
+        if not self.verbose_breakdown:
+            return score, ""
         detail = ", ".join(found_keywords) if found_keywords else "Aucun"
         
         return score, detail
@@ -389,7 +689,8 @@ class ScoringService:
     def _score_bonus(
         self, 
         annonce: Annonce, 
-        vehicle_config: dict[str, Any]
+        vehicle_config: dict[str, Any],
+        text: Optional[str] = None
     ) -> tuple[int, str]:
         """
         Score bonus divers (max 5 pts).
@@ -397,16 +698,14 @@ class ScoringService:
         - Particulier vs pro
         - Bonus véhicule (stepway, etc.)
         """
-        max_pts = self.weights.get("bonus", 5)
+        max_pts = self._w_bonus
         bonuses = []
         total = 0
         
         # Bonus département
         dept = annonce.departement
         if dept:
-            tier1 = self.dept_priority.get("tier1", [])
-            tier2 = self.dept_priority.get("tier2", [])
-            tier3 = self.dept_priority.get("tier3", [])
+            tier1, tier2, tier3 = self._dept_tiers
             
             if dept in tier1:
                 total += 3
@@ -426,50 +725,64 @@ class ScoringService:
             total -= 1
             bonuses.append("Pro (-1)")
         
-        # Bonus spécifiques au véhicule
-        vehicle_bonus = vehicle_config.get("bonus", {})
-        text = f"{annonce.titre} {annonce.version}".lower()
+        # Bonus spécifiques au véhicule (noms en minuscules au chargement)
+        compiled = self._compiled_by_config.get(id(vehicle_config))
+        vehicle_bonus = compiled.bonus_lc if compiled else lowercase_bonus(vehicle_config)
+        if text is None:
+            text = _lower_text(annonce.titre, annonce.version)
         
-        for bonus_name, bonus_value in vehicle_bonus.items():
-            if bonus_name.lower() in text:
+        for bonus_name, bonus_lc, bonus_value in vehicle_bonus:
+            if bonus_lc in text:
                 total += min(2, bonus_value // 100)
                 bonuses.append(bonus_name)
         
         score = max(0, min(max_pts, total))
+        if not self.verbose_breakdown:
+            return score, ""
         detail = ", ".join(bonuses) if bonuses else "Aucun"
         
         return score, detail
     
-    def _score_risks(self, annonce: Annonce) -> tuple[int, str]:
+    def _score_risks(
+        self, 
+        annonce: Annonce, 
+        found: Optional[int] = None
+    ) -> tuple[int, str]:
         """
         Pénalités risques (valeur négative).
         Détecte les problèmes et estime les coûts.
         """
-        text_to_check = " ".join([
-            annonce.titre or "",
-            annonce.description or "",
-        ]).lower()
+        if found is None:
+            found = self._keyword_scanner.find_mask(_lower_text(annonce.titre, annonce.description))
+        
+        if not found & self._risque_mask:
+            annonce.keywords_risque = []
+            annonce.repair_cost_estimate = 0
+            return 0, "Aucun risque détecté" if self.verbose_breakdown else ""
         
         total_penalty = 0
-        found_risks = []
+        found_ids = []
+        found_details = []
         total_cost = 0
         
-        for risk_id, risk_config in self.keywords_risque.items():
-            patterns = risk_config.get("patterns", [])
+        for risk_id, bit, risk_config in self._risque_bits:
+            if not found & bit:
+                continue
             penalty = risk_config.get("penalty", -10)
             cost = risk_config.get("cost_estimate", 0)
             
-            for pattern in patterns:
-                if pattern.lower() in text_to_check:
-                    total_penalty += penalty  # Déjà négatif
-                    total_cost += cost
-                    found_risks.append(f"{risk_id} ({penalty}pts, ~{cost}€)")
-                    break
-        
-        annonce.keywords_risque = [r.split(" ")[0] for r in found_risks]
+            total_penalty += penalty  # Déjà négatif
+            total_cost += cost
+            found_ids.append(risk_id)
+            if self.verbose_breakdown:
+                found_details.append(f"{risk_id} ({penalty}pts, ~{cost}€)")
+        
+        annonce.keywords_risque = found_ids
         annonce.repair_cost_estimate = total_cost
         
-        detail = ", ".join(found_risks) if found_risks else "Aucun risque détecté"
+        if not self.verbose_breakdown:
+            return total_penalty, ""
+        detail = ", ".join(found_details) if found_details else "Aucun risque détecté"
         
         return total_penalty, detail
     
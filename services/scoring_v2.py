@@ -8,26 +8,24 @@ Scoring Service V3 - Calcul de score explicable amélioré
 
 from __future__ import annotations
 
-import re
+import threading
+from bisect import bisect_right
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from typing import Any, Optional
 
-import yaml
-
+from config.settings import yaml_config_stamp
 from models.annonce_v2 import Annonce, ScoreBreakdown
 from models.enums import AlertLevel, SellerType, AnnonceStatus
-from config.settings import CONFIG_DIR
 from services.keywords import get_keyword_matcher, KeywordMatcher
+from services.scoring import CompiledVehicle, compile_vehicles, load_yaml, lowercase_bonus, match_vehicle
 
 
-def load_yaml(filename: str) -> dict[str, Any]:
-    """Charge un fichier YAML de config"""
-    path = CONFIG_DIR / filename
-    if path.exists():
-        with open(path, "r", encoding="utf-8") as f:
-            return yaml.safe_load(f) or {}
-    return {}
+# Paliers de fraîcheur: âge < FRESHNESS_HOURS[i] -> (ratio, libellé) d'index i,
+# dernier index = plus d'une semaine ({h}: heures, {j}: jours)
+FRESHNESS_HOURS = (1, 3, 6, 12, 24, 48, 168)
+FRESHNESS_RATIOS = (1, 0.95, 0.85, 0.7, 0.5, 0.3, 0.15, 0)
+FRESHNESS_LABELS = ("< 1h 🔥", "{h}h", "{h}h", "{h}h", "{h}h", "1-2j", "{j}j", "> 1 sem")
 
 
 @dataclass
@@ -40,6 +38,70 @@ class PriceAnalysis:
     discount_vs_market: float = 0.0  # % sous le marché
 
 
+@dataclass(slots=True, frozen=True)
+class VehicleTargets:
+    """Config véhicules préparée (partagée par toutes les instances V3)"""
+    vehicles_config: dict[str, Any]
+    weights: dict[str, int]
+    vehicles: dict[str, Any]
+    compiled_vehicles: tuple[CompiledVehicle, ...]
+    dept_priority: dict[str, list[str]]
+    dept_tiers: tuple[frozenset[str], ...]
+
+
+def _load_vehicle_targets() -> VehicleTargets:
+    """Charge vehicles.yaml et précalcule patterns, bonus et départements"""
+    vehicles_config = load_yaml("vehicles.yaml")
+    
+    # Poids du scoring (ajustés)
+    weights = vehicles_config.get("scoring_weights", {
+        "prix": 35,      # Réduit légèrement
+        "km": 25,        # Réduit légèrement
+        "keywords": 15,  # Opportunités
+        "freshness": 10,
+        "bonus": 10,     # Augmenté (inclut département)
+        "margin": 5      # Nouveau: bonus si marge nette élevée
+    })
+    
+    # Véhicules cibles
+    vehicles = vehicles_config.get("vehicles", {})
+    
+    # Départements prioritaires avec vrais bonus
+    dept_priority = vehicles_config.get("departements_prioritaires", {})
+    return VehicleTargets(
+        vehicles_config=vehicles_config,
+        weights=weights,
+        vehicles=vehicles,
+        compiled_vehicles=compile_vehicles(vehicles),
+        dept_priority=dept_priority,
+        dept_tiers=tuple(
+            frozenset(dept_priority.get(tier, [])) for tier in ("tier1", "tier2", "tier3")
+        ),
+    )
+
+
+# (signature de vehicles.yaml, config préparée): reconstruite si le fichier change
+_vehicle_targets: Optional[tuple[Optional[tuple[int, int]], VehicleTargets]] = None
+_vehicle_targets_lock = threading.Lock()
+
+
+def get_vehicle_targets() -> VehicleTargets:
+    """
+    Retourne la config véhicules préparée (partagée, thread-safe).
+    Reconstruite quand la signature mtime/taille de vehicles.yaml change,
+    comme le cache de load_yaml_config.
+    """
+    global _vehicle_targets
+    stamp = yaml_config_stamp("vehicles.yaml")
+    cached = _vehicle_targets
+    if cached is None or cached[0] != stamp:
+        with _vehicle_targets_lock:
+            cached = _vehicle_targets
+            if cached is None or cached[0] != stamp:
+                cached = _vehicle_targets = (stamp, _load_vehicle_targets())
+    return cached[1]
+
+
 class ScoringServiceV3:
     """
     Service de scoring V3 - Améliorations pépites
@@ -53,39 +115,39 @@ class ScoringServiceV3:
     """
     
     def __init__(self):
-        # Charger les configs YAML
-        self.vehicles_config = load_yaml("vehicles.yaml")
-        
-        # Poids du scoring (ajustés)
-        self.weights = self.vehicles_config.get("scoring_weights", {
-            "prix": 35,      # Réduit légèrement
-            "km": 25,        # Réduit légèrement
-            "keywords": 15,  # Opportunités
-            "freshness": 10,
-            "bonus": 10,     # Augmenté (inclut département)
-            "margin": 5      # Nouveau: bonus si marge nette élevée
-        })
-        
-        # Véhicules cibles
-        self.vehicles = self.vehicles_config.get("vehicles", {})
-        
-        # Départements prioritaires avec vrais bonus
-        self.dept_priority = self.vehicles_config.get("departements_prioritaires", {})
+        # Config véhicules chargée et préparée une seule fois par processus
+        targets = get_vehicle_targets()
+        self.vehicles_config = targets.vehicles_config
+        self.weights = targets.weights
+        self.vehicles = targets.vehicles
+        self._compiled_vehicles = targets.compiled_vehicles
+        self._compiled_by_config = {id(v.config): v for v in self._compiled_vehicles}
+        self.dept_priority = targets.dept_priority
+        self._dept_tiers = targets.dept_tiers
         
         # KeywordMatcher avec regex
         self.keyword_matcher = get_keyword_matcher()
         
         # Buffer de sécurité pour marge
         self.margin_buffer = 200  # € de marge de sécurité
+        
+        # Points de fraîcheur par palier (calculés une fois)
+        max_fresh = self.weights.get("freshness", 10)
+        self._freshness_scores = tuple(int(max_fresh * ratio) for ratio in FRESHNESS_RATIOS)
     
-    def calculate_score(self, annonce: Annonce) -> ScoreBreakdown:
+    def calculate_score(self, annonce: Annonce, now: Optional[datetime] = None) -> ScoreBreakdown:
         """
         Calcule le score complet avec breakdown.
+        now: horodatage de référence pour la fraîcheur (partagé par un lot).
         """
         breakdown = ScoreBreakdown()
         
+        # Textes en minuscules construits une seule fois par annonce
+        titre = (annonce.titre or "").lower()
+        version = (annonce.version or "").lower()
+        
         # 1. Identifier le véhicule cible
-        vehicle_id, vehicle_config = self._identify_vehicle(annonce)
+        vehicle_id, vehicle_config = self._identify_vehicle(annonce, titre, version)
         if not vehicle_config:
             breakdown.total = 0
             breakdown.prix_detail = "Véhicule non ciblé"
@@ -97,24 +159,21 @@ class ScoringServiceV3:
         # Cela résout le bug où _score_prix_v2 vérifiait keywords_risque vide
         text_full = f"{annonce.titre or ''} {annonce.description or ''} {annonce.version or ''}"
         
+        # Passe unique: exclusions + opportunités + risques + coûts
+        analysis = self.keyword_matcher.analyze(text_full)
+        
         # Vérifier exclusions
-        excluded, exclude_reason = self.keyword_matcher.is_excluded(text_full)
-        if excluded:
+        if analysis.excluded:
             breakdown.total = 0
-            breakdown.risk_detail = f"EXCLU: {exclude_reason}"
+            breakdown.risk_detail = f"EXCLU: {analysis.exclusion_reason}"
             annonce.status = AnnonceStatus.EXCLUE
-            annonce.ignore_reason = exclude_reason
+            annonce.ignore_reason = analysis.exclusion_reason
             return breakdown
         
-        # Passe unique: opportunités + risques + coûts
-        (kw_bonus, kw_penalty, kw_cost_estimate, 
-         opportunity_ids, risk_ids) = self.keyword_matcher.calculate_scores(text_full)
-        max_severity = self.keyword_matcher.get_severity_max(text_full)
-        
         # Stocker dans l'annonce AVANT le calcul du prix
-        annonce.keywords_opportunite = opportunity_ids
-        annonce.keywords_risque = risk_ids
-        annonce.repair_cost_estimate = kw_cost_estimate
+        annonce.keywords_opportunite = analysis.opportunity_ids
+        annonce.keywords_risque = analysis.risk_ids
+        annonce.repair_cost_estimate = analysis.cost
         
         # 3. Calculer les composantes (maintenant keywords_risque est peuplé)
         price_analysis = self._score_prix_v2(annonce, vehicle_config)
@@ -126,22 +185,22 @@ class ScoringServiceV3:
         )
         
         breakdown.freshness_score, breakdown.freshness_detail = self._score_freshness(
-            annonce
+            annonce, now
         )
         
         # Mots-clés opportunité (utilise les résultats de la passe unique)
-        breakdown.keywords_score = min(self.weights.get("keywords", 15), kw_bonus)
-        breakdown.keywords_detail = ", ".join(opportunity_ids) if opportunity_ids else "Aucun"
+        breakdown.keywords_score = min(self.weights.get("keywords", 15), analysis.bonus)
+        breakdown.keywords_detail = ", ".join(analysis.opportunity_ids) if analysis.opportunity_ids else "Aucun"
         
         breakdown.bonus_score, breakdown.bonus_detail = self._score_bonus_v2(
-            annonce, vehicle_config
+            annonce, vehicle_config, f"{titre} {version}"
         )
         
         # Risques (utilise les résultats de la passe unique)
-        breakdown.risk_penalty = kw_penalty
-        if risk_ids:
-            breakdown.risk_detail = f"{', '.join(risk_ids)} (~{kw_cost_estimate}€)"
-            if max_severity == "critical":
+        breakdown.risk_penalty = analysis.penalty
+        if analysis.risk_ids:
+            breakdown.risk_detail = f"{', '.join(analysis.risk_ids)} (~{analysis.cost}€)"
+            if analysis.max_severity == "critical":
                 breakdown.risk_detail = f"⚠️ CRITIQUE: {breakdown.risk_detail}"
         else:
             breakdown.risk_detail = "Aucun risque détecté"
@@ -168,7 +227,7 @@ class ScoringServiceV3:
         breakdown.total = max(0, min(100, raw_score))
         
         # 6. Ajuster alert_level selon sévérité risques
-        if max_severity == "critical" and breakdown.total >= 60:
+        if analysis.max_severity == "critical" and breakdown.total >= 60:
             # Risque critique = downgrade à "surveiller" sauf si marge énorme
             if breakdown.margin_min < 1000:
                 breakdown.total = min(breakdown.total, 59)
@@ -185,76 +244,40 @@ class ScoringServiceV3:
         
         return breakdown
     
+    def score_batch(
+        self, 
+        annonces: list[Annonce], 
+        now: Optional[datetime] = None
+    ) -> list[ScoreBreakdown]:
+        """Score un lot d'annonces avec un seul horodatage de référence"""
+        now = now or datetime.now(timezone.utc)
+        return [self.calculate_score(annonce, now) for annonce in annonces]
+    
     def _identify_vehicle(
         self, 
-        annonce: Annonce
+        annonce: Annonce,
+        titre: Optional[str] = None,
+        version: Optional[str] = None
     ) -> tuple[str, Optional[dict[str, Any]]]:
         """
         Identifie le véhicule cible correspondant à l'annonce.
+        titre/version: déjà en minuscules si fournis par calculate_score.
         """
         if not annonce.marque or not annonce.modele:
             return "", None
         
         annonce_marque = annonce.marque.lower().strip()
-        annonce_modele = annonce.modele.lower().strip()
-        annonce_titre = (annonce.titre or "").lower()
-        annonce_version = (annonce.version or "").lower()
-        
-        for vehicle_id, config in self.vehicles.items():
-            config_marque = config.get("marque", "").lower()
-            if config_marque not in annonce_marque and annonce_marque not in config_marque:
-                continue
-            
-            modele_patterns = config.get("modele_patterns", [])
-            modele_match = False
-            
-            for pattern in modele_patterns:
-                try:
-                    regex = re.compile(pattern, re.IGNORECASE)
-                    if (regex.search(annonce_modele) or 
-                        regex.search(annonce_titre) or
-                        regex.search(annonce_version)):
-                        modele_match = True
-                        break
-                except re.error:
-                    pattern_clean = pattern.replace("^", "").replace("$", "").replace("\\s", " ")
-                    if pattern_clean.lower() in annonce_modele:
-                        modele_match = True
-                        break
-            
-            if not modele_match:
-                continue
-            
-            config_carburant = config.get("carburant")
-            if config_carburant:
-                annonce_carburant = str(annonce.carburant.value).lower()
-                if config_carburant.lower() not in annonce_carburant:
-                    text_to_check = f"{annonce_titre} {annonce_version}"
-                    carburant_ok = False
-                    
-                    if config_carburant == "diesel":
-                        if any(p in text_to_check for p in ["hdi", "dci", "tdi", "diesel", "d-4d"]):
-                            carburant_ok = True
-                    elif config_carburant == "essence":
-                        if any(p in text_to_check for p in ["vti", "tce", "essence", "1.2", "1.4"]):
-                            carburant_ok = True
-                    
-                    if not carburant_ok and annonce_carburant != "unknown":
-                        continue
-            
-            exclusions = config.get("exclusions", [])
-            excluded = False
-            for excl in exclusions:
-                if excl.lower() in annonce_titre or excl.lower() in annonce_version:
-                    excluded = True
-                    break
-            
-            if excluded:
-                continue
-            
-            return vehicle_id, config
-        
-        return "", None
+        candidates = tuple(
+            vehicle for vehicle in self._compiled_vehicles
+            if vehicle.marque in annonce_marque or annonce_marque in vehicle.marque
+        )
+        return match_vehicle(
+            candidates,
+            annonce.modele.lower().strip(),
+            (annonce.titre or "").lower() if titre is None else titre,
+            (annonce.version or "").lower() if version is None else version,
+            str(annonce.carburant.value).lower(),
+        )
     
     def _score_prix_v2(
         self, 
@@ -380,59 +403,36 @@ class ScoringServiceV3:
         
         return int(max_pts * 0.5), f"{km:,} km".replace(",", " ")
     
-    def _score_freshness(self, annonce: Annonce) -> tuple[int, str]:
-        """Score fraîcheur"""
-        max_pts = self.weights.get("freshness", 10)
-        
+    def _score_freshness(
+        self, 
+        annonce: Annonce, 
+        now: Optional[datetime] = None
+    ) -> tuple[int, str]:
+        """Score fraîcheur (table de paliers précalculée)"""
         if not annonce.published_at:
-            return int(max_pts * 0.5), "Date inconnue"
+            return int(self.weights.get("freshness", 10) * 0.5), "Date inconnue"
         
-        now = datetime.now(timezone.utc)
+        now = now or datetime.now(timezone.utc)
         age = now - annonce.published_at
         hours = age.total_seconds() / 3600
         
-        if hours < 1:
-            return max_pts, "< 1h 🔥"
-        elif hours < 3:
-            return int(max_pts * 0.95), f"{int(hours)}h"
-        elif hours < 6:
-            return int(max_pts * 0.85), f"{int(hours)}h"
-        elif hours < 12:
-            return int(max_pts * 0.7), f"{int(hours)}h"
-        elif hours < 24:
-            return int(max_pts * 0.5), f"{int(hours)}h"
-        elif hours < 48:
-            return int(max_pts * 0.3), "1-2j"
-        elif hours < 168:
-            return int(max_pts * 0.15), f"{int(hours/24)}j"
-        else:
-            return 0, f"> 1 sem"
-    
-    def _score_keywords_v2(self, annonce: Annonce) -> tuple[int, str]:
-        """
-        Score mots-clés via KeywordMatcher (regex normalisé).
-        """
-        max_pts = self.weights.get("keywords", 15)
-        
-        text = f"{annonce.titre or ''} {annonce.description or ''}"
-        
-        bonus, _, _, opportunity_ids, _ = self.keyword_matcher.calculate_scores(text)
-        
-        annonce.keywords_opportunite = opportunity_ids
-        
-        score = min(max_pts, bonus)
-        detail = ", ".join(opportunity_ids) if opportunity_ids else "Aucun"
-        
-        return score, detail
+        # Premier palier dont la borne dépasse l'âge (recherche dichotomique)
+        tier = bisect_right(FRESHNESS_HOURS, hours)
+        return (
+            self._freshness_scores[tier],
+            FRESHNESS_LABELS[tier].format(h=int(hours), j=int(hours / 24)),
+        )
     
     def _score_bonus_v2(
         self, 
         annonce: Annonce, 
-        vehicle_config: dict[str, Any]
+        vehicle_config: dict[str, Any],
+        text: Optional[str] = None
     ) -> tuple[int, str]:
         """
         Score bonus V2 - Département avec vrais bonus significatifs.
         Poids augmenté à 10 pts max.
+        text: titre + version déjà en minuscules.
         """
         max_pts = self.weights.get("bonus", 10)
         bonuses = []
@@ -441,9 +441,7 @@ class ScoringServiceV3:
         # Bonus département (significatif maintenant)
         dept = annonce.departement
         if dept:
-            tier1 = self.dept_priority.get("tier1", [])
-            tier2 = self.dept_priority.get("tier2", [])
-            tier3 = self.dept_priority.get("tier3", [])
+            tier1, tier2, tier3 = self._dept_tiers
             
             if dept in tier1:
                 total += 5  # +5 au lieu de +3
@@ -469,11 +467,13 @@ class ScoringServiceV3:
             bonuses.append(f"{len(annonce.images_urls)} photos")
         
         # Bonus spécifiques au véhicule
-        vehicle_bonus = vehicle_config.get("bonus", {})
-        text = f"{annonce.titre} {annonce.version}".lower()
+        compiled = self._compiled_by_config.get(id(vehicle_config))
+        vehicle_bonus = compiled.bonus_lc if compiled else lowercase_bonus(vehicle_config)
+        if text is None:
+            text = f"{annonce.titre or ''} {annonce.version or ''}".lower()
         
-        for bonus_name, bonus_value in vehicle_bonus.items():
-            if bonus_name.lower() in text:
+        for bonus_name, bonus_lc, bonus_value in vehicle_bonus:
+            if bonus_lc in text:
                 pts = min(2, bonus_value // 100) if isinstance(bonus_value, int) else 1
                 total += pts
                 bonuses.append(bonus_name)
@@ -483,29 +483,6 @@ class ScoringServiceV3:
         
         return score, detail
     
-    def _score_risks_v2(self, annonce: Annonce) -> tuple[int, str, str]:
-        """
-        Pénalités risques via KeywordMatcher.
-        Retourne aussi la sévérité max.
-        """
-        text = f"{annonce.titre or ''} {annonce.description or ''}"
-        
-        _, penalty, cost_estimate, _, risk_ids = self.keyword_matcher.calculate_scores(text)
-        max_severity = self.keyword_matcher.get_severity_max(text)
-        
-        annonce.keywords_risque = risk_ids
-        annonce.repair_cost_estimate = cost_estimate
-        
-        # Construire le détail
-        if risk_ids:
-            detail = f"{', '.join(risk_ids)} (~{cost_estimate}€)"
-            if max_severity == "critical":
-                detail = f"⚠️ CRITIQUE: {detail}"
-        else:
-            detail = "Aucun risque détecté"
-        
-        return penalty, detail, max_severity
-    
     def _score_margin_bonus(self, margin_min: int) -> int:
         """Bonus si marge nette élevée"""
         max_pts = self.weights.get("margin", 5)
@@ -546,11 +523,14 @@ class ScoringServiceV3:
 
 # Instance globale
 _scoring_service_v3: Optional[ScoringServiceV3] = None
+_scoring_service_v3_lock = threading.Lock()
 
 
 def get_scoring_service_v3() -> ScoringServiceV3:
-    """Retourne l'instance du service de scoring V3"""
+    """Retourne l'instance du service de scoring V3 (création unique, thread-safe)"""
     global _scoring_service_v3
     if _scoring_service_v3 is None:
-        _scoring_service_v3 = ScoringServiceV3()
+        with _scoring_service_v3_lock:
+            if _scoring_service_v3 is None:
+                _scoring_service_v3 = ScoringServiceV3()
     return _scoring_service_v3
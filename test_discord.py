@@ -40,25 +40,28 @@ async def test_discord():
     # Tester le service de notification
     notifier = NotificationService()
     
-    print("📊 Statut des notifications:")
-    status = notifier.get_status()
-    for canal, actif in status.items():
-        emoji = "✅" if actif else "❌"
-        print(f"  {emoji} {canal}: {'Actif' if actif else 'Inactif'}")
-    
-    if not status.get("discord"):
-        print("\n❌ Discord non configuré! Vérifiez DISCORD_WEBHOOK_URL dans .env")
-        return False
-    
-    print("\n🚀 Envoi notification Discord de test...")
-    success = await notifier.send_discord(annonce_test)
-    
-    if success:
-        print("✅ Notification Discord envoyée avec succès!")
-        return True
-    else:
-        print("❌ Échec de l'envoi Discord")
-        return False
+    try:
+        print("📊 Statut des notifications:")
+        status = notifier.get_status()
+        for canal, actif in status.items():
+            emoji = "✅" if actif else "❌"
+            print(f"  {emoji} {canal}: {'Actif' if actif else 'Inactif'}")
+        
+        if not status.get("discord"):
+            print("\n❌ Discord non configuré! Vérifiez DISCORD_WEBHOOK_URL dans .env")
+            return False
+        
+        print("\n🚀 Envoi notification Discord de test...")
+        success = await notifier.send_discord(annonce_test)
+        
+        if success:
+            print("✅ Notification Discord envoyée avec succès!")
+            return True
+        else:
+            print("❌ Échec de l'envoi Discord")
+            return False
+    finally:
+        await notifier.aclose()
 
 if __name__ == "__main__":
     result = asyncio.run(test_discord())
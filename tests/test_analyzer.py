@@ -0,0 +1,73 @@
+"""
+Tests for analyzer service (analyse en lot multi-processus)
+"""
+
+import pytest
+
+from config import MOTS_CLES_EXCLUSION, MOTS_CLES_OPPORTUNITE
+from models.annonce import Annonce
+from services import analyzer
+
+
+@pytest.fixture
+def annonces():
+    descriptions = [
+        "Embrayage à prévoir, turbo neuf, urgent. Tel 06 12 34 56 78",
+        "CT ok, très bon état, distribution faite, première main",
+        "Voyant allumé, fume noir, contre-visite, prix à débattre",
+        "",
+        None,
+    ]
+    return [
+        Annonce(
+            url=f"https://test.com/annonce/{i}",
+            source="leboncoin",
+            titre=f"Peugeot 207 1.4 HDi {i}",
+            description=descriptions[i % len(descriptions)],
+            prix=1500 + 100 * i,
+            kilometrage=120000 + 5000 * i,
+            annee=2008 + i % 5,
+            departement="75",
+            carburant="diesel",
+            motorisation="1.4 HDi",
+            images_urls=[f"https://img.test/{i}/{n}.jpg" for n in range(i % 7)],
+        )
+        for i in range(20)
+    ]
+
+
+class TestAnalyserBatch:
+    """Tests pour l'analyse en lot (pool de processus)"""
+
+    def test_identique_sequentiel(self, annonces):
+        service = analyzer.AnalyzerService()
+
+        results = service.analyser_batch(annonces, max_workers=2)
+
+        assert results == [service.analyser(a) for a in annonces]
+
+    def test_lot_vide(self):
+        assert analyzer.AnalyzerService().analyser_batch([]) == []
+
+    def test_champs_serialises(self, annonces):
+        champs = analyzer._annonce_to_tuple(annonces[1])
+
+        assert champs[:2] == ("https://test.com/annonce/1", "leboncoin")
+        assert analyzer._analyse_tuple(champs) == analyzer.AnalyzerService().analyser(annonces[1])
+
+
+class TestFusedClassifier:
+    """Tests pour le classifieur mots-clés généré (un passage)"""
+
+    def test_identique_boucles(self):
+        classify = analyzer._get_fused_classifier()
+        texte = "embrayage hs, turbo neuf, pour pieces, urgent, prix a debattre"
+
+        problemes, exclusions, opportunites = classify(texte)
+
+        assert problemes == [
+            (p, c) for p, c in analyzer.AnalyzerService.PROBLEMES_COUTS.items() if p in texte
+        ]
+        assert exclusions == [m for m in MOTS_CLES_EXCLUSION if m.lower() in texte]
+        assert opportunites == [m for m in MOTS_CLES_OPPORTUNITE if m.lower() in texte]
+        assert problemes and opportunites
@@ -0,0 +1,143 @@
+"""
+Tests for Discord notifier (embeds, batching)
+"""
+
+import asyncio
+
+import httpx
+import pytest
+from datetime import datetime, timezone, timedelta
+
+from models.annonce_v2 import Annonce, ScoreBreakdown
+from models.enums import Source, SellerType, Carburant
+from services.notifier import discord
+from services.notifier.discord import (
+    _build_embed,
+    _build_reason_line,
+    _chunk_embeds,
+    _embed_length,
+    send_batch_notification,
+    should_notify,
+    DISCORD_MAX_EMBEDS,
+    DISCORD_MAX_EMBED_CHARS,
+)
+
+
+@pytest.fixture
+def base_annonce():
+    """Annonce de base pour les tests"""
+    return Annonce(
+        source=Source.AUTOSCOUT24,
+        marque="Peugeot",
+        modele="207",
+        version="1.4 HDi 70ch",
+        prix=2500,
+        kilometrage=150000,
+        annee=2010,
+        carburant=Carburant.DIESEL,
+        departement="75",
+        seller_type=SellerType.PARTICULIER,
+        titre="Peugeot 207 1.4 HDi 70ch Active",
+        published_at=datetime.now(timezone.utc) - timedelta(hours=2),
+        url="https://test.com/annonce/123"
+    )
+
+
+class TestChunkEmbeds:
+    """Tests pour le regroupement des embeds par message webhook"""
+
+    def test_max_embeds_par_message(self, base_annonce):
+        embeds = [_build_embed(base_annonce) for _ in range(25)]
+        chunks = _chunk_embeds(embeds)
+
+        assert [len(c) for c in chunks] == [10, 10, 5]
+        assert sum(chunks, []) == embeds
+
+    def test_limite_caracteres(self):
+        gros = {"title": "x" * 2500, "description": "", "fields": []}
+        chunks = _chunk_embeds([gros, gros, gros])
+
+        assert [len(c) for c in chunks] == [2, 1]
+        for chunk in chunks:
+            assert len(chunk) <= DISCORD_MAX_EMBEDS
+            assert sum(_embed_length(e) for e in chunk) <= DISCORD_MAX_EMBED_CHARS
+
+    def test_vide(self):
+        assert _chunk_embeds([]) == []
+
+
+class TestReasonLine:
+    """Tests pour la raison en 1 ligne"""
+
+    def test_raison_complete(self, base_annonce):
+        base_annonce.score_breakdown = ScoreBreakdown(prix_detail="Prix -22% vs marché")
+        base_annonce.keywords_opportunite = ["ct_ok", "premiere_main", "carnet_complet"]
+        base_annonce.keywords_risque = ["moteur_hs", "inconnu"]
+
+        assert _build_reason_line(base_annonce) == (
+            "-22% marché + CT OK + 1ère main + Carnet Complet + 75 + Particulier + ❌ Moteur"
+        )
+
+    def test_raison_vide(self, base_annonce):
+        base_annonce.departement = None
+        base_annonce.seller_type = SellerType.PROFESSIONNEL
+        assert _build_reason_line(base_annonce) == ""
+
+
+class TestBatchNotification:
+    """Tests pour l'envoi groupé (transport HTTP simulé)"""
+
+    def test_envoi_groupe(self, base_annonce, monkeypatch):
+        requests = []
+
+        def handler(request):
+            requests.append(request)
+            return httpx.Response(204)
+
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+        async def fake_client():
+            return client
+
+        monkeypatch.setattr(discord, "get_http_client", fake_client)
+        monkeypatch.setattr(discord, "_get_webhook_url", lambda: "https://discord.test/webhook")
+        monkeypatch.setattr(discord, "_discord_enabled", lambda: True)
+        monkeypatch.setattr(discord, "_batch_delay", lambda: 0)
+
+        sent = asyncio.run(send_batch_notification([base_annonce] * 23))
+
+        assert sent == 23
+        assert len(requests) == 3
+
+
+class TestShouldNotify:
+    """Tests pour la décision de notification"""
+
+    def test_nouvelle_annonce(self, base_annonce):
+        base_annonce.score_total = 70
+        assert should_notify(base_annonce) == (True, "new")
+        base_annonce.score_total = 50
+        assert should_notify(base_annonce) == (False, "score_too_low")
+
+    def test_deja_notifiee(self, base_annonce):
+        existing = Annonce.from_dict(base_annonce.to_dict())
+        existing.notified = True
+        existing.score_total = 70
+        base_annonce.score_total = 72
+
+        assert should_notify(base_annonce, existing) == (False, "already_notified")
+
+        base_annonce.prix = 2375  # exactement -5%: pas assez
+        assert should_notify(base_annonce, existing) == (False, "already_notified")
+
+        base_annonce.prix = 2374
+        assert should_notify(base_annonce, existing) == (True, "price_dropped")
+
+        base_annonce.prix = 2500
+        base_annonce.score_total = 80
+        assert should_notify(base_annonce, existing) == (True, "score_increased")
+
+    def test_pas_encore_notifiee(self, base_annonce):
+        existing = Annonce.from_dict(base_annonce.to_dict())
+        base_annonce.score_total = 65
+        assert should_notify(base_annonce, existing) == (True, "score_threshold")
@@ -4,8 +4,10 @@ Vérifie le matching regex normalisé (accents, frontières, variantes)
 """
 
 import pytest
+from services import keywords
 from services.keywords import (
     KeywordMatcher,
+    SubstringScanner,
     get_keyword_matcher,
     normalize_text,
     remove_accents
@@ -23,6 +25,11 @@ class TestNormalization:
         assert remove_accents("à") == "a"
         assert remove_accents("éèêë") == "eeee"
     
+    def test_remove_accents_hors_table(self):
+        """Les caractères hors table passent par la décomposition NFD"""
+        assert remove_accents("Škoda") == "Skoda"
+        assert remove_accents("e\u0301te") == "ete"
+    
     def test_normalize_text(self):
         assert normalize_text("CT OK") == "ct ok"
         assert normalize_text("Contrôle Technique") == "controle technique"
@@ -32,6 +39,38 @@ class TestNormalization:
         assert normalize_text("CT: OK") == "ct ok"
 
 
+class TestSubstringScanner:
+    """Tests pour la recherche multi-motifs (automate ou regex)"""
+    
+    @pytest.fixture(params=["automate", "regex"])
+    def scanner(self, request, monkeypatch):
+        if request.param == "regex":
+            monkeypatch.setattr(keywords, "ahocorasick", None)
+        return SubstringScanner({
+            "ct": ["ct ok"],
+            "ct_long": ["ct ok 2025"],
+            "moteur": ["moteur hs", "Moteur"],
+        })
+    
+    def test_find(self, scanner):
+        assert scanner.find("ct ok 2025, moteur a revoir") == {"ct", "ct_long", "moteur"}
+        assert scanner.find("rien") == set()
+    
+    def test_find_split(self, scanner):
+        text = "peugeot ct ok 2025"
+        head, found = scanner.find_split(text, len("peugeot ct ok"))
+        
+        assert head == {"ct"}
+        assert found == {"ct", "ct_long"}
+
+    def test_find_mask(self, scanner):
+        mask = scanner.find_mask("moteur hs, ct ok")
+
+        assert mask == scanner.bit("ct") | scanner.bit("moteur")
+        assert scanner.keys_of(mask) == {"ct", "moteur"}
+        assert scanner.bit("inconnu") == 0
+
+
 class TestKeywordMatcherOpportunities:
     """Tests pour la détection des opportunités"""
     
@@ -182,6 +221,41 @@ class TestKeywordMatcherScores:
         assert penalty < 0, "Should have negative penalty"
         assert cost > 0, "Should have cost estimate"
         assert len(risk_ids) >= 2, "Should detect multiple risks"
+    
+    def test_analyze_matches_legacy_api(self, matcher):
+        """analyze() agrège les mêmes résultats que les méthodes unitaires"""
+        text = "moteur hs, prix négociable"
+        analysis = matcher.analyze(text)
+        
+        assert (analysis.bonus, analysis.penalty, analysis.cost,
+                analysis.opportunity_ids, analysis.risk_ids) == matcher.calculate_scores(text)
+        assert analysis.max_severity == matcher.get_severity_max(text) == "critical"
+        assert (analysis.excluded, analysis.exclusion_reason) == matcher.is_excluded(text)
+    
+    def test_analyze_exclusion_short_circuit(self, matcher):
+        """Un texte exclu n'est pas scoré, sauf avec stop_on_exclusion=False"""
+        text = "moteur hs, prix négociable, épave"
+        
+        analysis = matcher.analyze(text)
+        assert analysis.excluded
+        assert analysis.exclusion_reason == matcher.is_excluded(text)[1]
+        assert analysis.risk_ids == [] and analysis.bonus == 0
+        
+        full = matcher.analyze(text, stop_on_exclusion=False)
+        assert full.excluded
+        assert full.max_severity == matcher.get_severity_max(text) == "critical"
+    
+    def test_analyze_many(self, matcher):
+        """analyze_many() == analyze() texte par texte"""
+        texts = ["CT ok, urgent", "", "moteur hs", "épave", None]
+        assert matcher.analyze_many(texts) == [matcher.analyze(t) for t in texts]
+
+    def test_matched_text_ordre_config(self, matcher):
+        """matched_text = première variante de la config, pas la plus tôt dans le texte"""
+        opps, risks = matcher.find_matches("doit partir, urgent. casse moteur, moteur hs")
+
+        assert {o.keyword_id: o.matched_text for o in opps}["urgent"] == "urgent"
+        assert {r.keyword_id: r.matched_text for r in risks}["moteur_hs"] == "moteur hs"
 
 
 class TestKeywordMatcherExclusions:
@@ -223,6 +297,45 @@ class TestWordBoundaries:
         opp_ids = [o.keyword_id for o in opps]
         
         assert len(opp_ids) >= 1, "Should match at least one opportunity"
+    
+    def test_invalid_pattern_logged(self, matcher, caplog):
+        """Un pattern invalide est ignoré et signalé via logging"""
+        with caplog.at_level("WARNING", logger="services.keywords"):
+            compiled = matcher._build_patterns(["ct (ok", "ct ok"])
+        
+        assert len(compiled) == 1
+        assert "Invalid regex pattern 'ct (ok'" in caplog.text
+
+
+class TestHyperscanParity:
+    """Parité des chemins Hyperscan et regex `re` (si hyperscan est installé)"""
+
+    TEXTS = [
+        "CT ok jusqu'à 2025, prix négociable, urgent",
+        "moteur hs, ct refusé, pour pièces",
+        "Turbo-diesel très bon état, contre-visite embrayage",
+        "vente urgente cause déménagement, à débattre",
+        "ne démarre plus, sans ct, épave",
+        "Škoda Fabia, contrôle technique ok, CT vierge",
+        "MOTEUR CASSÉ - NEGO POSSIBLE",
+        "",
+    ]
+
+    def test_parite(self, monkeypatch):
+        pytest.importorskip("hyperscan")
+        hs_matcher = KeywordMatcher()
+        assert hs_matcher._opportunite_hs is not None and hs_matcher._risque_hs is not None
+
+        monkeypatch.setattr(keywords, "hyperscan", None)
+        re_matcher = KeywordMatcher()
+
+        for text in self.TEXTS:
+            hs_opps, hs_risks = hs_matcher.find_matches(text)
+            re_opps, re_risks = re_matcher.find_matches(text)
+            assert [m.keyword_id for m in hs_opps] == [m.keyword_id for m in re_opps], text
+            assert [m.keyword_id for m in hs_risks] == [m.keyword_id for m in re_risks], text
+
+        assert hs_matcher.analyze_many(self.TEXTS) == re_matcher.analyze_many(self.TEXTS)
 
 
 if __name__ == "__main__":
@@ -159,6 +159,10 @@ class TestParseSellerType:
     
     def test_unknown(self, normalizer):
         assert normalizer.parse_seller_type("Jean Dupont") == SellerType.UNKNOWN
+    
+    def test_pro_mot_entier(self, normalizer):
+        assert normalizer.parse_seller_type("pro") == SellerType.PROFESSIONNEL
+        assert normalizer.parse_seller_type("Véhicule propre") == SellerType.UNKNOWN
 
 
 class TestParseTitle:
@@ -205,6 +209,10 @@ class TestParseTitle:
         marque, modele, version = normalizer.parse_title("Sandero Stepway 1.5 dCi")
         assert marque == "Dacia"
         assert modele == "Sandero"
+    
+    def test_batch(self, normalizer):
+        titres = ["207 1.4 HDi 70ch", None, "Renault Clio", "207 1.4 HDi 70ch"]
+        assert normalizer.parse_titles_batch(titres) == [normalizer.parse_title(t) for t in titres]
 
 
 class TestNormalizeText:
@@ -0,0 +1,194 @@
+"""
+Tests unitaires pour NotificationService (multi-canaux)
+Vérifie le premier succès, l'envoi HTTP générique et l'email
+"""
+
+import asyncio
+
+import httpx
+import pytest
+
+from models.annonce import Annonce
+from services.notifier import NotificationService
+from services.notifier import service as notifier_service
+from services.notifier.service import Channel
+
+
+@pytest.fixture
+def annonce():
+    return Annonce(
+        url="https://example.com/annonce/1",
+        source="leboncoin",
+        marque="Peugeot",
+        modele="207",
+        prix=3500,
+        kilometrage=150000,
+        annee=2010,
+        ville="Lyon",
+        departement="69",
+        titre="Peugeot 207 HDI",
+        score_rentabilite=72,
+        mots_cles_detectes=["ct ok"],
+        marge_estimee_min=800,
+        marge_estimee_max=1500,
+    )
+
+
+async def _result(value, delay=0.0):
+    await asyncio.sleep(delay)
+    if isinstance(value, Exception):
+        raise value
+    return value
+
+
+class TestFirstSuccess:
+    """Tests pour _first_success (premier canal qui réussit)"""
+
+    def test_premier_succes(self):
+        async def run():
+            service = NotificationService()
+            slow = _result(True, delay=0.05)
+            success = await service._first_success(_result(False), _result(True), slow)
+            pending = len(service._background)
+            await asyncio.gather(*service._background)
+            return success, pending
+
+        success, pending = asyncio.run(run())
+
+        assert success is True
+        # Le canal lent continue en arrière-plan
+        assert pending == 1
+
+    def test_tous_en_echec(self):
+        async def run():
+            service = NotificationService()
+            return await service._first_success(
+                _result(False), _result(RuntimeError("down")), _result(None)
+            )
+
+        assert asyncio.run(run()) is False
+
+    def test_timeout(self, monkeypatch):
+        monkeypatch.setattr(notifier_service, "CHANNEL_TIMEOUT_SECONDS", 0.01)
+
+        async def run():
+            service = NotificationService()
+            return await service._first_success(_result(True, delay=1.0))
+
+        assert asyncio.run(run()) is False
+
+
+class TestFermeture:
+    """Tests pour la fermeture des clients HTTP par hôte"""
+
+    def test_async_with(self, monkeypatch):
+        monkeypatch.setenv("DISCORD_WEBHOOK_URL", "https://discord.test/webhook")
+
+        async def run():
+            async with NotificationService() as service:
+                assert not service._discord.is_closed
+            return service
+
+        assert asyncio.run(run())._discord.is_closed
+
+
+class TestSend:
+    """Tests pour _send (envoi générique sur un canal HTTP)"""
+
+    def _channel(self, handler, **kwargs):
+        client = httpx.AsyncClient(
+            transport=httpx.MockTransport(handler), base_url="https://api.test"
+        )
+        return Channel(
+            "Test", True, client, "/send",
+            lambda annonce, text=None: {"titre": annonce.titre, "text": text},
+            **kwargs
+        )
+
+    def test_envoi_json(self, annonce):
+        requests = []
+
+        def handler(request):
+            requests.append(request)
+            return httpx.Response(200)
+
+        channel = self._channel(handler)
+        success = asyncio.run(NotificationService()._send(channel, annonce, text="hello"))
+
+        assert success is True
+        assert requests[0].url == "https://api.test/send"
+        assert requests[0].headers["content-type"] == "application/json"
+        assert b'"hello"' in requests[0].content
+
+    def test_envoi_formulaire(self, annonce):
+        requests = []
+
+        def handler(request):
+            requests.append(request)
+            return httpx.Response(201)
+
+        channel = self._channel(handler, as_json=False, success_codes=(200, 201))
+        success = asyncio.run(NotificationService()._send(channel, annonce, text="hello"))
+
+        assert success is True
+        assert requests[0].headers["content-type"] == "application/x-www-form-urlencoded"
+
+    def test_statut_en_echec(self, annonce):
+        channel = self._channel(lambda request: httpx.Response(500, text="boom"))
+
+        assert asyncio.run(NotificationService()._send(channel, annonce)) is False
+
+    def test_erreur_reseau(self, annonce):
+        def handler(request):
+            raise httpx.ConnectError("refused")
+
+        channel = self._channel(handler)
+
+        assert asyncio.run(NotificationService()._send(channel, annonce)) is False
+
+
+class TestEmail:
+    """Tests pour send_email (repli SMTP synchrone dans un thread)"""
+
+    @pytest.fixture
+    def service(self, monkeypatch):
+        monkeypatch.setattr(notifier_service, "aiosmtplib", None)
+        monkeypatch.setenv("SMTP_USER", "bot@example.com")
+        monkeypatch.setenv("SMTP_PASSWORD", "secret")
+        monkeypatch.setenv("EMAIL_TO", "me@example.com")
+        service = NotificationService()
+        assert service.email_enabled
+        return service
+
+    def test_envoi_sync(self, service, monkeypatch, annonce):
+        sent = []
+        monkeypatch.setattr(service, "_send_email_sync", sent.append)
+
+        assert asyncio.run(service.send_email(annonce, "texte")) is True
+
+        msg = sent[0]
+        assert msg["To"] == "me@example.com"
+        assert "Peugeot 207" in msg["Subject"]
+        html = msg.get_body(preferencelist=("html",)).get_content()
+        assert "3,500€" in html
+        assert "ct ok" in html
+        assert msg.get_body(preferencelist=("plain",)).get_content().strip() == "texte"
+
+    def test_erreur_smtp(self, service, monkeypatch, annonce):
+        def fail(msg):
+            raise OSError("smtp down")
+
+        monkeypatch.setattr(service, "_send_email_sync", fail)
+
+        assert asyncio.run(service.send_email(annonce)) is False
+
+    def test_desactive(self, monkeypatch, annonce):
+        monkeypatch.delenv("SMTP_USER", raising=False)
+        service = NotificationService()
+        assert not service.email_enabled
+
+        assert asyncio.run(service.send_email(annonce)) is False
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,238 @@
+"""
+Tests for orchestrator (filtrage doublons, pipeline)
+"""
+
+import asyncio
+
+import pytest
+
+from db.repo import AnnonceRepository
+from models.annonce_v2 import Annonce
+from models.enums import Source
+from services.orchestrator import DETAIL_PER_SOURCE, Orchestrator, IndexResult, _titre_tags
+
+
+@pytest.fixture
+def repo(tmp_path):
+    repo = AnnonceRepository(db_path=str(tmp_path / "test.db"))
+    repo.save(Annonce(
+        source=Source.AUTOSCOUT24,
+        source_listing_id="A1",
+        marque="Peugeot",
+        modele="207",
+        url="https://test.com/annonce/1",
+    ))
+    repo.save(Annonce(
+        source=Source.LEBONCOIN,
+        marque="Renault",
+        modele="Clio",
+        url="https://test.com/annonce/2",
+    ))
+    return repo
+
+
+@pytest.fixture
+def orchestrator(repo):
+    return Orchestrator(repo=repo)
+
+
+class TestFilterDuplicates:
+    """Tests pour le filtrage des doublons en lot"""
+
+    def test_doublons_db_et_lot(self, orchestrator):
+        results = [
+            IndexResult(url="https://test.com/annonce/1-bis", source=Source.AUTOSCOUT24, source_listing_id="A1"),
+            IndexResult(url="https://test.com/annonce/2", source=Source.LEBONCOIN),
+            IndexResult(url="https://test.com/annonce/3", source=Source.AUTOSCOUT24, source_listing_id="A3"),
+            IndexResult(url="https://test.com/annonce/3-bis", source=Source.AUTOSCOUT24, source_listing_id="A3"),
+            IndexResult(url="https://test.com/annonce/4", source=Source.LEBONCOIN, source_listing_id="A1"),
+        ]
+
+        new = orchestrator._filter_duplicates(results)
+
+        assert [r.url for r in new] == ["https://test.com/annonce/3", "https://test.com/annonce/4"]
+
+    def test_cache_entre_scans(self, orchestrator):
+        result = IndexResult(url="https://test.com/annonce/5", source=Source.PARUVENDU)
+
+        assert orchestrator._filter_duplicates([result]) == [result]
+        assert orchestrator._filter_duplicates([result]) == []
+
+
+class FakeDetailScraper:
+    """Scraper de détail simulé (mesure la concurrence)"""
+
+    def __init__(self):
+        self.running = 0
+        self.max_running = 0
+
+    async def fetch_detail(self, url):
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        await asyncio.sleep(0.01)
+        self.running -= 1
+        return None
+
+
+class TestTitreTags:
+    """Tests pour la détection des mots-clés du titre (scoring light)"""
+
+    def test_tags(self):
+        assert _titre_tags("clio ct ok prix a debattre") == {"ct_ok", "nego"}
+        assert _titre_tags("peugeot 207 hdi") == set()
+
+    def test_chevauchement(self):
+        assert _titre_tags("vitepave") == {"urgence", "risque"}
+
+
+class FakeIndexScraper:
+    """Scraper d'index simulé"""
+
+    def __init__(self, results):
+        self.results = results
+
+    async def scan_index(self, **kwargs):
+        return self.results
+
+
+class TestRunPipeline:
+    """Tests pour la phase détail (workers)"""
+
+    def test_callbacks_et_erreurs(self, orchestrator, repo, monkeypatch, caplog):
+        results = [
+            IndexResult(
+                url=f"https://test.com/annonce/n{i}", source=Source.AUTOSCOUT24,
+                source_listing_id=f"N{i}", titre="urgent", prix=1500
+            )
+            for i in range(12)
+        ]
+        orchestrator.register_scraper(Source.AUTOSCOUT24, FakeIndexScraper(results))
+
+        async def fake_detail(index_result, notify_threshold=60):
+            if index_result.url.endswith("n3"):
+                raise ValueError("boom")
+            return Annonce(
+                source=index_result.source,
+                source_listing_id=index_result.source_listing_id,
+                url=index_result.url,
+            )
+
+        monkeypatch.setattr(orchestrator, "_process_with_detail", fake_detail)
+        seen = []
+        orchestrator.on_new_annonce(lambda a: seen.append(a.url))
+
+        stats = asyncio.run(orchestrator.run_pipeline(detail_threshold=0, max_detail_per_run=20))
+
+        assert stats.index_new == 12
+        assert stats.detail_errors == 1
+        assert stats.detail_fetched == 11
+        assert sorted(seen) == sorted(r.url for r in results if not r.url.endswith("n3"))
+        assert all(repo.get_by_url(url) for url in seen)
+        # Erreur non réseau: loggée avec traceback
+        [record] = [r for r in caplog.records if r.levelname == "ERROR"]
+        assert "n3" in record.getMessage() and record.exc_info
+
+    def test_notifiee_sauvee_immediatement(self, orchestrator, repo, monkeypatch):
+        results = [
+            IndexResult(
+                url=f"https://test.com/annonce/n{i}", source=Source.AUTOSCOUT24,
+                source_listing_id=f"N{i}", titre="urgent", prix=1500
+            )
+            for i in range(6)
+        ]
+        orchestrator.register_scraper(Source.AUTOSCOUT24, FakeIndexScraper(results))
+
+        async def fake_detail(index_result, notify_threshold=60):
+            annonce = Annonce(
+                source=index_result.source,
+                source_listing_id=index_result.source_listing_id,
+                url=index_result.url,
+            )
+            if index_result.url.endswith(("n1", "n4")):
+                annonce.mark_notified(["discord"])
+            return annonce
+
+        monkeypatch.setattr(orchestrator, "_process_with_detail", fake_detail)
+        batches = []
+        save_many = repo.save_many
+
+        def spy_save_many(annonces):
+            batches.append([a.url for a in annonces])
+            return save_many(annonces)
+
+        monkeypatch.setattr(repo, "save_many", spy_save_many)
+        # Callback en échec: ne doit pas interrompre les autres workers
+        orchestrator.on_new_annonce(lambda a: 1 / 0 if a.url.endswith("n2") else None)
+
+        stats = asyncio.run(orchestrator.run_pipeline(detail_threshold=0, max_detail_per_run=20))
+
+        assert stats.notified == 2
+        assert ["https://test.com/annonce/n1"] in batches
+        assert ["https://test.com/annonce/n4"] in batches
+        assert all(repo.get_by_url(r.url) for r in results)
+
+
+class TestPreloadCache:
+    """Tests pour le préchargement du cache"""
+
+    def test_preload(self, orchestrator):
+        orchestrator.preload_cache(hours=1)
+
+        assert "A1" in orchestrator._seen_by_source["autoscout24"]
+        assert "https://test.com/annonce/2" in orchestrator._seen_urls
+
+
+class TestProcessWithDetail:
+    """Tests pour le traitement détail (appels DB dans le pool dédié)"""
+
+    def test_annonce_existante(self, orchestrator):
+        index_result = IndexResult(
+            url="https://test.com/annonce/1",
+            source=Source.AUTOSCOUT24,
+            source_listing_id="A1",
+            titre="Peugeot 207 1.4 HDi",
+            prix=9000,
+        )
+
+        annonce = asyncio.run(orchestrator._process_with_detail(index_result, notify_threshold=101))
+
+        assert annonce.source_listing_id == "A1"
+        assert annonce.notified is False
+
+    def test_deja_notifiee_inchangee(self, orchestrator, repo):
+        existing = repo.get_by_source_listing(Source.AUTOSCOUT24, "A1")
+        existing.mark_notified(["discord"])
+        repo.save(existing)
+        detail = FakeDetailScraper()
+        orchestrator.register_scraper(Source.AUTOSCOUT24, FakeIndexScraper([]), detail)
+        index_result = IndexResult(
+            url="https://test.com/annonce/1",
+            source=Source.AUTOSCOUT24,
+            source_listing_id="A1",
+            titre=existing.titre,
+            prix=existing.prix,
+            kilometrage=existing.kilometrage,
+        )
+
+        assert asyncio.run(orchestrator._process_with_detail(index_result)) is None
+        assert detail.max_running == 0
+
+        index_result.kilometrage = (existing.kilometrage or 0) + 1
+        assert asyncio.run(orchestrator._process_with_detail(index_result, notify_threshold=101)) is not None
+        assert detail.max_running == 1
+
+    def test_concurrence_par_source(self, orchestrator):
+        results = [
+            IndexResult(
+                url=f"https://test.com/annonce/s{i}", source=Source.PARUVENDU,
+                source_listing_id=f"S{i}", titre="Peugeot 207", prix=1500
+            )
+            for i in range(8)
+        ]
+        detail = FakeDetailScraper()
+        orchestrator.register_scraper(Source.PARUVENDU, FakeIndexScraper(results), detail)
+
+        stats = asyncio.run(orchestrator.run_pipeline(detail_threshold=0, notify_threshold=101))
+
+        assert stats.detail_fetched == 8
+        assert detail.max_running == DETAIL_PER_SOURCE
@@ -0,0 +1,40 @@
+"""
+Tests for score kernels (prix, km, fraîcheur)
+"""
+
+from services import score_kernels
+from services.score_kernels import (
+    score_freshness_kernel,
+    score_km_kernel,
+    score_prix_kernel,
+)
+
+
+class TestScorePrixKernel:
+    """Tests pour le noyau prix"""
+
+    def test_cas(self):
+        assert score_prix_kernel(500, 1000, 5000, 0, 40) == (12, score_kernels.PRIX_TRES_BAS)
+        assert score_prix_kernel(6000, 1000, 5000, 0, 40) == (0, score_kernels.PRIX_TROP_ELEVE)
+        assert score_prix_kernel(1000, 1000, 1000, 0, 40) == (20, score_kernels.PRIX_FOURCHETTE_INVALIDE)
+        assert score_prix_kernel(3000, 1000, 5000, 0, 40) == (20, score_kernels.PRIX_DANS_FOURCHETTE)
+        assert score_prix_kernel(3000, 1000, 5000, 4000, 40) == (28, score_kernels.PRIX_SOUS_MARCHE)
+
+
+class TestScoreKmKernel:
+    """Tests pour le noyau kilométrage"""
+
+    def test_cas(self):
+        args = (50000, 200000, 100000, 170000, 30)
+        assert score_km_kernel(40000, *args) == (12, score_kernels.KM_TROP_BAS)
+        assert score_km_kernel(250000, *args) == (0, score_kernels.KM_TROP_ELEVE)
+        assert score_km_kernel(150000, *args) == (30, score_kernels.KM_IDEAL)
+        assert score_km_kernel(75000, *args) == (25, score_kernels.KM_SOUS_IDEAL)
+        assert score_km_kernel(185000, *args) == (10, score_kernels.KM_AU_DESSUS_IDEAL)
+
+
+class TestScoreFreshnessKernel:
+    """Tests pour le noyau fraîcheur"""
+
+    def test_paliers(self):
+        assert [score_freshness_kernel(h, 10)[0] for h in (0.5, 3, 12, 30, 100, 200)] == [10, 9, 7, 5, 3, 0]
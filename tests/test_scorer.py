@@ -0,0 +1,187 @@
+"""
+Tests for legacy scoring service (services/scorer.py)
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from config import DEPARTEMENTS_PRIORITAIRES, MOTS_CLES_OPPORTUNITE
+from models.annonce import Annonce
+from services.scorer import SCORES_KM, SCORES_PRIX, ScoringService, TablesScore, _paliers
+
+
+def _cascade_prix(prix, config):
+    """Cascade de `<=` d'origine (référence)"""
+    prix_ideal = config.get("prix_ideal_max", config.get("prix_max", 3000))
+    prix_min = config.get("prix_min", 1500)
+    prix_max = config.get("prix_max", 4000)
+    if prix < prix_min:
+        return 40
+    elif prix <= prix_ideal * 0.7:
+        return 40
+    elif prix <= prix_ideal * 0.85:
+        return 35
+    elif prix <= prix_ideal:
+        return 30
+    elif prix <= prix_max * 0.9:
+        return 20
+    elif prix <= prix_max:
+        return 10
+    return 0
+
+
+def _cascade_km(km, config):
+    """Cascade de `<=` d'origine (référence)"""
+    km_ideal_min = config.get("km_ideal_min", config.get("km_min", 100000))
+    km_ideal_max = config.get("km_ideal_max", 160000)
+    km_max = config.get("km_max", 200000)
+    if km < km_ideal_min:
+        return 30
+    elif km <= km_ideal_max:
+        return 30
+    elif km <= km_ideal_max * 1.1:
+        return 25
+    elif km <= km_max * 0.9:
+        return 15
+    elif km <= km_max:
+        return 5
+    return 0
+
+
+CONFIGS = [
+    {"prix_min": 1500, "prix_max": 4000, "prix_ideal_max": 3000,
+     "km_ideal_min": 100000, "km_ideal_max": 160000, "km_max": 200000},
+    # Non ordonnée: idéal au-dessus du max, km idéal au-dessus du max
+    {"prix_min": 1000, "prix_max": 3000, "prix_ideal_max": 5000,
+     "km_ideal_min": 50000, "km_ideal_max": 210000, "km_max": 150000},
+    # Valeurs par défaut
+    {},
+]
+
+
+@pytest.fixture
+def scorer():
+    return ScoringService()
+
+
+@pytest.fixture
+def annonce():
+    return Annonce(
+        url="https://test.com/annonce/1",
+        source="leboncoin",
+        marque="Peugeot",
+        modele="207",
+        titre="Peugeot 207 1.4 HDi 70",
+        description="Très bon état, CT OK",
+        motorisation="1.4 HDi",
+        prix=2000,
+        kilometrage=150000,
+        departement=DEPARTEMENTS_PRIORITAIRES[0],
+        images_urls=["https://img.test/1.jpg"],
+    )
+
+
+class TestPaliers:
+    """Tests pour les seuils cumulés (max glissant)"""
+
+    def test_ordonnes(self):
+        assert _paliers(1, 2, 3) == (1, 2, 3)
+
+    def test_non_ordonnes(self):
+        assert _paliers(3, 1, 4, 2) == (3, 3, 4, 4)
+
+
+class TestTablesScore:
+    """Tests des seuils tabulés contre la cascade d'origine"""
+
+    def test_tables(self):
+        tables = TablesScore.from_config(CONFIGS[0])
+
+        assert tables.prix_min == 1500
+        assert tables.paliers_prix == (2100.0, 2550.0, 3000, 3600.0, 4000)
+        assert tables.km_ideal_min == 100000
+        assert len(tables.paliers_prix) == len(SCORES_PRIX) - 1
+        assert len(tables.paliers_km) == len(SCORES_KM) - 1
+
+    @pytest.mark.parametrize("config", CONFIGS)
+    def test_prix_aux_seuils(self, scorer, config):
+        tables = TablesScore.from_config(config)
+        valeurs = {tables.prix_min - 1, tables.prix_min}
+        for seuil in tables.paliers_prix:
+            valeurs.update((int(seuil) - 1, int(seuil), int(seuil) + 1, seuil))
+
+        for prix in sorted(valeurs):
+            assert scorer._score_prix(prix, tables) == _cascade_prix(prix, config), prix
+
+    @pytest.mark.parametrize("config", CONFIGS)
+    def test_km_aux_seuils(self, scorer, config):
+        tables = TablesScore.from_config(config)
+        valeurs = {tables.km_ideal_min - 1, tables.km_ideal_min}
+        for seuil in tables.paliers_km:
+            valeurs.update((int(seuil) - 1, int(seuil), int(seuil) + 1, seuil))
+
+        for km in sorted(valeurs):
+            assert scorer._score_kilometrage(km, tables) == _cascade_km(km, config), km
+
+    def test_non_renseigne(self, scorer):
+        tables = TablesScore.from_config(CONFIGS[0])
+
+        assert scorer._score_prix(None, tables) == 10
+        assert scorer._score_kilometrage(0, tables) == 10
+
+
+class TestMotsCles:
+    """Tests pour la recherche des mots-clés en une passe"""
+
+    def test_ordre_config_et_plafond(self, scorer, annonce):
+        mots = MOTS_CLES_OPPORTUNITE[:5]
+        annonce.description = " ".join(reversed(mots))
+
+        score, trouves = scorer._score_mots_cles(annonce)
+
+        assert trouves[:5] == mots
+        assert score == min(len(trouves) * 5, 20)
+
+    def test_exclusion(self, scorer, annonce):
+        assert not scorer._contient_exclusion(annonce)
+
+        annonce.description = "Vendu pour pièces"
+        assert scorer._contient_exclusion(annonce)
+
+
+class TestCalculerScore:
+    """Tests du score complet (texte, motorisation, bonus, fraîcheur)"""
+
+    def test_identification_motorisation(self, scorer, annonce):
+        assert scorer._identifier_vehicule(annonce)[0] == "peugeot_207_hdi"
+
+        annonce.titre = "Peugeot 207 1.6 HDi 110"
+        annonce.motorisation = "1.6 HDi"
+        assert scorer._identifier_vehicule(annonce) == (None, None)
+
+    def test_bonus_departement(self, scorer, annonce):
+        avec = scorer._score_bonus(annonce, {})
+        annonce.departement = "13"
+
+        assert avec - scorer._score_bonus(annonce, {}) == 5
+
+    def test_lot_heure_partagee(self, scorer, annonce):
+        maintenant = datetime(2024, 5, 1, 12, 0)
+        annonce.date_publication = maintenant - timedelta(minutes=10)
+        recente = Annonce(**{**annonce.__dict__, "url": "https://test.com/annonce/2"})
+        recente.date_publication = maintenant - timedelta(minutes=1)
+
+        scores = scorer.calculer_scores([annonce, recente], maintenant)
+
+        assert scores == [
+            scorer.calculer_score(annonce, maintenant)[0],
+            scorer.calculer_score(recente, maintenant)[0],
+        ]
+        assert scores[1] - scores[0] == 2  # 10 pts (< 5 min) contre 8 (< 15 min)
+
+    def test_tri(self, scorer, annonce):
+        scores = [30, 80, 55]
+        annonces = [Annonce(url=f"u{s}", source="x", score_rentabilite=s) for s in scores]
+
+        assert [a.score_rentabilite for a in scorer.trier_par_score(annonces)] == [80, 55, 30]
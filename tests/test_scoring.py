@@ -3,11 +3,13 @@ Tests for scoring service
 """
 
 import pytest
+from dataclasses import replace
 from datetime import datetime, timezone, timedelta
 
 from models.annonce_v2 import Annonce, ScoreBreakdown
-from models.enums import Source, SellerType, AlertLevel, Carburant
-from services.scoring import ScoringService, get_scoring_service
+from models.enums import Source, SellerType, AlertLevel, AnnonceStatus, Carburant
+from config import settings
+from services.scoring import ScoringService, compile_vehicles, get_scoring_service, load_yaml
 
 
 @pytest.fixture
@@ -92,6 +94,82 @@ class TestIdentifyVehicle:
         # Mais ça dépend des patterns, test à ajuster selon config
 
 
+class TestLoadYaml:
+    """Tests pour le chargement des configs YAML (parse en cache)"""
+    
+    def test_copie_independante(self):
+        config = load_yaml("vehicles.yaml")
+        config["vehicles"].clear()
+        
+        assert load_yaml("vehicles.yaml")["vehicles"]
+    
+    def test_fichier_absent(self):
+        assert load_yaml("absent.yaml") == {}
+    
+    def test_rechargement_si_modifie(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(settings, "CONFIG_DIR", tmp_path)
+        path = tmp_path / "poids.yaml"
+        path.write_text("prix: 40\n")
+        assert load_yaml("poids.yaml") == {"prix": 40}
+        
+        path.write_text("prix: 35\nkm: 25\n")  # Taille différente: cache invalidé
+        assert load_yaml("poids.yaml") == {"prix": 35, "km": 25}
+
+
+class TestIdentifyCache:
+    """Tests pour le mémo de l'identification véhicule"""
+    
+    def test_cache(self, scorer, base_annonce):
+        first = scorer._identify_vehicle(base_annonce)
+        assert scorer._identify_vehicle(replace(base_annonce)) == first
+        assert scorer._identify_cached.cache_info().hits == 1
+    
+    def test_titre_dans_la_cle(self, scorer, base_annonce):
+        assert scorer._identify_vehicle(base_annonce)[0] == "peugeot_207_hdi"
+        
+        base_annonce.modele = "2"
+        base_annonce.version = ""
+        base_annonce.titre = "Peugeot 206"
+        assert scorer._identify_vehicle(base_annonce)[0] != "peugeot_207_hdi"
+
+
+class TestCompileVehicles:
+    """Tests pour la précompilation des patterns véhicules"""
+    
+    def test_patterns_et_exclusions(self, caplog):
+        [vehicle] = compile_vehicles({
+            "test": {
+                "marque": "Peugeot",
+                "modele_patterns": ["^207$", "206("],
+                "carburant": "diesel",
+                "exclusions": ["CC"],
+            }
+        })
+        
+        assert vehicle.marque == "peugeot"
+        assert len(vehicle.modele_patterns) == 1  # "206(" invalide: écarté au chargement
+        assert "206(" in caplog.text
+        assert vehicle.matches_modele("207", "", "")
+        assert not vehicle.matches_modele("206(+)", "", "")
+        assert not vehicle.matches_modele("1207", "", "")
+        assert vehicle.carburant_hints.search("1.6 hdi")
+        assert vehicle.exclusions.search("207 cc")
+    
+    def test_parametres_derives(self, scorer):
+        """Bonus et bornes précalculés sur CompiledVehicle, config non modifiée"""
+        config = {
+            "criteres": {"prix_min": 1500, "prix_max": 4000, "km_max": 180000},
+            "bonus": {"Stepway": 200},
+        }
+        [vehicle] = compile_vehicles({"test": config})
+        
+        assert vehicle.bonus_lc == (("Stepway", "stepway", 200),)
+        assert vehicle.prix_bounds == (1500, 4000, None)
+        assert vehicle.km_bounds == (50000, 180000, 50000, 150000)
+        assert set(config) == {"criteres", "bonus"}
+        assert all("bonus_lc" not in c and "prix_bounds" not in c for c in scorer.vehicles.values())
+
+
 class TestScorePrix:
     """Tests pour le scoring du prix"""
     
@@ -162,6 +240,12 @@ class TestScoreFreshness:
         score, detail = scorer._score_freshness(base_annonce)
         assert score == 0
     
+    def test_now_fourni(self, scorer, base_annonce):
+        """L'horodatage de référence d'un lot remplace l'heure courante"""
+        now = base_annonce.published_at + timedelta(minutes=10)
+        score, detail = scorer._score_freshness(base_annonce, now=now)
+        assert score == 10
+    
     def test_no_date(self, scorer, base_annonce):
         base_annonce.published_at = None
         score, detail = scorer._score_freshness(base_annonce)
@@ -268,6 +352,30 @@ class TestCalculateScore:
         
         assert breakdown.total == 0
     
+    def test_donnees_insuffisantes(self, scorer, base_annonce):
+        """Ni prix, ni km, ni description: score 0 sans analyse texte"""
+        base_annonce.prix = None
+        base_annonce.kilometrage = None
+        
+        breakdown = scorer.calculate_score(base_annonce)
+        
+        assert breakdown.total == 0
+        assert breakdown.prix_detail == "Données insuffisantes"
+        
+        base_annonce.description = "urgent"
+        assert scorer.calculate_score(base_annonce).total > 0
+    
+    def test_donnees_insuffisantes_exclue(self, scorer, base_annonce):
+        """Exclusion vérifiée avant le raccourci (titre/version suffisent)"""
+        base_annonce.prix = None
+        base_annonce.kilometrage = None
+        base_annonce.titre = "Peugeot 207 épave"
+        
+        breakdown = scorer.calculate_score(base_annonce)
+        
+        assert breakdown.risk_detail.startswith("EXCLU")
+        assert base_annonce.status == AnnonceStatus.EXCLUE
+    
     def test_breakdown_structure(self, scorer, base_annonce):
         """Vérifie que le breakdown est complet"""
         breakdown = scorer.calculate_score(base_annonce)
@@ -281,6 +389,74 @@ class TestCalculateScore:
         assert hasattr(breakdown, "total")
         assert hasattr(breakdown, "margin_min")
         assert hasattr(breakdown, "margin_max")
+    
+    def test_sans_details(self, scorer, base_annonce):
+        """verbose_breakdown=False: mêmes scores, aucun texte de détail"""
+        quiet = ScoringService(verbose_breakdown=False)
+        base_annonce.description = "CT ok, prix négociable, moteur hs"
+        
+        expected = scorer.calculate_score(replace(base_annonce))
+        breakdown = quiet.calculate_score(base_annonce)
+        
+        assert breakdown.total == expected.total
+        assert breakdown.prix_detail == breakdown.km_detail == breakdown.freshness_detail == ""
+        assert expected.keywords_detail and expected.bonus_detail and expected.risk_detail
+        assert breakdown.keywords_detail == breakdown.bonus_detail == breakdown.risk_detail == ""
+        assert base_annonce.keywords_opportunite and base_annonce.keywords_risque
+    
+    def test_early_exit(self, scorer, base_annonce):
+        """Plafond sous le seuil: mots-clés sautés, total = score partiel"""
+        base_annonce.prix = 5000
+        base_annonce.kilometrage = 250000
+        base_annonce.published_at = datetime.now(timezone.utc) - timedelta(days=10)
+        base_annonce.description = "moteur hs"
+        
+        breakdown = scorer.calculate_score(base_annonce, early_exit_threshold=40)
+        
+        assert breakdown.total == breakdown.prix_score + breakdown.km_score + breakdown.freshness_score
+        assert base_annonce.score_total == breakdown.total
+        assert breakdown.keywords_detail.startswith("Non analysé")
+        assert base_annonce.keywords_risque == []
+        
+        breakdown = scorer.calculate_score(base_annonce, early_exit_threshold=10)
+        assert base_annonce.keywords_risque
+    
+    def test_early_exit_exclusion(self, scorer, base_annonce):
+        """Une annonce exclue sous le seuil reste exclue (score 0)"""
+        base_annonce.prix = 5000
+        base_annonce.kilometrage = 250000
+        base_annonce.published_at = datetime.now(timezone.utc) - timedelta(days=10)
+        base_annonce.description = "Epave pour pièces"
+        
+        breakdown = scorer.calculate_score(base_annonce, early_exit_threshold=40)
+        
+        assert breakdown.total == 0
+        assert breakdown.risk_detail.startswith("EXCLU")
+        assert base_annonce.status == AnnonceStatus.EXCLUE
+        assert "epave" in base_annonce.ignore_reason.lower()
+    
+    def test_score_batch(self, scorer, base_annonce):
+        """Le scoring en lot donne le même breakdown qu'annonce par annonce"""
+        inconnue = Annonce(source=Source.AUTOSCOUT24, marque="BMW", modele="Serie 3", url="https://test.com/1")
+        sans_prix = replace(base_annonce, prix=None, kilometrage=260000)
+        annonces = [base_annonce, inconnue, sans_prix]
+        
+        expected = [scorer.calculate_score(replace(a)).to_dict() for a in annonces]
+        
+        assert [b.to_dict() for b in scorer.score_batch(annonces)] == expected
+    
+    def test_calculate_score_into(self, scorer, base_annonce):
+        """Instance réutilisée: remise à zéro puis même résultat qu'une neuve"""
+        now = datetime.now(timezone.utc)
+        base_annonce.description = "moteur hs"
+        inconnue = Annonce(source=Source.AUTOSCOUT24, marque="BMW", modele="Serie 3", url="https://test.com/1")
+        pooled = ScoreBreakdown()
+        
+        for annonce in (base_annonce, inconnue):
+            expected = scorer.calculate_score(replace(annonce), now=now).to_dict()
+        
+            assert scorer.calculate_score_into(annonce, pooled, now=now) is pooled
+            assert pooled.to_dict() == expected
 
 
 class TestMarginEstimation:
@@ -0,0 +1,34 @@
+"""
+Tests for scoring service V3 (config véhicules partagée)
+"""
+
+import pytest
+
+from config import settings
+from services import scoring_v2
+from services.scoring_v2 import get_vehicle_targets
+
+
+class TestVehicleTargets:
+    """Tests pour la config véhicules partagée par les instances V3"""
+    
+    @pytest.fixture
+    def config_dir(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(settings, "CONFIG_DIR", tmp_path)
+        monkeypatch.setattr(scoring_v2, "_vehicle_targets", None)
+        return tmp_path
+    
+    def test_instance_partagee(self, config_dir):
+        (config_dir / "vehicles.yaml").write_text("vehicles:\n  a: {marque: Peugeot}\n")
+        
+        assert get_vehicle_targets() is get_vehicle_targets()
+    
+    def test_rechargement_si_modifie(self, config_dir):
+        path = config_dir / "vehicles.yaml"
+        path.write_text("vehicles:\n  a: {marque: Peugeot}\n")
+        assert list(get_vehicle_targets().vehicles) == ["a"]
+        
+        path.write_text("vehicles:\n  a: {marque: Peugeot}\n  b: {marque: Renault}\n")
+        targets = get_vehicle_targets()
+        assert list(targets.vehicles) == ["a", "b"]
+        assert [v.marque for v in targets.compiled_vehicles] == ["peugeot", "renault"]
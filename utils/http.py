@@ -15,18 +15,13 @@ from pathlib import Path
 from typing import Any, Optional
 
 import httpx
-import yaml
 
-from config.settings import CONFIG_DIR, get_settings
+from config.settings import get_settings, load_yaml_config
 
 
 def load_sites_config() -> dict[str, Any]:
     """Charge la config des sites"""
-    path = CONFIG_DIR / "sites.yaml"
-    if path.exists():
-        with open(path, "r", encoding="utf-8") as f:
-            return yaml.safe_load(f) or {}
-    return {}
+    return load_yaml_config("sites.yaml")
 
 
 @dataclass